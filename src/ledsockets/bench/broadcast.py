@@ -0,0 +1,132 @@
+"""
+Broadcast fan-out benchmark
+
+Compares the original gather-based fan-out (one `connection.send()` coroutine per client, gathered) against the
+Broadcaster engine pushing to per-client outboxes at several client counts.  Connections are real websockets ServerConnections wired to in-memory
+transports, so the numbers reflect framing and event loop overhead without any network I/O
+
+    python -m ledsockets.bench.broadcast --sizes 100,1000,10000 --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from websockets.asyncio.connection import Connection
+from websockets.asyncio.server import ServerConnection
+from websockets.protocol import State
+from websockets.server import ServerProtocol
+
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.server.Broadcaster import Broadcaster
+from ledsockets.server.ClientOutbox import ClientOutbox
+from ledsockets.support.Message import Message
+
+
+class NullTransport(asyncio.Transport):
+    """Transport that accepts and discards every write"""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        pass
+
+    def is_closing(self):
+        return False
+
+    def can_write_eof(self):
+        return False
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+def make_connections(count: int):
+    connections = []
+    for _ in range(count):
+        connection = ServerConnection(ServerProtocol(), None, ping_interval=None)
+        # Skip ServerConnection.connection_made, which would start the opening handshake
+        Connection.connection_made(connection, NullTransport())
+        connection.protocol.state = State.OPEN
+        connections.append((str(connection.id), connection))
+    return connections
+
+
+def make_message():
+    return Message('hardware_updated', {
+        "data": HardwareState(True, "The light and buzzer are on.").toDict()
+    }).encode()
+
+
+async def gather_broadcast(message: bytes, connections):
+    target_ids = [cid for cid, _ in connections]
+    by_id = dict(connections)
+    tasks = [by_id[cid].send(message, text=True) for cid in target_ids]
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def engine_broadcast(broadcaster: Broadcaster, message: bytes, outboxes):
+    broadcaster.broadcast(message, outboxes, 'hardware_updated')
+
+
+async def time_rounds(rounds: int, fn):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    return (time.perf_counter() - start) / rounds
+
+
+async def run(sizes, rounds):
+    message = make_message()
+    broadcaster = Broadcaster(lambda failed: None)
+    results = []
+    for size in sizes:
+        connections = make_connections(size)
+        outboxes = [(cid, ClientOutbox(connection, lambda e: None)) for cid, connection in connections]
+        gather_s = await time_rounds(rounds, lambda: gather_broadcast(message, connections))
+        engine_s = await time_rounds(rounds, lambda: engine_broadcast(broadcaster, message, outboxes))
+        results.append({
+            "clients": size,
+            "gather_ms": round(gather_s * 1000, 3),
+            "engine_ms": round(engine_s * 1000, 3),
+            "speedup": round(gather_s / engine_s, 1) if engine_s else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gather-based and engine broadcast fan-out')
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma separated client counts')
+    parser.add_argument('--rounds', type=int, default=20, help='broadcasts per measurement')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    results = asyncio.run(run(sizes, args.rounds))
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"{'clients':>8} {'gather ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for row in results:
+        print(f"{row['clients']:>8} {row['gather_ms']:>10} {row['engine_ms']:>10} {row['speedup']:>7}x")
+
+
+if __name__ == '__main__':
+    main()
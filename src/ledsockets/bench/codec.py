@@ -0,0 +1,152 @@
+"""
+Codec benchmark
+
+Times encoding and decoding one frame of every message type described in `src/types/types.yaml` with each wire codec:
+JSON with the standard library, JSON with orjson (when it's installed) and the packed binary codec in pure Python and
+with msgpack (when it's installed).  Sample payloads are generated from the type descriptions, filling in every optional
+relationship and `--roster` entries for each list relationship, so status frames are about the size a small deployment
+sends
+
+    python -m ledsockets.bench.codec --rounds 2000 --roster 10
+
+Needs PyYAML to read the type descriptions: pip install -e ".[dev]"
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from ledsockets.codec.AbstractCodec import AbstractCodec
+from ledsockets.codec.JsonCodec import JsonCodec
+from ledsockets.codec.PackedCodec import PackedCodec
+from ledsockets.support.Message import Message
+from ledsockets.support.TypeDescriptions import TypeDescriptions
+
+SAMPLE_TEXT = "The light and buzzer are on.  If I'm around it's annoying me."
+MAX_DEPTH = 3
+
+
+class PayloadSampler:
+    def __init__(self, resources: Dict[str, Dict], plain: Dict[str, Dict], roster: int):
+        self._resources = resources
+        self._plain = plain
+        self._roster = roster
+        self._ids = 0
+
+    def _find(self, types: Dict[str, Dict], name: str) -> Dict | None:
+        if name in types:
+            return types[name]
+        # e.g. partial_hardware_state for hardware_state_partial
+        words = sorted(name.split('_'))
+        return next((types[key] for key in types if sorted(key.split('_')) == words), None)
+
+    def payload(self, payload_type: str) -> Dict:
+        name = payload_type.rstrip('[]')
+        if self._find(self._resources, name):
+            return {"data": self._data(payload_type, 0)}
+        description = self._find(self._plain, name)
+        if description:
+            return self._value(description, 0)
+        return {}
+
+    def _data(self, data_type: str, depth: int) -> Any:
+        if data_type.endswith('[]'):
+            return [self._data(data_type[:-2], depth) for _ in range(self._roster)]
+        return self._resource(self._find(self._resources, data_type), depth)
+
+    def _resource(self, description: Dict, depth: int) -> Dict:
+        self._ids += 1
+        resource = {
+            "type": description['type'],
+            "id": f'{self._ids:08x}-7d1c-4b1e-9f0a-5c3e2d1b0a98',
+            "attributes": {
+                key.rstrip('?'): self._value(value, depth + 1) for key, value in
+                (description.get('attributes') or {}).items()
+            },
+        }
+        relationships = description.get('relationships?') or description.get('relationships')
+        if relationships and depth < MAX_DEPTH:
+            resource['relationships'] = {
+                key.rstrip('?'): {"data": self._data(relationship['data'], depth + 1)}
+                for key, relationship in relationships.items()
+            }
+        return resource
+
+    def _value(self, value: Any, depth: int) -> Any:
+        if isinstance(value, dict):
+            return {key.rstrip('?'): self._value(item, depth + 1) for key, item in value.items()}
+        if not isinstance(value, str):
+            return value
+        if value in ('true', 'false'):
+            return value == 'true'
+        if value == 'number':
+            return 2.5
+        if value.startswith('string[]'):
+            return ['default', 'porch']
+        if value.endswith('[]') and self._find(self._plain, value[:-2]):
+            return [self._value(self._find(self._plain, value[:-2]), depth + 1)]
+        return SAMPLE_TEXT
+
+
+def time_per_call(rounds: int, fn) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def get_codecs() -> List[Tuple[str, AbstractCodec]]:
+    codecs = [('json', JsonCodec(accelerated=False))]
+    accelerated = JsonCodec()
+    if accelerated.accelerated:
+        codecs.append((accelerated.backend, accelerated))
+    codecs.append(('packed', PackedCodec(accelerated=False)))
+    accelerated = PackedCodec()
+    if accelerated.accelerated:
+        codecs.append((accelerated.backend, accelerated))
+    return codecs
+
+
+def run(types_path: str, rounds: int, roster: int):
+    try:
+        descriptions = TypeDescriptions.load(types_path)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    sampler = PayloadSampler(descriptions.resources, descriptions.plain, roster)
+    codecs = get_codecs()
+    results = []
+    for message_type, payload_type in descriptions.messages:
+        frame = [message_type, sampler.payload(payload_type)]
+        for label, codec in codecs:
+            encoded = codec.dumps(frame)
+            encode_s = time_per_call(rounds, lambda: codec.dumps(frame))
+            decode_s = time_per_call(rounds, lambda: Message.parse(encoded, codec))
+            results.append({
+                "message": message_type,
+                "codec": label,
+                "bytes": len(encoded),
+                "encode_us": round(encode_s * 1e6, 2),
+                "decode_us": round(decode_s * 1e6, 2),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time encoding and decoding each message type with each codec')
+    parser.add_argument('--types', default=TypeDescriptions.DEFAULT_PATH, help='path to the type descriptions')
+    parser.add_argument('--rounds', type=int, default=2000, help='encodes and decodes per measurement')
+    parser.add_argument('--roster', type=int, default=10, help='entries in each list relationship')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.types, args.rounds, args.roster)
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"{'message':<22} {'codec':<7} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+    for row in results:
+        print(f"{row['message']:<22} {row['codec']:<7} {row['bytes']:>7} {row['encode_us']:>10} {row['decode_us']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+"""
+Load-generation harness
+
+Starts a Server with a ServerConnectionManager on a local port, connects a hardware Client backed by a MockBoard, then
+opens `--clients` simulated UI clients spread across `--processes` worker processes, so they neither compete with the
+server for its event loop nor show up in its memory.  Once every client has joined, each one toggles the light, renames
+itself and reconnects at random, at the per-client rates of the chosen `--scenario`, for `--duration` seconds
+
+    ledsockets-bench --clients 2000 --scenario steady --duration 30 --json
+    python -m ledsockets.bench.harness --clients 500 --scenario toggle_storm
+
+It reports
+* throughput: frames sent by and delivered to the UI clients per second
+* hardware_updated latency for each recipient: `fanout` from the hardware sending the update and `end_to_end` from the
+  toggle that caused it, both on the shared monotonic clock (system-wide on Linux)
+* the server's own patch latency by hop (see PatchTracer)
+* memory per client: the growth in the server process's resident set size while the clients joined, per client
+* event loop lag: how late a 10ms timer on the server's event loop fires
+
+`--json` prints the report as JSON (`--output` writes it to a file), along with the commit it was run at, so runs can
+be compared across commits
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import time
+from typing import Dict, List
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+
+from ledsockets.board.MockBoard import MockBoard
+from ledsockets.client.Client import Client
+from ledsockets.client.ClientEventHandler import ClientEventHandler
+from ledsockets.contracts.MessageBroker import MessageBroker
+from ledsockets.server.Server import Server
+from ledsockets.server.ServerConnectionManager import ServerConnectionManager
+from ledsockets.support.Message import Message
+from ledsockets.support.Metrics import MetricsRegistry
+from ledsockets.support.RateLimiter import RateLimiter
+
+# Actions per second for each simulated client
+SCENARIOS: Dict[str, Dict[str, float]] = {
+    'idle': {},
+    'steady': {'toggle': 0.02, 'rename': 0.005, 'reconnect': 0.002},
+    'toggle_storm': {'toggle': 0.5},
+    'churn': {'reconnect': 0.1, 'toggle': 0.01},
+}
+ACTIONS = ('toggle', 'rename', 'reconnect')
+# Clients each worker joins at once
+JOIN_BATCH = 100
+# Seconds after the run for the last updates to arrive
+SETTLE = 1.0
+LAG_INTERVAL = 0.01
+LOGGERS = ('ledsockets', 'ledsockets.board', 'ledsockets.server', 'ledsockets.client')
+
+
+# <editor-fold desc="Simulated UI clients">
+class SimulatedClient:
+    """
+    A UI client as the web client runs one: it joins, answers heartbeats and notes when each hardware_updated arrives
+    """
+
+    def __init__(self, url: str, stats: Dict):
+        self._url = url
+        self._stats = stats
+        self._connection: ClientConnection | None = None
+        self._reader: asyncio.Task | None = None
+
+    async def join(self):
+        self._connection = await connect(self._url, max_size=None, ping_interval=None)
+        await self._send(['init_client', {"data": {"type": "ui_client", "id": "", "attributes": {}}}])
+        async for frame in self._connection:
+            if frame.startswith('["client_init"'):
+                break
+        self._reader = asyncio.create_task(self._read(self._connection))
+
+    async def _read(self, connection: ClientConnection):
+        stats = self._stats
+        try:
+            async for frame in connection:
+                received_at = time.monotonic()
+                stats['received'] += 1
+                if frame.startswith('["hardware_updated"'):
+                    correlation_id = json.loads(frame)[1]['data']['attributes'].get('correlation_id')
+                    if correlation_id:
+                        stats['deliveries'].append((correlation_id, received_at))
+                elif frame.startswith('["heartbeat"'):
+                    await self._send(['heartbeat', {}])
+        except ConnectionClosed:
+            pass
+
+    async def _send(self, frame: List):
+        await self._connection.send(json.dumps(frame))
+        self._stats['sent'] += 1
+
+    async def toggle(self):
+        # Carries the time it was sent, so whichever client it reaches can tell how long it took
+        self._stats['toggles'] += 1
+        correlation_id = f'{time.monotonic_ns()}-{os.getpid()}-{self._stats["toggles"]}'
+        await self._send(['patch_hardware_state', {"data": {
+            "type": "hardware_state_partial", "id": "", "attributes": {
+                "on": random.random() < 0.5,
+                "correlation_id": correlation_id,
+            }
+        }}])
+
+    async def rename(self):
+        await self._send(['change_name', {}])
+
+    async def reconnect(self):
+        await self.close()
+        await self.join()
+        self._stats['reconnects'] += 1
+
+    async def close(self):
+        if self._connection:
+            await self._connection.close()
+        if self._reader:
+            await self._reader
+        self._connection = self._reader = None
+
+    async def act(self, rates: Dict[str, float], stop_at: float):
+        """
+        Act at random until `stop_at` (event loop time), each action as a Poisson process at its rate
+        """
+        loop = asyncio.get_running_loop()
+        total = sum(rates.values())
+        actions, weights = list(rates), list(rates.values())
+        while True:
+            delay = random.expovariate(total) if total else float('inf')
+            if loop.time() + delay >= stop_at:
+                await asyncio.sleep(max(0.0, stop_at - loop.time()))
+                return
+            await asyncio.sleep(delay)
+            try:
+                await getattr(self, random.choices(actions, weights)[0])()
+            except (ConnectionClosed, OSError):
+                self._stats['errors'] += 1
+                await self.close()
+                await self.join()
+
+
+async def _run_worker(url: str, count: int, rates: Dict[str, float], duration: float, pipe):
+    loop = asyncio.get_running_loop()
+    stats = {'sent': 0, 'received': 0, 'toggles': 0, 'reconnects': 0, 'errors': 0, 'deliveries': []}
+    clients = [SimulatedClient(url, stats) for _ in range(count)]
+    for start in range(0, count, JOIN_BATCH):
+        await asyncio.gather(*(client.join() for client in clients[start:start + JOIN_BATCH]))
+    pipe.send('joined')
+    await loop.run_in_executor(None, pipe.recv)
+
+    stats.update(sent=0, received=0, deliveries=[])
+    stop_at = loop.time() + duration
+    await asyncio.gather(*(client.act(rates, stop_at) for client in clients))
+    sent, received = stats['sent'], stats['received']
+    await asyncio.sleep(SETTLE)
+    pipe.send({**stats, 'sent': sent, 'received': received})
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+
+def run_worker(url: str, count: int, rates: Dict[str, float], duration: float, seed: int, pipe):
+    """
+    Entry point for each worker process of simulated clients
+    """
+    random.seed(seed)
+    _raise_open_file_limit()
+    asyncio.run(_run_worker(url, count, rates, duration, pipe))
+
+
+# </editor-fold>
+
+
+class TimedMessageBroker(MessageBroker):
+    """
+    Passes the hardware's messages on to its Client, noting when each hardware_updated leaves, by correlation id
+    """
+
+    def __init__(self, client: Client, sent_at: Dict[str, float]):
+        self._client = client
+        self._sent_at = sent_at
+
+    async def send_message(self, message: Message):
+        if message.type == 'hardware_updated':
+            correlation_id = message.payload['data']['attributes'].get('correlation_id')
+            if correlation_id:
+                self._sent_at[correlation_id] = time.monotonic()
+        await self._client.send_message(message)
+
+
+def _raise_open_file_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get_rss() -> int:
+    """
+    Resident set size in bytes; the peak where /proc isn't available
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _get_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _summarize(samples: List[float], scale=1000.0) -> Dict:
+    """
+    :return: count, p50, p99, p999 and max of the samples, scaled (seconds to ms by default)
+    """
+    if not samples:
+        return {"count": 0, "p50": None, "p99": None, "p999": None, "max": None}
+    samples = sorted(samples)
+
+    def percentile(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * scale, 3)
+
+    return {"count": len(samples), "p50": percentile(0.5), "p99": percentile(0.99), "p999": percentile(0.999),
+            "max": round(samples[-1] * scale, 3)}
+
+
+async def _wait_for(condition, timeout: float, what: str):
+    try:
+        async with asyncio.timeout(timeout):
+            while not condition():
+                await asyncio.sleep(0.05)
+    except TimeoutError:
+        raise RuntimeError(f'Timed out waiting for {what}') from None
+
+
+async def _wait_for_port(port: int, timeout: float):
+    try:
+        async with asyncio.timeout(timeout):
+            while True:
+                try:
+                    _, writer = await asyncio.open_connection('127.0.0.1', port)
+                except OSError:
+                    await asyncio.sleep(0.05)
+                    continue
+                writer.close()
+                return
+    except TimeoutError:
+        raise RuntimeError(f'Timed out waiting for the server on port {port}') from None
+
+
+async def _watch_loop_lag(lags: List[float]):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run(clients: int, processes: int, duration: float, scenario: str, rates: Dict[str, float],
+              patch_tick: float) -> Dict:
+    _raise_open_file_limit()
+    url = f'ws://127.0.0.1:{_get_free_port()}'
+    port = int(url.rsplit(':', 1)[1])
+    metrics = MetricsRegistry()
+    manager = ServerConnectionManager(presence_coalesce_window=0.02, patch_tick=patch_tick,
+                                      rate_limiter=RateLimiter(), init_timeout=30.0, metrics=metrics)
+    server = Server('127.0.0.1', port, manager, metrics=metrics)
+    server_task = asyncio.create_task(server.serve())
+    await _wait_for_port(port, 10)
+
+    handler = ClientEventHandler(board=MockBoard())
+    hardware = Client(url, handler)
+    update_sent_at: Dict[str, float] = {}
+    handler.message_broker = TimedMessageBroker(hardware, update_sent_at)
+    hardware_task = asyncio.create_task(hardware.run())
+    await _wait_for(lambda: manager.is_hardware_connected, 10, 'the hardware to connect')
+
+    loop = asyncio.get_running_loop()
+    rss_before = _get_rss()
+    context = multiprocessing.get_context('spawn')
+    pipes, workers = [], []
+    for index in range(processes):
+        count = clients // processes + (1 if index < clients % processes else 0)
+        parent_pipe, child_pipe = context.Pipe()
+        worker = context.Process(target=run_worker, args=(url, count, rates, duration, index, child_pipe),
+                                 daemon=True)
+        worker.start()
+        pipes.append(parent_pipe)
+        workers.append(worker)
+    await asyncio.gather(*(loop.run_in_executor(None, pipe.recv) for pipe in pipes))
+    # Let anything the joins left behind (e.g. presence batches) settle before measuring
+    await asyncio.sleep(SETTLE)
+    rss_after = _get_rss()
+
+    lags: List[float] = []
+    lag_task = asyncio.create_task(_watch_loop_lag(lags))
+    for pipe in pipes:
+        pipe.send('start')
+    results = await asyncio.gather(*(loop.run_in_executor(None, pipe.recv) for pipe in pipes))
+    lag_task.cancel()
+
+    # The workers close their clients before exiting
+    for worker in workers:
+        await loop.run_in_executor(None, worker.join, 10)
+    await hardware.stop()
+    await hardware_task
+    server.stop()
+    await server_task
+
+    fanout, end_to_end = [], []
+    updates = set()
+    for result in results:
+        for correlation_id, received_at in result['deliveries']:
+            updates.add(correlation_id)
+            if correlation_id in update_sent_at:
+                fanout.append(received_at - update_sent_at[correlation_id])
+            end_to_end.append(received_at - int(correlation_id.split('-', 1)[0]) / 1e9)
+
+    hops = {}
+    for hop, snapshot in manager.get_patch_latencies().items():
+        hops[hop] = {key: round(value * 1000, 3) if key in ('p50', 'p99', 'p999') and value is not None else value
+                     for key, value in snapshot.items() if key != 'sum'}
+
+    return {
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "clients": clients,
+            "processes": processes,
+            "duration": duration,
+            "scenario": scenario,
+            "rates": rates,
+            "patch_tick_ms": round(patch_tick * 1000),
+        },
+        "throughput": {
+            "sent_per_s": round(sum(result['sent'] for result in results) / duration, 1),
+            "delivered_per_s": round(sum(result['received'] for result in results) / duration, 1),
+            "toggles": sum(result['toggles'] for result in results),
+            "hardware_updates": len(updates),
+        },
+        "hardware_updated_ms": {
+            "fanout": _summarize(fanout),
+            "end_to_end": _summarize(end_to_end),
+        },
+        "server_hops_ms": hops,
+        "memory": {
+            "rss_before": rss_before,
+            "rss_after": rss_after,
+            "bytes_per_client": round((rss_after - rss_before) / clients) if clients else None,
+        },
+        "loop_lag_ms": _summarize(lags),
+        "reconnects": sum(result['reconnects'] for result in results),
+        "errors": sum(result['errors'] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a local server with simulated UI clients and a mock Pi')
+    parser.add_argument('--clients', type=int, default=1000, help='simulated UI clients')
+    parser.add_argument('--processes', type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                        help='worker processes the clients are spread across')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run the scenario for')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='steady',
+                        help='per-client action rates to start from')
+    for action in ACTIONS:
+        parser.add_argument(f'--{action}-rate', type=float, help=f'{action}s per second per client, overriding the '
+                                                                 f'scenario')
+    parser.add_argument('--patch-tick-ms', type=int, default=100, help="the server's HARDWARE_PATCH_TICK_MS")
+    parser.add_argument('--log-level', default='ERROR',
+                        help='level of the server and hardware client logs, which go to stdout with the report')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    for name in LOGGERS:
+        logging.getLogger(name).setLevel(args.log_level)
+    rates = dict(SCENARIOS[args.scenario])
+    for action in ACTIONS:
+        rate = getattr(args, f'{action}_rate')
+        if rate is not None:
+            rates[action] = rate
+    rates = {action: rate for action, rate in rates.items() if rate > 0}
+
+    report = asyncio.run(run(args.clients, max(1, args.processes), args.duration, args.scenario, rates,
+                             args.patch_tick_ms / 1000))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    if args.json:
+        print(json.dumps(report))
+        return
+    throughput = report['throughput']
+    print(f"{args.clients} clients, {args.scenario} {rates}, {args.duration}s at {report['commit']}")
+    print(f"sent {throughput['sent_per_s']}/s, delivered {throughput['delivered_per_s']}/s, "
+          f"{throughput['hardware_updates']} hardware updates from {throughput['toggles']} toggles")
+    print(f"{'ms':>22} {'p50':>9} {'p99':>9} {'p999':>9}")
+    rows = [('hardware_updated fanout', report['hardware_updated_ms']['fanout']),
+            ('end to end', report['hardware_updated_ms']['end_to_end']),
+            *[(f'server {hop}', snapshot) for hop, snapshot in report['server_hops_ms'].items()],
+            ('loop lag', report['loop_lag_ms'])]
+    for name, summary in rows:
+        print(f"{name:>22} {summary['p50']!s:>9} {summary['p99']!s:>9} {summary['p999']!s:>9}")
+    print(f"memory per client: {report['memory']['bytes_per_client']} bytes (server RSS)")
+    print(f"reconnects: {report['reconnects']}, errors: {report['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+DTO and connection memory benchmark
+
+Measures what the DTOs cost to keep alive: each DTO type laid out in slots, as it is, against the same fields kept in
+an instance __dict__, as DTOs were before they declared __slots__.  Both layouts are filled with the same field values,
+so the difference is the per-instance storage alone.
+
+It then measures what a connected UI client costs the server as a whole: `--connections` raw sockets open websocket
+connections to a local server and initialize as UI clients, registered by a ServerConnectionManager with heartbeats
+and resuming enabled, so each one holds its websockets connection, UiClient, outbox, resume token and idle timer.  The
+same connections with a __dict__ UiClient are estimated from the UiClient layouts above, since only the DTO changed
+
+    python -m ledsockets.bench.memory --instances 10000 --connections 1000
+
+Allocations are counted with tracemalloc, so numbers vary a little between Python versions
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import socket
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+from websockets.asyncio.server import serve
+from websockets.client import ClientProtocol
+from websockets.frames import Close, Frame, Opcode
+from websockets.uri import parse_uri
+
+from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.HardwareClient import HardwareClient
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.dto.PartialHardwareState import PartialHardwareState
+from ledsockets.dto.RosterChange import RosterChange
+from ledsockets.dto.ServerStatus import ServerStatus
+from ledsockets.dto.TalkbackMessage import TalkbackMessage
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.server.ServerConnectionManager import ServerConnectionManager
+from ledsockets.support.Message import Message
+
+LOGGERS = ('ledsockets', 'ledsockets.server')
+
+
+def make_templates() -> List[AbstractDto]:
+    client = UiClient(str(uuid.uuid4()), None, 'Client A')
+    detail = ChangeDetail(True, False, 'Client A turned it on', 'Client A', 'turned it on', client.type, client.id)
+    state = HardwareState(True, "The light and buzzer are on.  If I'm around it's annoying me.", 'porch')
+    state.source = client
+    state.change_detail = detail
+    change = RosterChange(2, RosterChange.ACTION_JOINED)
+    change.ui_client = client
+    status = ServerStatus(True, 2)
+    status.set_relationship('hardware_state', state)
+    status.ui_client = client
+    return [client, HardwareClient('porch', None), state, PartialHardwareState(True), detail, change, status,
+            TalkbackMessage('Hello, client')]
+
+
+def get_fields(dto: AbstractDto) -> List[Tuple[str, Any]]:
+    names = [name for cls in reversed(type(dto).__mro__) for name in cls.__dict__.get('__slots__', ())]
+    return [(name, getattr(dto, name)) for name in names]
+
+
+def measure(factory: Callable[[int], object], count: int) -> float:
+    """
+    :return: bytes allocated per object made by factory(i) and kept alive
+    """
+    objects = [None] * count
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        objects[i] = factory(i)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size / count
+
+
+def layout_factory(cls: type, fields: List[Tuple[str, Any]]) -> Callable[[int], object]:
+    def factory(i):
+        instance = object.__new__(cls)
+        for name, value in fields:
+            setattr(instance, name, value)
+        return instance
+
+    return factory
+
+
+def make_opening(port: int) -> bytes:
+    """
+    :return: bytes a UI client sends to open its connection: the opening handshake and its init message
+    """
+    protocol = ClientProtocol(parse_uri(f'ws://localhost:{port}/'))
+    protocol.send_request(protocol.connect())
+    init = Message('init_client', {"data": UiClient('', None).toDict()}).encode()
+    return b''.join(protocol.data_to_send()) + Frame(Opcode.TEXT, init).serialize(mask=True, extensions=[])
+
+
+async def measure_connections(count: int) -> float:
+    """
+    :return: bytes allocated per UI client connected to and registered by a ServerConnectionManager
+    """
+    loop = asyncio.get_running_loop()
+    # Joins are coalesced so announcing them doesn't swamp the run with count² presence frames
+    manager = ServerConnectionManager(presence_coalesce_window=0.1, heartbeat_interval=30, resume_window=60)
+    await manager.start()
+    # One extra connection warms up anything allocated once, on the first connection, before measuring
+    peers = [socket.socket() for _ in range(count + 1)]
+    try:
+        async with serve(manager.handle, 'localhost', 0, backlog=count, max_size=manager.max_frame_size,
+                         close_timeout=0.1) as server:
+            port = server.sockets[0].getsockname()[1]
+            opening = make_opening(port)
+
+            async def connect(peer: socket.socket):
+                peer.setblocking(False)
+                await loop.sock_connect(peer, ('localhost', port))
+                await loop.sock_sendall(peer, opening)
+
+            async def settle(connected: int):
+                while len(manager._client_connections) != connected:
+                    await asyncio.sleep(0.01)
+                # Let the last coalesced presence changes go out
+                await asyncio.sleep(0.2)
+
+            await connect(peers[0])
+            await settle(1)
+            gc.collect()
+            tracemalloc.start()
+            start = tracemalloc.get_traced_memory()[0]
+            await asyncio.gather(*(connect(peer) for peer in peers[1:]))
+            await settle(count + 1)
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0] - start
+            tracemalloc.stop()
+
+            # Leave as clients going away do, so the server closes each connection cleanly
+            closing = Frame(Opcode.CLOSE, Close(1001, '').serialize()).serialize(mask=True, extensions=[])
+            await asyncio.gather(*(loop.sock_sendall(peer, closing) for peer in peers))
+            await settle(0)
+    finally:
+        for peer in peers:
+            peer.close()
+        await manager.stop()
+    return size / count
+
+
+def run(instances: int, connections: int) -> Dict:
+    dtos = []
+    for template in make_templates():
+        fields = get_fields(template)
+        dict_layout = type(f'{type(template).__name__}Dict', (), {})
+        dtos.append({
+            "type": template.type,
+            "slots_bytes": round(measure(layout_factory(type(template), fields), instances)),
+            "dict_bytes": round(measure(layout_factory(dict_layout, fields), instances)),
+        })
+    connection_bytes = asyncio.run(measure_connections(connections))
+    client_layout = next(dto for dto in dtos if dto['type'] == UiClient.TYPE)
+    return {
+        "instances": instances,
+        "connections": connections,
+        "per_connection_bytes": round(connection_bytes),
+        "per_connection_dict_bytes": round(
+            connection_bytes - client_layout['slots_bytes'] + client_layout['dict_bytes']),
+        "dtos": dtos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure DTO memory with slots against an instance __dict__, and memory per connected client')
+    parser.add_argument('--instances', type=int, default=10000, help='instances measured per DTO type')
+    parser.add_argument('--connections', type=int, default=1000, help='UI clients connected to the server')
+    parser.add_argument('--log-level', default='ERROR', help='level of the server logs, which go to stdout')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    for name in LOGGERS:
+        logging.getLogger(name).setLevel(args.log_level)
+    results = run(args.instances, args.connections)
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"bytes per DTO instance at {results['instances']} instances")
+    print(f"{'dto':<24} {'slots':>7} {'__dict__':>9} {'saved':>6}")
+    for row in results['dtos']:
+        saved = 1 - row['slots_bytes'] / row['dict_bytes']
+        print(f"{row['type']:<24} {row['slots_bytes']:>7} {row['dict_bytes']:>9} {saved:>6.0%}")
+    print(f"\nbytes per connected client at {results['connections']} connections: {results['per_connection_bytes']} "
+          f"(an estimated {results['per_connection_dict_bytes']} with a __dict__ UiClient)")
+
+
+if __name__ == '__main__':
+    main()
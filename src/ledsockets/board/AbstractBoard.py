@@ -1,3 +1,4 @@
+import os
 from abc import ABC, abstractmethod
 
 from ledsockets.log.LogsConcern import Logs
@@ -17,6 +18,18 @@ class AbstractBoard(ABC, Logs):
         for handler in self.button_press_handlers:
             handler(button)
 
+    @staticmethod
+    def from_environment() -> 'AbstractBoard':
+        """
+        A MockBoard if MOCK_BOARD is "true", otherwise the Pi's Board.  Board is only imported when one is made, since
+        it needs gpiozero, which is only installed on the Pi
+        """
+        if os.getenv('MOCK_BOARD', 'false').lower() == 'true':
+            from ledsockets.board.MockBoard import MockBoard
+            return MockBoard()
+        from ledsockets.board.Board import Board
+        return Board()
+
     def add_button_press_handler(self, handler):
         self._log('adding button press handler')
         self.button_press_handlers.append(handler)
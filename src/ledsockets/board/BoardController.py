@@ -1,12 +1,9 @@
 import asyncio
-import os
 import time
 
 from dotenv import load_dotenv
 
 from ledsockets.board.AbstractBoard import AbstractBoard
-from ledsockets.board.Board import Board
-from ledsockets.board.MockBoard import MockBoard
 from ledsockets.log.LogsConcern import Logs
 
 
@@ -115,11 +112,7 @@ def main():
     def example_button_handler(button):
         print('button press heard')
 
-    MOCK_BOARD = os.getenv('MOCK_BOARD', 'false').lower() == 'true'
-    if MOCK_BOARD:
-        board = MockBoard()
-    else:
-        board = Board()
+    board = AbstractBoard.from_environment()
 
     board.add_button_press_handler(example_button_handler)
 
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import os
 import signal
 from functools import partial
@@ -7,12 +6,16 @@ from functools import partial
 from dotenv import load_dotenv
 from websockets.asyncio.client import connect, ClientConnection
 
-from ledsockets.board.Board import Board
-from ledsockets.board.MockBoard import MockBoard
+from ledsockets.board.AbstractBoard import AbstractBoard
 from ledsockets.client.ClientEventHandler import ClientEventHandler
+from ledsockets.codec.AbstractCodec import AbstractCodec
+from ledsockets.codec.Codecs import Codecs
 from ledsockets.contracts.MessageBroker import MessageBroker
+from ledsockets.dto.AbstractDto import DTOInvalidException
+from ledsockets.dto.ReconnectHint import ReconnectHint
 from ledsockets.dto.TalkbackMessage import TalkbackMessage
 from ledsockets.log.LogsConcern import Logs
+from ledsockets.support.Message import Message, MessageException
 
 
 class ClientConnectionError(Exception):
@@ -29,9 +32,14 @@ class Client(Logs, MessageBroker):
     LOGGER_NAME = 'ledsockets.client.manager'
     CONNECTION_CLOSING_MESSAGE = 'I am dying'
     AUTO_RECONNECT_INTERVAL_CONFIG = [1, 60, 60 * 5, 60 * 10]
+    # Used instead once the server has said when to reconnect: it's coming back, just maybe not right on time
+    HINTED_RECONNECT_INTERVAL_CONFIG = [1, 2, 5, 10, 30, 60, 60 * 5, 60 * 10]
     IS_DEVELOPMENT = os.getenv('APP_ENV', 'production').lower() == 'local'
 
-    def __init__(self, host_url, handler: ClientEventHandler):
+    def __init__(self, host_url, handler: ClientEventHandler, codec: AbstractCodec = Codecs.DEFAULT):
+        """
+        :param codec: AbstractCodec to ask the server for; JSON is used until the server agrees to it
+        """
         Logs.__init__(self)
         self._host_url: str = host_url
         self._stop_event = asyncio.Event()
@@ -46,22 +54,66 @@ class Client(Logs, MessageBroker):
         self._awaiting_reconnect = False
         self._reconnect_event: asyncio.Event = asyncio.Event()
         self._reconnect_intervals = self.AUTO_RECONNECT_INTERVAL_CONFIG.copy()
+        # Event loop time the server asked us to reconnect at when it closes the connection
+        self._reconnect_at: float | None = None
+        self._preferred_codec = codec
+        if not codec.negotiable:
+            self._log(f'The {codec.NAME} codec is unavailable (is its optional dependency installed?); using JSON',
+                      'warning')
+        # Codec the server agreed to for the current connection
+        self._codec: AbstractCodec = Codecs.DEFAULT
         self._log('Created', 'debug')
 
-    async def send_message(self, message: str, connection=None):
-        self._log(f"Sending message: {message}", 'debug')
+    async def send_message(self, message: Message, connection=None):
+        self._log('Sending message: %s %s', 'debug', message.type, message.payload)
         target: ClientConnection = connection if connection else self._connection
         if not target:
             raise Exception('Unable to send message without a target')
 
-        await target.send(message)
+        await message.send(target, self._codec)
 
     async def _on_message(self, message: str, connection):
         if self._shutting_down:
             return
 
-        self._log(f'Server says: {message}  {connection.remote_address}', 'debug')
-        await self._handler.on_message(message, connection)
+        self._log('Server says: %s  %s', 'debug', message, connection.remote_address)
+        try:
+            parsed = Message.parse(message)
+        except (MessageException, TypeError, IndexError):
+            # Not ours to report; the handler deals with invalid messages
+            parsed = None
+        if parsed:
+            self._record_codec(parsed)
+            if self._record_reconnect_hint(parsed):
+                return
+        # Parsed once here; the handler only parses frames that couldn't be, to report them
+        await self._handler.on_message(parsed or message, connection)
+
+    def _record_codec(self, parsed: Message):
+        meta = parsed.payload.get('meta') if isinstance(parsed.payload, dict) else None
+        name = meta.get('codec') if isinstance(meta, dict) else None
+        codec = Codecs.get(name) if isinstance(name, str) else None
+        if codec and codec is not self._codec:
+            self._log(f'Server agreed to the {codec.NAME} codec', 'info')
+            self._codec = codec
+
+    def _record_reconnect_hint(self, parsed: Message):
+        """
+        Note when to reconnect if the server is about to close the connection
+
+        :return: bool whether the message was a reconnect hint
+        """
+        if parsed.type != 'server_draining':
+            return False
+        try:
+            hint = ReconnectHint.from_message(parsed)
+        except DTOInvalidException as e:
+            self._log(f'Ignoring invalid reconnect hint: {e}', 'warning')
+            return True
+        self._reconnect_at = self._event_loop.time() + hint.reconnect_after
+        self._reconnect_intervals = self.HINTED_RECONNECT_INTERVAL_CONFIG.copy()
+        self._log(f'Server draining; will reconnect {hint.reconnect_after}s from now', 'info')
+        return True
 
     async def _listen(self, connection: ClientConnection):
         self._log('Listening to connection', 'debug')
@@ -98,16 +150,18 @@ class Client(Logs, MessageBroker):
         self._connection = connection
         self._handler.on_connection_open(connection)
         self._log('Sending init message', 'debug')
-        await self.send_message(json.dumps([
-            'init_hardware',
-            {
-                "data": self._handler.state.toDict()
-            }
-        ]), connection)
+        payload = {
+            "data": self._handler.state.toDict()
+        }
+        if self._preferred_codec is not Codecs.DEFAULT and self._preferred_codec.negotiable:
+            payload['meta'] = {"codecs": [self._preferred_codec.NAME, Codecs.DEFAULT.NAME]}
+        await self.send_message(Message('init_hardware', payload), connection)
 
     async def _on_connection_opened(self, connection):
         # Reset active reconnect config on successful connections
         self._reconnect_intervals = self.AUTO_RECONNECT_INTERVAL_CONFIG.copy()
+        self._reconnect_at = None
+        self._codec = Codecs.DEFAULT
         await self._do_connection_init(connection)
         self._handler.on_initialized(connection)
 
@@ -139,7 +193,12 @@ class Client(Logs, MessageBroker):
         tasks.append(asyncio.create_task(self._reconnect_event.wait()))
         if len(self._reconnect_intervals):
             self._handler.on_auto_reconnect_pending()
-            time = self._reconnect_intervals.pop(0)
+            if self._reconnect_at is not None:
+                # The server said when to come back; retries follow quickly if it isn't back yet
+                time = max(0.0, round(self._reconnect_at - self._event_loop.time(), 3))
+                self._reconnect_at = None
+            else:
+                time = self._reconnect_intervals.pop(0)
             self._log(
                 f'Automatically reconnecting in ({time}s; {len(self._reconnect_intervals)} attempts remaining)',
                 'info')
@@ -201,12 +260,9 @@ class Client(Logs, MessageBroker):
         if self._connection:
             self._log('Broadcasting impending death', 'debug')
             try:
-                await asyncio.create_task(self.send_message(json.dumps([
-                    'talkback_message',
-                    {
-                        "data": TalkbackMessage(self.CONNECTION_CLOSING_MESSAGE).toDict()
-                    }
-                ]), self._connection))
+                await asyncio.create_task(self.send_message(Message('talkback_message', {
+                    "data": TalkbackMessage(self.CONNECTION_CLOSING_MESSAGE).toDict()
+                }), self._connection))
             except Exception as e:
                 self._log(f"Failed to send shutdown message: {e}", 'warning')
 
@@ -215,6 +271,12 @@ class Client(Logs, MessageBroker):
     def _handle_sigterm(self, sig):
         asyncio.create_task(self._trigger_shutdown(sig))
 
+    async def stop(self):
+        """
+        Say goodbye, disconnect and stop reconnecting, as SIGTERM does
+        """
+        await self._trigger_shutdown(signal.SIGTERM)
+
     async def run(self):
         self._log(f"Starting (pid {os.getpid()})", 'info')
         loop = asyncio.get_running_loop()
@@ -230,20 +292,18 @@ class Client(Logs, MessageBroker):
 
 
 async def run_client():
-    MOCK_BOARD = os.getenv('MOCK_BOARD', 'false').lower() == 'true'
-    if MOCK_BOARD:
-        board = MockBoard()
-    else:
-        board = Board()
+    board = AbstractBoard.from_environment()
 
     board.run()
 
     handler = ClientEventHandler(
         board=board,
+        device_id=os.getenv('HARDWARE_DEVICE_ID', ''),
     )
     client = Client(
         host_url=os.getenv('HARDWARE_SOCKET_URL', 'ws://localhost:8765'),
-        handler=handler
+        handler=handler,
+        codec=Codecs.get(os.getenv('HARDWARE_CODEC', Codecs.DEFAULT.NAME)) or Codecs.DEFAULT,
     )
     await client.run()
 
@@ -1,21 +1,21 @@
 import asyncio
-import json
-import os
+import time
+from typing import Dict
 
 from dotenv import load_dotenv
 
 from ledsockets.board.AbstractBoard import AbstractBoard
-from ledsockets.board.Board import Board
 from ledsockets.board.BoardController import BoardController
-from ledsockets.board.MockBoard import MockBoard
 from ledsockets.contracts.MessageBroker import MessageBroker
-from ledsockets.dto.AbstractDto import DTOInvalidPayloadException
+from ledsockets.dto.AbstractDto import DTOInvalidException
 from ledsockets.dto.ChangeDetail import ChangeDetail
 from ledsockets.dto.HardwareState import HardwareState
 from ledsockets.dto.PartialHardwareState import PartialHardwareState
 from ledsockets.dto.TalkbackMessage import TalkbackMessage
 from ledsockets.log.LogsConcern import Logs
+from ledsockets.support.LatencyMiddleware import LatencyMiddleware
 from ledsockets.support.Message import Message, MessageException
+from ledsockets.support.MessageDispatcher import MessageDispatcher, UnhandledMessageException
 
 
 class ServerMessageException(Exception):
@@ -28,15 +28,25 @@ class ClientEventHandler(Logs):
     Handles events received by a hardware Client (connection)
     """
     LOGGER_NAME = 'ledsockets.client.handler'
+    # Role the server's messages are registered under
+    ROLE_SERVER = 'server'
 
-    def __init__(self, board: AbstractBoard):
+    def __init__(self, board: AbstractBoard, device_id=''):
+        """
+        :param device_id: str id the server knows this device by; empty for the server's default device
+        """
         Logs.__init__(self)
-        self._state: HardwareState = HardwareState()
+        self._state: HardwareState = HardwareState(id=device_id)
         self._board: AbstractBoard = board
         self._board.add_button_press_handler(self._on_board_button_press)
         self._connection = None
         self._message_broker: MessageBroker | None = None
         self._event_loop: asyncio.AbstractEventLoop | None = None
+        self._dispatcher = MessageDispatcher()
+        self._handler_latency = LatencyMiddleware()
+        self._dispatcher.use(self._handler_latency)
+        self._dispatcher.register(self.ROLE_SERVER, 'talkback_message', self._on_talkback_message)
+        self._dispatcher.register(self.ROLE_SERVER, 'patch_hardware_state', self._on_patch_hardware_state_message)
         self._log('Created', 'debug')
 
     def add_button_press_handler(self, callback):
@@ -66,6 +76,12 @@ class ClientEventHandler(Logs):
     def state(self):
         return self._state.copy()
 
+    def get_handler_latencies(self) -> Dict[str, Dict]:
+        """
+        Summaries of message handler latencies in seconds, keyed by message type
+        """
+        return self._handler_latency.get_snapshots().get(self.ROLE_SERVER, {})
+
     def _on_board_button_press(self, button=None):
         self._log('Button press received')
         if self._state.on:
@@ -73,6 +89,8 @@ class ClientEventHandler(Logs):
             self._board.set_blue(False)
             self._state.on = False
             self._state.status_description = ""
+            # Not answering a patch
+            self._state.correlation_id = None
             change_detail = ChangeDetail.from_attributes({
                 "description": f"I turned it off at the source",
                 "source_name": "I",
@@ -86,12 +104,9 @@ class ClientEventHandler(Logs):
                 payload = self._state
                 payload.change_detail = change_detail
                 asyncio.run_coroutine_threadsafe(
-                    self._message_broker.send_message(json.dumps([
-                        'hardware_updated',
-                        {
-                            "data": payload.toDict()
-                        }
-                    ])),
+                    self._message_broker.send_message(Message('hardware_updated', {
+                        "data": payload.toDict()
+                    })),
                     self._event_loop
                 )
             except AttributeError as e:
@@ -128,6 +143,8 @@ class ClientEventHandler(Logs):
     async def _handle_message_exception(self, e: Exception, message):
         match e:
             case ServerMessageException():
+                if isinstance(message, Message):
+                    message = [message.type, message.payload]
                 self._log(f'Ignoring invalid message ({e}): "{message}"', 'info')
             case _:
                 raise e
@@ -136,23 +153,28 @@ class ClientEventHandler(Logs):
         try:
             talkback = TalkbackMessage.from_message(message)
             self._log(f'Talkback message received: "{talkback.message}"', 'info')
-        except DTOInvalidPayloadException as e:
+        except DTOInvalidException as e:
             raise ServerMessageException(f'Invalid talkback payload "{e}"')
 
     async def _on_patch_hardware_state_message(self, message: Message):
+        # Timestamps of each stage, sent back for the server to trace the patch by
+        trace = {"received": time.perf_counter()}
         try:
             dto = PartialHardwareState.from_message(message)
             source = dto.source
-        except KeyError as e:
+        except (DTOInvalidException, KeyError) as e:
             raise ServerMessageException(f'Invalid talkback payload "{e}"')
 
         original_value = self._state.on
+        self._state.correlation_id = dto.correlation_id
 
         if dto.on:
             self._state.on = True
             self._state.status_description = "The light and buzzer are on.  If I'm around it's annoying me."
+            trace['gpio_start'] = time.perf_counter()
             self._board.set_blue(True)
             self._board.buzz()
+            trace['gpio_end'] = time.perf_counter()
             change_detail = ChangeDetail.from_attributes({
                 "description": f"{source.name} turned it on",
                 "source_name": source.name,
@@ -166,8 +188,10 @@ class ClientEventHandler(Logs):
         else:
             self._state.on = False
             self._state.status_description = ""
+            trace['gpio_start'] = time.perf_counter()
             self._board.set_blue(False)
             self._board.buzz(False)
+            trace['gpio_end'] = time.perf_counter()
             change_detail = ChangeDetail.from_attributes({
                 "description": f"{source.name} turned it off",
                 "source_name": source.name,
@@ -182,30 +206,29 @@ class ClientEventHandler(Logs):
         payload.source = dto.source
         payload.change_detail = change_detail
 
-        await self.message_broker.send_message(json.dumps([
-            'hardware_updated',
-            {
-                "data": payload.toDict()
-            }
-        ]))
+        trace['sent'] = time.perf_counter()
+        await self.message_broker.send_message(Message('hardware_updated', {
+            "data": payload.toDict(),
+            "meta": {"trace": trace},
+        }))
 
-    async def _process_message(self, message: str):
-        try:
-            message = Message.parse(message)
-            message_type = message.type
-        except MessageException as e:
-            raise ServerMessageException(str(e)) from e
-
-        match message_type:
-            case 'talkback_message':
-                await self._on_talkback_message(message)
-            case 'patch_hardware_state':
-                await self._on_patch_hardware_state_message(message)
-            case _:
-                raise ServerMessageException(f'Unsupported payload type "{message_type}"')
+    async def _process_message(self, message: Message | str | bytes):
+        if not isinstance(message, Message):
+            try:
+                message = Message.parse(message)
+            except MessageException as e:
+                raise ServerMessageException(str(e)) from e
+        self._log('Handling message: %s %s', 'debug', message.type, message.payload)
 
-    async def on_message(self, message, connection):
-        self._log(f'Handling message: {message}', 'debug')
+        try:
+            await self._dispatcher.dispatch(self.ROLE_SERVER, message)
+        except UnhandledMessageException as e:
+            raise ServerMessageException(f'Unsupported payload type "{message.type}"') from e
+
+    async def on_message(self, message: Message | str | bytes, connection):
+        """
+        :param message: Message already parsed from a frame, or a frame that's yet to be
+        """
         try:
             await self._process_message(message)
         except Exception as e:
@@ -213,17 +236,13 @@ class ClientEventHandler(Logs):
 
 
 async def main():
-    MOCK_BOARD = os.getenv('MOCK_BOARD', 'false').lower() == 'true'
-    if MOCK_BOARD:
-        board = MockBoard()
-    else:
-        board = Board()
+    board = AbstractBoard.from_environment()
 
     board.run()
 
     class MockMessageBroker(MessageBroker):
         def send_message(self, message):
-            print(f"Mock send: {message}")
+            print(f"Mock send: {message.toJson()}")
 
     handler = ClientEventHandler(board=board, )
     handler.event_loop = asyncio.get_running_loop()
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class CodecException(Exception):
+    """Exception raised when a frame can't be decoded"""
+    pass
+
+
+class AbstractCodec(ABC):
+    """
+    Encoding of message frames on the wire, negotiated per connection
+    """
+    NAME = ''
+    # Whether frames are sent as binary rather than text websocket frames
+    BINARY = False
+
+    @property
+    def negotiable(self) -> bool:
+        """
+        Whether to agree to this codec when it's offered, and to offer it
+        """
+        return True
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """
+        :return: the value encoded as the payload of a websocket frame
+        """
+        pass
+
+    @abstractmethod
+    def read_type(self, data: str | bytes) -> str:
+        """
+        Read the message type from the start of an encoded `[type, payload]` frame without decoding the payload
+
+        :raises CodecException: if the frame doesn't open with a plain message type
+        """
+        pass
+
+    @abstractmethod
+    def loads(self, data: str | bytes) -> Any:
+        """
+        :raises CodecException: if the data can't be decoded
+        """
+        pass
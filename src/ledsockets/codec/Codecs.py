@@ -0,0 +1,49 @@
+from typing import Dict
+
+from ledsockets.codec.AbstractCodec import AbstractCodec
+from ledsockets.codec.JsonCodec import JsonCodec
+from ledsockets.codec.PackedCodec import PackedCodec
+
+
+class Codecs:
+    """
+    The wire codecs a connection can negotiate
+
+    A client offers the codecs it accepts, most preferred first, as `codecs` in the meta of its init message, and is
+    told which one it got as `codec` in the meta of the first message sent back.  Frames are recognised by their first
+    byte rather than by what was negotiated (every JSON frame opens with `[`, after any whitespace, while every packed
+    frame opens with an array header, which is neither), so either end can always fall back to JSON, e.g. for errors sent
+    before a connection is initialized
+    """
+    JSON = JsonCodec()
+    PACKED = PackedCodec()
+    DEFAULT = JSON
+    BY_NAME: Dict[str, AbstractCodec] = {codec.NAME: codec for codec in (JSON, PACKED)}
+    JSON_FRAME_START = ord('[')
+    JSON_WHITESPACE = b' \t\r\n'
+
+    @classmethod
+    def get(cls, name: str) -> AbstractCodec | None:
+        return cls.BY_NAME.get(name)
+
+    @classmethod
+    def negotiate(cls, offered) -> AbstractCodec:
+        """
+        :param offered: names of the codecs a client accepts, most preferred first
+        :return: the first offered codec that's supported and negotiable, or the default
+        """
+        if isinstance(offered, list):
+            for name in offered:
+                codec = cls.BY_NAME.get(name) if isinstance(name, str) else None
+                if codec and codec.negotiable:
+                    return codec
+        return cls.DEFAULT
+
+    @classmethod
+    def for_frame(cls, frame: str | bytes) -> AbstractCodec:
+        if isinstance(frame, str):
+            return cls.JSON
+        for byte in frame:
+            if byte not in cls.JSON_WHITESPACE:
+                return cls.JSON if byte == cls.JSON_FRAME_START else cls.PACKED
+        return cls.JSON
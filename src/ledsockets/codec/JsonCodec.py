@@ -0,0 +1,59 @@
+import json
+import re
+from typing import Any
+
+from ledsockets.codec.AbstractCodec import AbstractCodec, CodecException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec(AbstractCodec):
+    """
+    JSON text frames; the default, and what every client understands
+
+    Encoded with orjson when it's installed, falling back to the standard library.  Both produce the same compact
+    UTF-8 bytes, which go out as text frames without being decoded to a str first
+    """
+    NAME = 'json'
+    # Message types are plain names, so a frame opens with one well within the first few bytes: `["type",`
+    TYPE_PREFIX = re.compile(r'\s*\[\s*"(\w{1,64})"\s*,', re.ASCII)
+    TYPE_PREFIX_BYTES = re.compile(rb'\s*\[\s*"(\w{1,64})"\s*,')
+    TYPE_PREFIX_LENGTH = 128
+
+    def __init__(self, accelerated=True):
+        """
+        :param accelerated: use orjson if it's installed
+        """
+        self.accelerated = accelerated and orjson is not None
+        self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    @property
+    def backend(self) -> str:
+        return 'orjson' if self.accelerated else 'json'
+
+    def dumps(self, value: Any) -> bytes:
+        if self.accelerated:
+            return orjson.dumps(value)
+        return self._encoder.encode(value).encode()
+
+    def read_type(self, data: str | bytes) -> str:
+        if isinstance(data, str):
+            match = self.TYPE_PREFIX.match(data, 0, self.TYPE_PREFIX_LENGTH)
+            if match:
+                return match.group(1)
+        else:
+            match = self.TYPE_PREFIX_BYTES.match(data, 0, self.TYPE_PREFIX_LENGTH)
+            if match:
+                return match.group(1).decode()
+        raise CodecException('No message type provided')
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            if self.accelerated:
+                return orjson.loads(data)
+            return json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise CodecException('Non-JSON payload') from e
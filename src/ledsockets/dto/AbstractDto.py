@@ -1,45 +1,117 @@
 import json
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
+from ledsockets.codec.AbstractCodec import AbstractCodec
+from ledsockets.codec.Codecs import Codecs
 from ledsockets.support.Message import Message
+from ledsockets.support.Sideloader import Sideloader
 
 
-class DTOInvalidAttributesException(Exception):
+class DTOInvalidException(Exception):
+    """Exception raised when a document can't be read as a DTO"""
     pass
 
 
-class DTOInvalidPayloadException(Exception):
+class DTOInvalidAttributesException(DTOInvalidException):
+    pass
+
+
+class DTOInvalidPayloadException(DTOInvalidException):
     pass
 
 
 class AbstractDto(ABC):
     TYPE = ''
+    # DTOs are made for every connection and every event, so they keep their fields in slots rather than an instance
+    # __dict__; subclasses declare slots for the fields they add
+    __slots__ = ('_id', 'relationships', '_version', '_dict', '_encoded')
+    # Reader compiled from types.yaml (see SchemaCompiler) that checks a document and returns its fields as a tuple for
+    # _from_fields; DTOs without one are read by from_dict's generic checks and _inst_from_attributes
+    _read = None
 
     def __init__(self, id=''):
-        self.id = id
+        self._version = 0
+        # Serializations cached until the next change: the document and its encodings keyed by codec name
+        self._dict = None
+        self._encoded = None
+        self._id = id
         self.relationships = None
 
     @property
     def type(self):
         return self.TYPE
 
-    def toJSON(self):
-        result = self.toDict()
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, val):
+        self._id = val
+        self.touch()
+
+    @property
+    def version(self) -> int:
+        """
+        Number of changes made to the DTO, bumped by touch()
+        """
+        return self._version
+
+    def touch(self):
+        """
+        Record a change to the DTO, dropping its cached serializations.  Property setters and the relationship methods
+        call this themselves; call it after changing any other field of a DTO that may already have been serialized
+        """
+        self._version += 1
+        self._dict = None
+        self._encoded = None
+
+    def toJSON(self) -> str:
+        return json.dumps(self.toDict())
 
-        return json.dumps(result)
+    def encode(self, codec: AbstractCodec | None = None) -> bytes:
+        """
+        The DTO encoded with codec (by default, the default codec), cached until it changes
+        """
+        codec = codec or Codecs.DEFAULT
+        if self._encoded is None:
+            self._encoded = {}
+        encoded = self._encoded.get(codec.NAME)
+        if encoded is None:
+            encoded = self._encoded[codec.NAME] = codec.dumps(self.toDict())
+        return encoded
 
     def toDict(self):
+        """
+        The DTO as a document, cached until it changes, so treat it as read only.  Related DTOs are serialized when
+        they're set, so a parent shares their cached documents
+        """
+        if self._dict is not None:
+            return self._dict
         result = {
             "type": self.TYPE,
-            "id": self.id,
+            "id": self._id,
             "attributes": self.get_attributes()
         }
         relationships = self.get_relationships()
         if relationships:
             result['relationships'] = relationships
+        self._dict = result
         return result
 
+    def toDocument(self, included=False) -> Dict:
+        """
+        The DTO as a top level `{"data": ...}` document
+
+        :param included: sideload related resources that appear more than once into the document's `included` list,
+            leaving type/id references in their place; see Sideloader
+        """
+        if not included:
+            return {"data": self.toDict()}
+        data, resources = Sideloader(self.toDict()).sideload()
+        return {"data": data, "included": resources} if resources else {"data": data}
+
     @abstractmethod
     def get_attributes(self):
         pass
@@ -62,6 +134,7 @@ class AbstractDto(ABC):
         self.relationships[key] = {
             "data": data
         }
+        self.touch()
 
     def append_relationship(self, key, model):
         """
@@ -86,23 +159,32 @@ class AbstractDto(ABC):
             raise DTOInvalidPayloadException('Is not a list')
 
         data_list.append(data)
+        self.touch()
 
     def remove_relationship(self, key: str):
         if (self.relationships):
             if key in self.relationships.keys():
                 del self.relationships[key]
+                self.touch()
 
     @classmethod
     def from_attributes(self, attributes: Dict, id: str = ''):
         if not isinstance(attributes, Dict):
             raise DTOInvalidPayloadException('Attributes are not an object')
+        if self._read is not None:
+            return self.from_dict({"type": self.TYPE, "id": id, "attributes": attributes}, self.TYPE)
         try:
             return self._inst_from_attributes(attributes, id)
         except KeyError as e:
             raise DTOInvalidAttributesException(f'Invalid {self.TYPE} attributes') from e
 
     @classmethod
-    def from_dict(self, json_data: Dict):
+    def from_dict(self, json_data: Dict, path: str = 'data'):
+        """
+        :param path: where json_data is in the message, for errors naming the invalid field
+        """
+        if self._read is not None:
+            return self._from_fields(self._read(json_data, path))
         if not isinstance(json_data, Dict):
             raise DTOInvalidAttributesException('Dictionary is not an object')
 
@@ -119,7 +201,10 @@ class AbstractDto(ABC):
         return inst
 
     @classmethod
-    @abstractmethod
+    def _from_fields(cls, fields: Tuple):
+        raise Exception(f'"_from_fields" not defined for {cls.TYPE}')
+
+    @classmethod
     def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
         raise Exception(f'"_inst_from_attributes" not defined for {cls.TYPE}')
 
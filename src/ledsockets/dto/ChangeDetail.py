@@ -1,10 +1,14 @@
-from typing import Dict
+from typing import Tuple
 
 from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto._compiled import read_change_detail, write_change_detail_attributes
 
 
 class ChangeDetail(AbstractDto):
     TYPE = 'change_detail'
+    __slots__ = ('new_value', 'old_value', 'description', 'source_name', 'action_description', 'source_type',
+                 'source_id')
+    _read = staticmethod(read_change_detail)
 
     def __init__(self, new_value: None, old_value: None, description='', source_name='', action_description='',
                  source_type='', source_id='', id=''):
@@ -18,24 +22,9 @@ class ChangeDetail(AbstractDto):
         self.source_id = source_id
 
     def get_attributes(self):
-        return {
-            "new_value": self.new_value,
-            "old_value": self.old_value,
-            "description": self.description,
-            "source_name": self.source_name,
-            "action_description": self.action_description,
-            "source_type": self.source_type,
-            "source_id": self.source_id,
-        }
+        return write_change_detail_attributes(self)
 
     @classmethod
-    def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
-        return cls(
-            attributes.get('new_value'),
-            attributes.get('old_value'),
-            attributes.get('description'),
-            attributes.get('source_name'),
-            attributes.get('action_description'),
-            attributes.get('source_type'),
-            attributes.get('source_id'),
-        )
+    def _from_fields(cls, fields: Tuple):
+        id, description, source_name, action_description, source_type, source_id, old_value, new_value = fields
+        return cls(new_value, old_value, description, source_name, action_description, source_type, source_id, id)
@@ -0,0 +1,25 @@
+from typing import List, Tuple
+
+from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto._compiled import read_device_subscription, write_device_subscription_attributes
+
+
+class DeviceSubscription(AbstractDto):
+    """
+    The hardware devices a UI client wants updates for.  `device_ids` of None subscribes to every device
+    """
+    TYPE = 'device_subscription'
+    __slots__ = ('device_ids',)
+    _read = staticmethod(read_device_subscription)
+
+    def __init__(self, device_ids: List[str] | None = None, id=''):
+        super().__init__(id)
+        self.device_ids = device_ids
+
+    def get_attributes(self):
+        return write_device_subscription_attributes(self)
+
+    @classmethod
+    def _from_fields(cls, fields: Tuple):
+        id, device_ids = fields
+        return cls(device_ids, id)
@@ -1,18 +1,25 @@
-from typing import Dict
+from typing import Tuple
 
+from ledsockets.codec.Codecs import Codecs
 from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto._compiled import read_hardware_client, write_hardware_client_attributes
 
 
 class HardwareClient(AbstractDto):
     TYPE = 'hardware_client'
+    __slots__ = ('connection', 'codec')
+    _read = staticmethod(read_hardware_client)
 
     def __init__(self, id, connection):
         super().__init__(id)
         self.connection = connection
+        # AbstractCodec negotiated for frames sent to the hardware; assigned by the server
+        self.codec = Codecs.DEFAULT
 
     def get_attributes(self):
-        return {}
+        return write_hardware_client_attributes(self)
 
     @classmethod
-    def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
+    def _from_fields(cls, fields: Tuple):
+        id, = fields
         return cls(id, None)
@@ -1,20 +1,51 @@
-from typing import Dict
+from typing import Tuple
 
 from ledsockets.dto.AbstractDto import AbstractDto
 from ledsockets.dto.ChangeDetail import ChangeDetail
 from ledsockets.dto.UiClient import UiClient
+from ledsockets.dto._compiled import read_hardware_state, write_hardware_state_attributes
 
 
 class HardwareState(AbstractDto):
     TYPE = 'hardware_state'
+    __slots__ = ('_on', '_status_description', '_correlation_id', '_source', '_change_detail')
+    _read = staticmethod(read_hardware_state)
 
-    def __init__(self, on=False, status_description='', id=''):
+    def __init__(self, on=False, status_description='', id='', correlation_id: str | None = None):
         super().__init__(id)
         self.on = on
         self.status_description = status_description
+        self.correlation_id = correlation_id
         self._source = None
         self._change_detail = None
 
+    @property
+    def on(self):
+        return self._on
+
+    @on.setter
+    def on(self, val):
+        self._on = val
+        self.touch()
+
+    @property
+    def status_description(self):
+        return self._status_description
+
+    @status_description.setter
+    def status_description(self, val):
+        self._status_description = val
+        self.touch()
+
+    @property
+    def correlation_id(self):
+        return self._correlation_id
+
+    @correlation_id.setter
+    def correlation_id(self, val: str | None):
+        self._correlation_id = val
+        self.touch()
+
     @property
     def source(self):
         return self._source
@@ -42,35 +73,17 @@ class HardwareState(AbstractDto):
             self.remove_relationship('change_detail')
 
     def get_attributes(self):
-        return {
-            "on": self.on,
-            "status_description": self.status_description
-        }
+        return write_hardware_state_attributes(self)
 
     def copy(self):
-        return HardwareState(self.on, self.status_description)
+        return HardwareState(self.on, self.status_description, self.id, self.correlation_id)
 
     @classmethod
-    def from_dict(self, json_data: Dict):
-        instance = super().from_dict(json_data)
-        relationships = json_data.get('relationships')
-        if (relationships):
-            source_relationship = relationships.get('source')
-            source_relation_data = source_relationship.get('data') if source_relationship else None
-            if (source_relation_data):
-                if (source_relation_data.get('type') == 'ui_client'):
-                    client = UiClient.from_dict(source_relation_data)
-                    instance.source = client
-
-            change_relation = relationships.get('change_detail')
-            change_relation_data = change_relation.get('data') if change_relation else None
-            if (change_relation_data):
-                if (change_relation_data.get('type') == 'change_detail'):
-                    detail = ChangeDetail.from_dict(change_relation_data)
-                    instance.change_detail = detail
-
+    def _from_fields(cls, fields: Tuple):
+        id, on, status_description, correlation_id, source, change_detail = fields
+        instance = cls(on, status_description, id, correlation_id)
+        if source:
+            instance.source = UiClient._from_fields(source)
+        if change_detail:
+            instance.change_detail = ChangeDetail._from_fields(change_detail)
         return instance
-
-    @classmethod
-    def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
-        return cls(attributes['on'], attributes['status_description'], id)
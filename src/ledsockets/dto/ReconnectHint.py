@@ -0,0 +1,28 @@
+from typing import Tuple
+
+from ledsockets.dto.AbstractDto import AbstractDto, DTOInvalidAttributesException
+from ledsockets.dto._compiled import read_reconnect_hint, write_reconnect_hint_attributes
+
+
+class ReconnectHint(AbstractDto):
+    """
+    Sent to a client whose connection is about to be closed: how many seconds to wait before reconnecting, so clients
+    spread their reconnects out instead of all arriving at once
+    """
+    TYPE = 'reconnect_hint'
+    __slots__ = ('reconnect_after',)
+    _read = staticmethod(read_reconnect_hint)
+
+    def __init__(self, reconnect_after: float, id=''):
+        super().__init__(id)
+        self.reconnect_after = reconnect_after
+
+    def get_attributes(self):
+        return write_reconnect_hint_attributes(self)
+
+    @classmethod
+    def _from_fields(cls, fields: Tuple):
+        id, reconnect_after = fields
+        if reconnect_after < 0:
+            raise DTOInvalidAttributesException('reconnect_after must be a non-negative number of seconds')
+        return cls(reconnect_after, id)
@@ -0,0 +1,64 @@
+from typing import Tuple
+
+from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.dto._compiled import read_roster_change, write_roster_change_attributes
+
+
+class RosterChange(AbstractDto):
+    """
+    A single change to the connected client roster.  `version` is the roster version after the change was applied;
+    a receiver whose known version isn't `version - 1` has missed a change and should request a full status
+    """
+    TYPE = 'roster_change'
+    _read = staticmethod(read_roster_change)
+    ACTION_JOINED = 'joined'
+    ACTION_LEFT = 'left'
+    ACTION_RENAMED = 'renamed'
+    __slots__ = ('version', 'action', '_ui_client', '_change_detail')
+
+    def __init__(self, version: int, action: str, id=''):
+        super().__init__(id)
+        self.version = version
+        self.action = action
+        self._ui_client = None
+        self._change_detail = None
+
+    @property
+    def ui_client(self):
+        return self._ui_client
+
+    @ui_client.setter
+    def ui_client(self, val: UiClient | None):
+        self._ui_client = val
+        if (val):
+            self.set_relationship('ui_client', val)
+        else:
+            self.remove_relationship('ui_client')
+
+    @property
+    def change_detail(self):
+        return self._change_detail
+
+    @change_detail.setter
+    def change_detail(self, val: ChangeDetail | None):
+        if (not isinstance(val, ChangeDetail)):
+            raise TypeError("Invalid change_detail")
+        self._change_detail = val
+        if (val):
+            self.set_relationship('change_detail', val)
+        else:
+            self.remove_relationship('change_detail')
+
+    def get_attributes(self):
+        return write_roster_change_attributes(self)
+
+    @classmethod
+    def _from_fields(cls, fields: Tuple):
+        id, version, action, ui_client, change_detail = fields
+        instance = cls(version, action, id)
+        instance.ui_client = UiClient._from_fields(ui_client)
+        if change_detail:
+            instance.change_detail = ChangeDetail._from_fields(change_detail)
+        return instance
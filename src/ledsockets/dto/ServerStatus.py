@@ -1,16 +1,23 @@
-from typing import Dict
+from typing import Tuple
 
 from ledsockets.dto.AbstractDto import AbstractDto
 from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.HardwareClient import HardwareClient
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.dto.TalkbackMessage import TalkbackMessage
 from ledsockets.dto.UiClient import UiClient
+from ledsockets.dto._compiled import read_server_status, write_server_status_attributes
 
 
 class ServerStatus(AbstractDto):
     TYPE = 'server_status'
+    __slots__ = ('hardware_is_connected', 'roster_version', '_ui_client', '_change_detail')
+    _read = staticmethod(read_server_status)
 
-    def __init__(self, hardware_is_connected: bool, id=''):
+    def __init__(self, hardware_is_connected: bool, roster_version: int = 0, id=''):
         super().__init__(id)
         self.hardware_is_connected = hardware_is_connected
+        self.roster_version = roster_version
         self._ui_client = None
         self._change_detail = None
 
@@ -41,24 +48,24 @@ class ServerStatus(AbstractDto):
             self.remove_relationship('change_detail')
 
     def get_attributes(self):
-        return {
-            'hardware_is_connected': self.hardware_is_connected
-        }
+        return write_server_status_attributes(self)
 
     @classmethod
-    def from_dict(self, json_data: Dict):
-        instance = super().from_dict(json_data)
-        relationships = json_data.get('relationships')
-        if (relationships):
-            change_relation = relationships.get('change_detail')
-            change_relation_data = change_relation.get('data') if change_relation else None
-            if (change_relation_data):
-                if (change_relation_data.get('type') == 'change_detail'):
-                    detail = ChangeDetail.from_dict(change_relation_data)
-                    instance.change_detail = detail
-
+    def _from_fields(cls, fields: Tuple):
+        (id, hardware_is_connected, roster_version, hardware_state, hardware_client, hardware_states, hardware_clients,
+         ui_clients, ui_client, talkback_messages, change_detail) = fields
+        instance = cls(hardware_is_connected, roster_version, id)
+        instance.set_relationship('hardware_state', HardwareState._from_fields(hardware_state))
+        if hardware_client:
+            instance.set_relationship('hardware_client', HardwareClient._from_fields(hardware_client))
+        for key, model_class, models in (('hardware_states', HardwareState, hardware_states),
+                                         ('hardware_clients', HardwareClient, hardware_clients),
+                                         ('ui_clients', UiClient, ui_clients),
+                                         ('talkback_messages', TalkbackMessage, talkback_messages)):
+            for model in models or []:
+                instance.append_relationship(key, model_class._from_fields(model))
+        if ui_client:
+            instance.ui_client = UiClient._from_fields(ui_client)
+        if change_detail:
+            instance.change_detail = ChangeDetail._from_fields(change_detail)
         return instance
-
-    @classmethod
-    def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
-        return cls(bool(attributes.get('hardware_is_connected')))
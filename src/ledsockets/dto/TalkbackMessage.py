@@ -1,20 +1,22 @@
-from typing import Dict
+from typing import Tuple
 
 from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto._compiled import read_talkback_message, write_talkback_message_attributes
 
 
 class TalkbackMessage(AbstractDto):
     TYPE = 'talkback_message'
+    __slots__ = ('message',)
+    _read = staticmethod(read_talkback_message)
 
     def __init__(self, message, id=""):
         AbstractDto.__init__(self, id)
         self.message = message
 
     def get_attributes(self):
-        return {
-            "message": self.message
-        }
+        return write_talkback_message_attributes(self)
 
     @classmethod
-    def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
-        return cls(attributes['message'], id)
+    def _from_fields(cls, fields: Tuple):
+        id, message = fields
+        return cls(message, id)
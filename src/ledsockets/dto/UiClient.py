@@ -1,22 +1,45 @@
-from typing import Dict
+from typing import Set, Tuple
 
+from ledsockets.codec.Codecs import Codecs
 from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto._compiled import read_ui_client, write_ui_client_attributes
 
 
 class UiClient(AbstractDto):
     TYPE = 'ui_client'
+    __slots__ = ('connection', '_name', 'outbox', 'device_ids', 'last_seen', 'resume_token', 'codec', 'included')
+    _read = staticmethod(read_ui_client)
 
     def __init__(self, id: str, connection, name=None):
         super().__init__(id)
         self.connection = connection
-        self.name: str | None = name
+        self.name = name
+        # ClientOutbox carrying frames to the connection; assigned by the server once the client is initialized
+        self.outbox = None
+        # Ids of the hardware devices the client is subscribed to; None for every device
+        self.device_ids: Set[str] | None = None
+        # Event loop time the client was last heard from; maintained by the server
+        self.last_seen = 0.0
+        # Token the client presents to resume its session after dropping; issued by the server
+        self.resume_token: str | None = None
+        # AbstractCodec negotiated for frames sent to the client; assigned by the server
+        self.codec = Codecs.DEFAULT
+        # Whether the client asked for related resources to be sideloaded into an `included` list
+        self.included = False
+
+    @property
+    def name(self) -> str | None:
+        return self._name
+
+    @name.setter
+    def name(self, val: str | None):
+        self._name = val
+        self.touch()
 
     def get_attributes(self):
-        return {
-            "name": self.name
-        }
+        return write_ui_client_attributes(self)
 
     @classmethod
-    def _inst_from_attributes(cls, attributes: Dict, id: str = ''):
-        inst = cls(id, None, attributes.get('name'))
-        return inst
+    def _from_fields(cls, fields: Tuple):
+        id, name = fields
+        return cls(id, None, name)
@@ -0,0 +1,323 @@
+# Generated from src/types/types.yaml by `python -m ledsockets.support.SchemaCompiler`; do not edit
+"""
+Validators and attribute serializers for the DTO types described in types.yaml; see SchemaCompiler
+"""
+from ledsockets.dto.AbstractDto import DTOInvalidAttributesException, DTOInvalidPayloadException
+
+_MISSING = object()
+_NO_RELATIONSHIPS = {}
+
+
+def _read_resource(data, path, resource_type):
+    if type(data) is not dict:
+        raise DTOInvalidPayloadException(f'{path} must be an object')
+    if data.get('type') != resource_type:
+        raise DTOInvalidPayloadException(f'{path}.type must be "{resource_type}"')
+    resource_id = data.get('id')
+    if resource_id is not None and type(resource_id) is not str:
+        raise DTOInvalidPayloadException(f'{path}.id must be a string')
+    attributes = data.get('attributes')
+    if type(attributes) is not dict:
+        raise DTOInvalidPayloadException(f'{path}.attributes must be an object')
+    return resource_id, attributes
+
+
+def _invalid_attribute(value, path, key, expected):
+    if value is _MISSING:
+        return DTOInvalidAttributesException(f'{path}.attributes.{key} is required')
+    return DTOInvalidAttributesException(f'{path}.attributes.{key} must be {expected}')
+
+
+def _read_relationships(data, path):
+    relationships = data.get('relationships')
+    if relationships is None:
+        return _NO_RELATIONSHIPS
+    if type(relationships) is not dict:
+        raise DTOInvalidPayloadException(f'{path}.relationships must be an object')
+    return relationships
+
+
+def _read_related(relationships, key, path, required):
+    """
+    :return: (the relationship's data, the path to it); data is None for a missing optional relationship
+    """
+    relationship = relationships.get(key)
+    if relationship is None:
+        if required:
+            raise DTOInvalidPayloadException(f'{path}.relationships.{key} is required')
+        return None, None
+    if type(relationship) is not dict or 'data' not in relationship:
+        raise DTOInvalidPayloadException(f'{path}.relationships.{key} must be an object with data')
+    related = relationship['data']
+    if related is None and required:
+        raise DTOInvalidPayloadException(f'{path}.relationships.{key}.data is required')
+    return related, f'{path}.relationships.{key}.data'
+
+
+def _read_list(related, path):
+    if type(related) is not list:
+        raise DTOInvalidPayloadException(f'{path} must be a list')
+    return related
+
+
+def read_change_detail(data, path='data'):
+    """
+    :return: (id, description, source_name, action_description, source_type, source_id, old_value, new_value)
+    """
+    resource_id, attributes = _read_resource(data, path, 'change_detail')
+    description = attributes.get('description', _MISSING)
+    if type(description) is not str:
+        raise _invalid_attribute(description, path, 'description', 'a string')
+    source_name = attributes.get('source_name', _MISSING)
+    if type(source_name) is not str:
+        raise _invalid_attribute(source_name, path, 'source_name', 'a string')
+    action_description = attributes.get('action_description', _MISSING)
+    if type(action_description) is not str:
+        raise _invalid_attribute(action_description, path, 'action_description', 'a string')
+    source_type = attributes.get('source_type', _MISSING)
+    if type(source_type) is not str:
+        raise _invalid_attribute(source_type, path, 'source_type', 'a string')
+    source_id = attributes.get('source_id', _MISSING)
+    if type(source_id) is not str:
+        raise _invalid_attribute(source_id, path, 'source_id', 'a string')
+    old_value = attributes.get('old_value', _MISSING)
+    if old_value is _MISSING:
+        raise _invalid_attribute(old_value, path, 'old_value', 'set')
+    new_value = attributes.get('new_value', _MISSING)
+    if new_value is _MISSING:
+        raise _invalid_attribute(new_value, path, 'new_value', 'set')
+    return resource_id, description, source_name, action_description, source_type, source_id, old_value, new_value
+
+
+def write_change_detail_attributes(dto):
+    return {
+        "description": dto.description,
+        "source_name": dto.source_name,
+        "action_description": dto.action_description,
+        "source_type": dto.source_type,
+        "source_id": dto.source_id,
+        "old_value": dto.old_value,
+        "new_value": dto.new_value,
+    }
+
+
+def read_hardware_client(data, path='data'):
+    """
+    :return: (id,)
+    """
+    resource_id, attributes = _read_resource(data, path, 'hardware_client')
+    return resource_id,
+
+
+def write_hardware_client_attributes(dto):
+    return {}
+
+
+def read_device_subscription(data, path='data'):
+    """
+    :return: (id, device_ids)
+    """
+    resource_id, attributes = _read_resource(data, path, 'device_subscription')
+    device_ids = attributes.get('device_ids', _MISSING)
+    if device_ids is not None and (type(device_ids) is not list or any(type(item) is not str for item in device_ids)):
+        raise _invalid_attribute(device_ids, path, 'device_ids', 'a list of strings or null')
+    return resource_id, device_ids
+
+
+def write_device_subscription_attributes(dto):
+    return {
+        "device_ids": dto.device_ids,
+    }
+
+
+def read_reconnect_hint(data, path='data'):
+    """
+    :return: (id, reconnect_after)
+    """
+    resource_id, attributes = _read_resource(data, path, 'reconnect_hint')
+    reconnect_after = attributes.get('reconnect_after', _MISSING)
+    if type(reconnect_after) is not int and type(reconnect_after) is not float:
+        raise _invalid_attribute(reconnect_after, path, 'reconnect_after', 'a number')
+    return resource_id, reconnect_after
+
+
+def write_reconnect_hint_attributes(dto):
+    return {
+        "reconnect_after": dto.reconnect_after,
+    }
+
+
+def read_hardware_state(data, path='data'):
+    """
+    :return: (id, on, status_description, correlation_id, source, change_detail)
+    """
+    resource_id, attributes = _read_resource(data, path, 'hardware_state')
+    on = attributes.get('on', _MISSING)
+    if type(on) is not bool:
+        raise _invalid_attribute(on, path, 'on', 'a boolean')
+    status_description = attributes.get('status_description', _MISSING)
+    if type(status_description) is not str:
+        raise _invalid_attribute(status_description, path, 'status_description', 'a string')
+    correlation_id = attributes.get('correlation_id')
+    if correlation_id is not None and type(correlation_id) is not str:
+        raise _invalid_attribute(correlation_id, path, 'correlation_id', 'a string')
+    relationships = _read_relationships(data, path)
+    related, related_path = _read_related(relationships, 'source', path, False)
+    source = None if related is None else read_ui_client(related, related_path)
+    related, related_path = _read_related(relationships, 'change_detail', path, False)
+    change_detail = None if related is None else read_change_detail(related, related_path)
+    return resource_id, on, status_description, correlation_id, source, change_detail
+
+
+def write_hardware_state_attributes(dto):
+    attributes = {
+        "on": dto.on,
+        "status_description": dto.status_description,
+    }
+    if dto.correlation_id is not None:
+        attributes['correlation_id'] = dto.correlation_id
+    return attributes
+
+
+def read_hardware_state_partial(data, path='data'):
+    """
+    :return: (id, on, status_description, correlation_id, source, change_detail)
+    """
+    resource_id, attributes = _read_resource(data, path, 'hardware_state_partial')
+    on = attributes.get('on')
+    if on is not None and type(on) is not bool:
+        raise _invalid_attribute(on, path, 'on', 'a boolean')
+    status_description = attributes.get('status_description')
+    if status_description is not None and type(status_description) is not str:
+        raise _invalid_attribute(status_description, path, 'status_description', 'a string')
+    correlation_id = attributes.get('correlation_id')
+    if correlation_id is not None and type(correlation_id) is not str:
+        raise _invalid_attribute(correlation_id, path, 'correlation_id', 'a string')
+    relationships = _read_relationships(data, path)
+    related, related_path = _read_related(relationships, 'source', path, False)
+    source = None if related is None else read_ui_client(related, related_path)
+    related, related_path = _read_related(relationships, 'change_detail', path, False)
+    change_detail = None if related is None else read_change_detail(related, related_path)
+    return resource_id, on, status_description, correlation_id, source, change_detail
+
+
+def write_hardware_state_partial_attributes(dto):
+    attributes = {}
+    if dto.on is not None:
+        attributes['on'] = dto.on
+    if dto.status_description is not None:
+        attributes['status_description'] = dto.status_description
+    if dto.correlation_id is not None:
+        attributes['correlation_id'] = dto.correlation_id
+    return attributes
+
+
+def read_server_status(data, path='data'):
+    """
+    :return: (id, hardware_is_connected, roster_version, hardware_state, hardware_client, hardware_states,
+        hardware_clients, ui_clients, ui_client, talkback_messages, change_detail)
+    """
+    resource_id, attributes = _read_resource(data, path, 'server_status')
+    hardware_is_connected = attributes.get('hardware_is_connected', _MISSING)
+    if type(hardware_is_connected) is not bool:
+        raise _invalid_attribute(hardware_is_connected, path, 'hardware_is_connected', 'a boolean')
+    roster_version = attributes.get('roster_version', _MISSING)
+    if type(roster_version) is not int:
+        raise _invalid_attribute(roster_version, path, 'roster_version', 'an integer')
+    relationships = _read_relationships(data, path)
+    related, related_path = _read_related(relationships, 'hardware_state', path, True)
+    hardware_state = None if related is None else read_hardware_state(related, related_path)
+    related, related_path = _read_related(relationships, 'hardware_client', path, False)
+    hardware_client = None if related is None else read_hardware_client(related, related_path)
+    related, related_path = _read_related(relationships, 'hardware_states', path, False)
+    hardware_states = None if related is None else [
+        read_hardware_state(item, f'{related_path}[{i}]') for i, item in enumerate(_read_list(related, related_path))
+    ]
+    related, related_path = _read_related(relationships, 'hardware_clients', path, False)
+    hardware_clients = None if related is None else [
+        read_hardware_client(item, f'{related_path}[{i}]') for i, item in enumerate(_read_list(related, related_path))
+    ]
+    related, related_path = _read_related(relationships, 'ui_clients', path, False)
+    ui_clients = None if related is None else [
+        read_ui_client(item, f'{related_path}[{i}]') for i, item in enumerate(_read_list(related, related_path))
+    ]
+    related, related_path = _read_related(relationships, 'ui_client', path, False)
+    ui_client = None if related is None else read_ui_client(related, related_path)
+    related, related_path = _read_related(relationships, 'talkback_messages', path, False)
+    talkback_messages = None if related is None else [
+        read_talkback_message(item, f'{related_path}[{i}]') for i, item in enumerate(_read_list(related, related_path))
+    ]
+    related, related_path = _read_related(relationships, 'change_detail', path, False)
+    change_detail = None if related is None else read_change_detail(related, related_path)
+    return (
+        resource_id, hardware_is_connected, roster_version, hardware_state, hardware_client, hardware_states,
+        hardware_clients, ui_clients, ui_client, talkback_messages, change_detail
+    )
+
+
+def write_server_status_attributes(dto):
+    return {
+        "hardware_is_connected": dto.hardware_is_connected,
+        "roster_version": dto.roster_version,
+    }
+
+
+def read_roster_change(data, path='data'):
+    """
+    :return: (id, version, action, ui_client, change_detail)
+    """
+    resource_id, attributes = _read_resource(data, path, 'roster_change')
+    version = attributes.get('version', _MISSING)
+    if type(version) is not int:
+        raise _invalid_attribute(version, path, 'version', 'an integer')
+    action = attributes.get('action', _MISSING)
+    if type(action) is not str:
+        raise _invalid_attribute(action, path, 'action', 'a string')
+    relationships = _read_relationships(data, path)
+    related, related_path = _read_related(relationships, 'ui_client', path, True)
+    ui_client = None if related is None else read_ui_client(related, related_path)
+    related, related_path = _read_related(relationships, 'change_detail', path, False)
+    change_detail = None if related is None else read_change_detail(related, related_path)
+    return resource_id, version, action, ui_client, change_detail
+
+
+def write_roster_change_attributes(dto):
+    return {
+        "version": dto.version,
+        "action": dto.action,
+    }
+
+
+def read_talkback_message(data, path='data'):
+    """
+    :return: (id, message)
+    """
+    resource_id, attributes = _read_resource(data, path, 'talkback_message')
+    message = attributes.get('message', _MISSING)
+    if type(message) is not str:
+        raise _invalid_attribute(message, path, 'message', 'a string')
+    return resource_id, message
+
+
+def write_talkback_message_attributes(dto):
+    return {
+        "message": dto.message,
+    }
+
+
+def read_ui_client(data, path='data'):
+    """
+    :return: (id, name)
+    """
+    resource_id, attributes = _read_resource(data, path, 'ui_client')
+    name = attributes.get('name')
+    if name is not None and type(name) is not str:
+        raise _invalid_attribute(name, path, 'name', 'a string or null')
+    return resource_id, name
+
+
+def write_ui_client_attributes(dto):
+    attributes = {}
+    if dto.name is not None:
+        attributes['name'] = dto.name
+    return attributes
@@ -0,0 +1,81 @@
+from collections import Counter
+from typing import Iterable
+
+from websockets.asyncio.server import ServerConnection
+
+from ledsockets.log.LogsConcern import Logs
+
+
+class AdmissionController(Logs):
+    """
+    Decides whether a new connection may be served, capping total connections and connections per client IP
+
+    Behind a reverse proxy every connection comes from the proxy's address, so for peers listed in `trusted_proxies`
+    the client IP is taken from the proxy's X-Real-IP (or first X-Forwarded-For) header instead
+    """
+    LOGGER_NAME = 'ledsockets.server.admission'
+
+    def __init__(self, max_connections: int | None = None, max_connections_per_ip: int | None = None,
+                 retry_after: int = 5, trusted_proxies: Iterable[str] = ()):
+        """
+        :param max_connections: int total connections served at once; None for no limit
+        :param max_connections_per_ip: int connections served at once per client IP; None for no limit
+        :param retry_after: int seconds rejected clients are told to wait before retrying
+        :param trusted_proxies: IPs of reverse proxies whose forwarded-for headers are trusted
+        """
+        Logs.__init__(self)
+        self._max_connections = max_connections
+        self._max_connections_per_ip = max_connections_per_ip
+        self._retry_after = retry_after
+        self._trusted_proxies = frozenset(trusted_proxies)
+        self._count = 0
+        self._counts_by_ip = Counter()
+        self._rejected = 0
+
+    @property
+    def connection_count(self):
+        return self._count
+
+    @property
+    def rejected_count(self):
+        return self._rejected
+
+    @property
+    def retry_after(self):
+        return self._retry_after
+
+    def get_client_ip(self, websocket: ServerConnection) -> str:
+        peer_ip = websocket.remote_address[0] if websocket.remote_address else ''
+        if peer_ip in self._trusted_proxies and websocket.request:
+            headers = websocket.request.headers
+            forwarded = headers.get('X-Real-IP') or headers.get('X-Forwarded-For', '').split(',')[0].strip()
+            if forwarded:
+                return forwarded
+        return peer_ip
+
+    def admit(self, websocket: ServerConnection) -> str | None:
+        """
+        Count the connection in if there's room for it
+
+        :return: None if admitted (pair with `release`), otherwise the reason to reject it with
+        """
+        ip = self.get_client_ip(websocket)
+        if self._max_connections is not None and self._count >= self._max_connections:
+            reason = 'Server at capacity'
+        elif self._max_connections_per_ip is not None and self._counts_by_ip[ip] >= self._max_connections_per_ip:
+            reason = 'Too many connections from your address'
+        else:
+            self._count += 1
+            self._counts_by_ip[ip] += 1
+            return None
+
+        self._rejected += 1
+        self._log(f'Rejecting connection from {ip}: {reason}', 'info')
+        return f'{reason}; retry after {self._retry_after}s'
+
+    def release(self, websocket: ServerConnection):
+        ip = self.get_client_ip(websocket)
+        self._count -= 1
+        self._counts_by_ip[ip] -= 1
+        if self._counts_by_ip[ip] <= 0:
+            del self._counts_by_ip[ip]
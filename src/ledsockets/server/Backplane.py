@@ -0,0 +1,149 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List
+
+from ledsockets.codec.AbstractCodec import CodecException
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.log.LogsConcern import Logs
+
+
+class BackplaneException(Exception):
+    """Exception raised when the backplane connection is unavailable"""
+    pass
+
+
+class AbstractBackplane(ABC):
+    """
+    Pub/sub channel shared by the workers of a multi-worker server
+
+    Published messages are delivered to every other worker's subscribers as handler(topic, payload, origin_worker_id).
+    Claims grant exclusive ownership of a key (e.g. the hardware connection) to one worker at a time; claims held by a
+    worker that goes away are released and announced to the others with the `worker_left` topic
+    """
+    TOPIC_WORKER_LEFT = 'worker_left'
+
+    @property
+    @abstractmethod
+    def worker_id(self) -> str:
+        pass
+
+    @abstractmethod
+    async def start(self):
+        pass
+
+    @abstractmethod
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    def publish(self, topic: str, payload: Dict):
+        pass
+
+    @abstractmethod
+    def subscribe(self, handler: Callable[[str, Dict, str], None]):
+        pass
+
+    @abstractmethod
+    async def claim(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def release(self, key: str):
+        pass
+
+
+class UnixSocketBackplane(Logs, AbstractBackplane):
+    """
+    Worker end of a BackplaneHub, connected over a local Unix socket.  Messages are newline delimited JSON
+    """
+    LOGGER_NAME = 'ledsockets.server.backplane'
+    STREAM_LIMIT = 2 ** 24
+
+    def __init__(self, path: str, worker_id: str | None = None):
+        Logs.__init__(self)
+        self._path = path
+        self._worker_id = worker_id if worker_id else str(os.getpid())
+        self._handlers: List[Callable[[str, Dict, str], None]] = []
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._listen_task: asyncio.Task | None = None
+        self._claim_ref = 0
+        self._pending_claims: Dict[int, asyncio.Future] = {}
+
+    @property
+    def worker_id(self):
+        return self._worker_id
+
+    def _write(self, message: Dict):
+        if not self._writer:
+            raise BackplaneException('Backplane not connected')
+        self._writer.write(Codecs.JSON.dumps(message) + b'\n')
+
+    async def start(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self._path, limit=self.STREAM_LIMIT)
+        self._write({"op": "hello", "worker": self._worker_id})
+        self._listen_task = asyncio.create_task(self._listen())
+        self._log(f'Connected to backplane at {self._path} as worker {self._worker_id}', 'info')
+
+    async def stop(self):
+        if self._listen_task:
+            self._listen_task.cancel()
+            self._listen_task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    def publish(self, topic: str, payload: Dict):
+        self._write({"op": "publish", "topic": topic, "payload": payload})
+
+    def subscribe(self, handler: Callable[[str, Dict, str], None]):
+        self._handlers.append(handler)
+
+    async def claim(self, key: str) -> bool:
+        self._claim_ref += 1
+        ref = self._claim_ref
+        future = asyncio.get_running_loop().create_future()
+        self._pending_claims[ref] = future
+        self._write({"op": "claim", "key": key, "ref": ref})
+        try:
+            return await future
+        finally:
+            self._pending_claims.pop(ref, None)
+
+    def release(self, key: str):
+        self._write({"op": "release", "key": key})
+
+    def _dispatch(self, topic: str, payload: Dict, origin: str):
+        for handler in self._handlers:
+            try:
+                handler(topic, payload, origin)
+            except Exception:
+                self._log_exception(f'Backplane handler error ({topic})')
+
+    async def _listen(self):
+        async for line in self._reader:
+            # A bad frame is skipped rather than ending the listener, which would cut this worker off from the others
+            try:
+                message = Codecs.JSON.loads(line)
+            except CodecException as e:
+                self._log(f'Skipping backplane frame that failed to decode: {e}', 'warning')
+                continue
+            if not isinstance(message, dict):
+                self._log(f'Skipping backplane frame that is not an object: {message}', 'warning')
+                continue
+            match message.get('op'):
+                case 'message':
+                    self._dispatch(message['topic'], message['payload'], message['worker'])
+                case 'claim_result':
+                    future = self._pending_claims.get(message['ref'])
+                    if future and not future.done():
+                        future.set_result(message['granted'])
+                case 'worker_left':
+                    self._dispatch(self.TOPIC_WORKER_LEFT, {"keys": message['keys']}, message['worker'])
+                case _:
+                    self._log(f'Ignoring unknown backplane message: {message}', 'warning')
+        self._log('Backplane connection closed', 'error')
+        for future in self._pending_claims.values():
+            if not future.done():
+                future.set_exception(BackplaneException('Backplane connection closed'))
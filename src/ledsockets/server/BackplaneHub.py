@@ -0,0 +1,102 @@
+import asyncio
+import os
+from typing import Dict
+
+from ledsockets.codec.AbstractCodec import CodecException
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.log.LogsConcern import Logs
+from ledsockets.server.Backplane import UnixSocketBackplane
+
+
+class BackplaneHub(Logs):
+    """
+    Relays backplane messages between worker processes over a local Unix socket and arbitrates claims
+
+    Every published message is written once to every other connected worker.  Each claim key has at most one owner;
+    when a worker disconnects its claims are released and the remaining workers are told via `worker_left`
+    """
+    LOGGER_NAME = 'ledsockets.server.backplane.hub'
+
+    def __init__(self, path: str):
+        Logs.__init__(self)
+        self._path = path
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: Dict[str, asyncio.StreamWriter] = {}
+        self._claims: Dict[str, str] = {}
+
+    @property
+    def path(self):
+        return self._path
+
+    async def start(self):
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self._path,
+                                                       limit=UnixSocketBackplane.STREAM_LIMIT)
+        self._log(f'Listening on {self._path}', 'info')
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            self._server = None
+        for writer in list(self._writers.values()):
+            writer.close()
+        self._writers.clear()
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+    def _relay(self, origin: str | None, message: Dict):
+        data = Codecs.JSON.dumps(message) + b'\n'
+        for worker_id, writer in self._writers.items():
+            if worker_id != origin:
+                writer.write(data)
+
+    def _on_claim(self, worker_id: str, message: Dict, writer: asyncio.StreamWriter):
+        key = message['key']
+        granted = self._claims.setdefault(key, worker_id) == worker_id
+        self._log(f'Worker {worker_id} claim on "{key}" {"granted" if granted else "refused"}', 'info')
+        writer.write(Codecs.JSON.dumps({"op": "claim_result", "ref": message['ref'], "granted": granted}) + b'\n')
+
+    def _on_release(self, worker_id: str, message: Dict):
+        key = message['key']
+        if self._claims.get(key) == worker_id:
+            del self._claims[key]
+            self._log(f'Worker {worker_id} released "{key}"', 'info')
+
+    def _on_worker_left(self, worker_id: str):
+        self._writers.pop(worker_id, None)
+        released = [key for key, owner in self._claims.items() if owner == worker_id]
+        for key in released:
+            del self._claims[key]
+        self._log(f'Worker {worker_id} left (released {released})', 'info')
+        self._relay(worker_id, {"op": "worker_left", "worker": worker_id, "keys": released})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        worker_id = None
+        try:
+            async for line in reader:
+                message = Codecs.JSON.loads(line)
+                match message.get('op'):
+                    case 'hello':
+                        worker_id = message['worker']
+                        self._writers[worker_id] = writer
+                        self._log(f'Worker {worker_id} connected', 'info')
+                    case 'publish':
+                        self._relay(worker_id, {
+                            "op": "message",
+                            "worker": worker_id,
+                            "topic": message['topic'],
+                            "payload": message['payload'],
+                        })
+                    case 'claim':
+                        self._on_claim(worker_id, message, writer)
+                    case 'release':
+                        self._on_release(worker_id, message)
+                    case _:
+                        self._log(f'Ignoring unknown message from worker {worker_id}: {message}', 'warning')
+        except (ConnectionError, CodecException) as e:
+            self._log(f'Worker {worker_id} connection error: {e}', 'warning')
+        finally:
+            if worker_id is not None:
+                self._on_worker_left(worker_id)
+            writer.close()
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Callable, Dict, Iterable, Tuple
+
+from ledsockets.log.LogsConcern import Logs
+from ledsockets.server.ClientOutbox import ClientOutbox
+from ledsockets.support.Message import Message
+
+
+class Broadcaster(Logs):
+    """
+    Writes a frame to many clients at once without awaiting any of them (in the spirit of `websockets.broadcast`)
+
+    Each frame is encoded once per broadcast for each codec its recipients negotiated (Messages keep their encodings)
+    and pushed to every recipient's ClientOutbox, which writes it straight through unless that client has fallen
+    behind.  Recipients that are closed or have fallen too far behind are
+    reported to `on_failed` on the next loop iteration, so failure handling never runs inside the fan-out loop
+    """
+    LOGGER_NAME = 'ledsockets.server.broadcaster'
+
+    def __init__(self, on_failed: Callable[[Dict[str, Exception]], None]):
+        Logs.__init__(self)
+        self._on_failed = on_failed
+
+    def broadcast(self, message: Message | str | bytes, recipients: Iterable[Tuple[str, ClientOutbox]],
+                  event_type: str | None = None):
+        """
+        :param message: Message | str | bytes message, or an encoded JSON frame; str is UTF-8 encoded once for all
+            recipients
+        :param recipients: (id, outbox) pairs
+        :param event_type: str the frame's message type
+        :return: int number of recipients the frame was handed to
+        """
+        frame = message.encode() if isinstance(message, str) else message
+        failed: Dict[str, Exception] | None = None
+        sent = 0
+        for recipient_id, outbox in recipients:
+            try:
+                outbox.push(frame, event_type)
+                sent += 1
+            except Exception as e:
+                if failed is None:
+                    failed = {}
+                failed[recipient_id] = e
+
+        if failed:
+            self._log(f'Broadcast skipped {len(failed)} recipient(s)', 'debug')
+            asyncio.get_running_loop().call_soon(self._on_failed, failed)
+
+        return sent
@@ -0,0 +1,169 @@
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Tuple
+
+from websockets.asyncio.server import ServerConnection
+from websockets.protocol import State
+
+from ledsockets.codec.AbstractCodec import AbstractCodec
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.log.LogsConcern import Logs
+from ledsockets.support.Message import Message
+
+
+class RecipientClosedException(Exception):
+    """Exception raised when pushing to an outbox whose connection is no longer open"""
+    pass
+
+
+class SlowRecipientException(Exception):
+    """Exception raised when a recipient falls far enough behind to be disconnected"""
+    pass
+
+
+class ClientOutbox(Logs):
+    """
+    Bounded outbound frame queue and writer task for a single client connection
+
+    Frames are written straight through to the connection while it keeps up.  Once its write buffer backs up past
+    `max_buffer_size`, frames queue here and the writer task sends them as the connection drains, so a slow reader only
+    ever delays itself.  When the queue grows past `max_size`, `policy` decides what is lost:
+        * drop_oldest: discard the oldest queued frames
+        * collapse: discard all but the latest queued `hardware_updated` frame, then the oldest frames
+        * disconnect: discard the oldest frames until `disconnect_threshold` frames have been dropped, then give up on
+          the client
+    """
+    LOGGER_NAME = 'ledsockets.server.outbox'
+    POLICY_DROP_OLDEST = 'drop_oldest'
+    POLICY_COLLAPSE = 'collapse'
+    POLICY_DISCONNECT = 'disconnect'
+    POLICIES = [POLICY_DROP_OLDEST, POLICY_COLLAPSE, POLICY_DISCONNECT]
+    COLLAPSIBLE_EVENT_TYPE = 'hardware_updated'
+    DEFAULT_MAX_SIZE = 64
+    DEFAULT_MAX_BUFFER_SIZE = 2 ** 16
+
+    def __init__(self, connection: ServerConnection, on_failed: Callable[[Exception], None],
+                 max_size=DEFAULT_MAX_SIZE, policy=POLICY_COLLAPSE, disconnect_threshold: int | None = None,
+                 max_buffer_size=DEFAULT_MAX_BUFFER_SIZE, codec: AbstractCodec = Codecs.DEFAULT, included=False):
+        """
+        :param on_failed: callable(exception) called when the writer task can no longer send to the connection
+        :param disconnect_threshold: int dropped frames tolerated by the disconnect policy; defaults to max_size
+        :param codec: AbstractCodec the client negotiated; Messages are encoded with it, and frames are sent as binary
+            if it's a binary codec
+        :param included: whether the client asked for related resources to be sideloaded; Messages are sent with
+            Message.sideloaded()
+        """
+        Logs.__init__(self)
+        if policy not in self.POLICIES:
+            raise ValueError(f'Invalid outbox policy "{policy}"')
+        self._connection = connection
+        self._on_failed = on_failed
+        self._max_size = max_size
+        self._policy = policy
+        self._disconnect_threshold = disconnect_threshold if disconnect_threshold is not None else max_size
+        self._max_buffer_size = max_buffer_size
+        self.codec = codec
+        self.included = included
+        self._queue: Deque[Tuple[str | None, bytes]] = deque()
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._sending = False
+        self._closed = False
+        self.dropped = 0
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def close(self):
+        self._closed = True
+        self._queue.clear()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _can_write_now(self):
+        return (not self._queue
+                and not self._sending
+                and self._connection.transport.get_write_buffer_size() <= self._max_buffer_size)
+
+    def push(self, frame: Message | str | bytes, event_type: str | None = None):
+        """
+        Send a frame without waiting on the connection
+
+        :param frame: Message | str | bytes message, or frame already encoded with the outbox's codec
+        :param event_type: str the frame's message type, used by the collapse policy
+        """
+        if self._closed:
+            raise RecipientClosedException('Outbox closed')
+        connection = self._connection
+        if connection.protocol.state is not State.OPEN:
+            raise RecipientClosedException('Connection not open')
+        if isinstance(frame, Message):
+            frame = (frame.sideloaded() if self.included else frame).encode(self.codec)
+        elif isinstance(frame, str):
+            frame = frame.encode()
+
+        if self._can_write_now():
+            if self.codec.BINARY:
+                connection.protocol.send_binary(frame)
+            else:
+                connection.protocol.send_text(frame)
+            connection.send_data()
+            return
+
+        self._queue.append((event_type, frame))
+        if len(self._queue) > self._max_size:
+            self._overflow()
+        self._ready.set()
+
+    def _collapse(self):
+        kept = deque()
+        latest_seen = False
+        for item in reversed(self._queue):
+            if item[0] == self.COLLAPSIBLE_EVENT_TYPE:
+                if latest_seen:
+                    self.dropped += 1
+                    continue
+                latest_seen = True
+            kept.appendleft(item)
+        self._queue = kept
+
+    def _overflow(self):
+        if self._policy == self.POLICY_COLLAPSE:
+            self._collapse()
+        while len(self._queue) > self._max_size:
+            self._queue.popleft()
+            self.dropped += 1
+        self._log(f'Outbox overflow ({self.dropped} frame(s) dropped so far)', 'debug')
+
+        if self._policy == self.POLICY_DISCONNECT and self.dropped >= self._disconnect_threshold:
+            self.close()
+            raise SlowRecipientException(f'Fell behind by {self.dropped} frame(s)')
+
+    async def _run(self):
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue:
+                    _, frame = self._queue.popleft()
+                    self._sending = True
+                    try:
+                        # send() waits for the connection to drain, pacing the queue to the reader
+                        await self._connection.send(frame, text=not self.codec.BINARY)
+                    finally:
+                        self._sending = False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._closed = True
+            self._queue.clear()
+            self._on_failed(e)
@@ -0,0 +1,80 @@
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, NamedTuple, Tuple
+
+from ledsockets.support.Message import Message
+
+
+class RingEntry(NamedTuple):
+    seq: int
+    message: Message
+    event_type: str | None
+    # Device the frame was only sent to subscribers of; None if it went to every client
+    device_id: str | None
+    exclude_ids: Tuple[str, ...]
+
+
+class EventRing:
+    """
+    Bounded log of the most recent broadcast messages, each numbered with a monotonic sequence number, so a client
+    that reconnects can be sent just the messages it missed rather than a full status
+    """
+    DEFAULT_SIZE = 1024
+
+    def __init__(self, size=DEFAULT_SIZE, seq=0):
+        """
+        :param size: int number of messages kept
+        :param seq: int sequence number to count on from
+        """
+        self._entries: Deque[RingEntry] = deque(maxlen=size)
+        self.seq = seq
+
+    def __len__(self):
+        return len(self._entries)
+
+    def append(self, message: Message, event_type: str | None = None, device_id: str | None = None,
+               exclude_ids=()) -> Message:
+        """
+        Number a message and keep it
+
+        :return: Message a copy of the message with its sequence number added to the payload as `seq`, keeping its
+            JSON encoding if it has one (see Message.with_seq)
+        """
+        self.seq += 1
+        sequenced = message.with_seq(self.seq)
+        self._entries.append(RingEntry(self.seq, sequenced, event_type, device_id, tuple(exclude_ids)))
+        return sequenced
+
+    def export_state(self) -> Dict:
+        """
+        The sequence number and kept messages, as JSON serializable data for `import_state`
+        """
+        return {
+            "seq": self.seq,
+            "entries": [[entry.seq, entry.message.type, entry.message.payload, entry.event_type, entry.device_id,
+                         list(entry.exclude_ids)] for entry in self._entries],
+        }
+
+    def import_state(self, state: Dict):
+        """
+        Carry on from the state exported by another ring, so sequence numbers it issued can still be resumed from
+        """
+        self._entries.clear()
+        for seq, message_type, payload, event_type, device_id, exclude_ids in state['entries']:
+            self._entries.append(RingEntry(seq, Message(message_type, payload), event_type, device_id,
+                                           tuple(exclude_ids)))
+        self.seq = state['seq']
+
+    def since(self, seq: int) -> List[RingEntry] | None:
+        """
+        The entries numbered after `seq`, oldest first
+
+        :return: None if some of those entries are no longer kept, or `seq` was never issued
+        """
+        if seq < 0 or seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+        if not self._entries or self._entries[0].seq > seq + 1:
+            return None
+        return list(islice(self._entries, seq + 1 - self._entries[0].seq, None))
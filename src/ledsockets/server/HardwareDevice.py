@@ -0,0 +1,31 @@
+from typing import Set
+
+from ledsockets.dto.HardwareClient import HardwareClient
+from ledsockets.dto.HardwareState import HardwareState
+
+
+class HardwareDevice:
+    """
+    A hardware device known to the server: its connection (if any), its latest state and the ids of the UI clients
+    subscribed to it.  Devices outlive their connections so subscriptions survive a reconnect
+    """
+    DEFAULT_ID = 'default'
+
+    def __init__(self, device_id: str):
+        self.id = device_id
+        self.hardware: HardwareClient | None = None
+        self.state: HardwareState = HardwareState(id=device_id)
+        self.subscriber_ids: Set[str] = set()
+        # perf_counter time of the oldest patch forwarded to the hardware and not yet answered by a hardware_updated
+        self.patch_sent_at: float | None = None
+
+    @property
+    def is_connected(self):
+        return self.hardware is not None
+
+    @property
+    def is_local(self):
+        """
+        Whether the device is connected to this process rather than to another worker
+        """
+        return self.hardware is not None and self.hardware.connection is not None
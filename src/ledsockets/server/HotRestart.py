@@ -0,0 +1,94 @@
+import os
+import socket
+import sys
+import tempfile
+from typing import Dict
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.log.LogsConcern import Logs
+
+
+class HotRestart(Logs):
+    """
+    Replaces a running server process with a fresh copy of itself without ever closing its listening socket
+
+    The old process keeps a copy of its listening socket, writes the state it hands over to an inherited temporary file
+    and then execs the new process in its place, so the pid (and any process supervisor's view of it) is unchanged.
+    Connections that arrive during the swap wait in the socket's backlog instead of being refused
+    """
+    LOGGER_NAME = 'ledsockets.server.restart'
+    LISTEN_FD_ENV = 'LEDSOCKETS_LISTEN_FD'
+    HANDOFF_FD_ENV = 'LEDSOCKETS_HANDOFF_FD'
+
+    def __init__(self, grace: float = 10.0, listen_socket: socket.socket | None = None, state: Dict | None = None):
+        """
+        :param grace: float seconds the handed over UI clients are held in the roster waiting for them to reconnect
+        :param listen_socket: socket inherited from the process this one replaced
+        :param state: Dict state handed over by the process this one replaced
+        """
+        Logs.__init__(self)
+        self.grace = grace
+        self.listen_socket = listen_socket
+        self.state = state
+        self._listen_fd: int | None = None
+        self._handoff_file = None
+
+    @staticmethod
+    def _pop_fd(name: str) -> int | None:
+        # Popped so the variables don't leak into anything this process starts
+        value = os.environ.pop(name, None)
+        return int(value) if value else None
+
+    @classmethod
+    def from_environment(cls, grace: float = 10.0):
+        """
+        Pick up the listening socket and state handed over by the process this one replaced, if any
+        """
+        listen_socket = None
+        state = None
+        listen_fd = cls._pop_fd(cls.LISTEN_FD_ENV)
+        if listen_fd is not None:
+            listen_socket = socket.socket(fileno=listen_fd)
+            listen_socket.set_inheritable(False)
+        handoff_fd = cls._pop_fd(cls.HANDOFF_FD_ENV)
+        if handoff_fd is not None:
+            with os.fdopen(handoff_fd, 'rb') as handoff_file:
+                state = Codecs.JSON.loads(handoff_file.read())
+        return cls(grace, listen_socket, state)
+
+    @property
+    def is_prepared(self):
+        return self._listen_fd is not None
+
+    def prepare(self, listen_socket: socket.socket, state: Dict):
+        """
+        Keep the listening socket open past the server closing it and write out the state to hand over.  Call before
+        the server stops listening
+        """
+        self._listen_fd = os.dup(listen_socket.fileno())
+        os.set_inheritable(self._listen_fd, True)
+        self._handoff_file = tempfile.TemporaryFile()
+        self._handoff_file.write(Codecs.JSON.dumps(state))
+        self._handoff_file.flush()
+        self._handoff_file.seek(0)
+        os.set_inheritable(self._handoff_file.fileno(), True)
+
+    def get_environment(self) -> Dict[str, str]:
+        """
+        Environment variables telling the replacement process where to find what's handed over
+        """
+        return {
+            self.LISTEN_FD_ENV: str(self._listen_fd),
+            self.HANDOFF_FD_ENV: str(self._handoff_file.fileno()),
+        }
+
+    def exec(self):
+        """
+        Replace this process with a new one started the same way.  Call once the event loop has shut down, so nothing
+        is left running when the process is replaced.  Does not return
+        """
+        os.environ.update(self.get_environment())
+        self._log(f'Restarting in place (pid {os.getpid()})', 'info')
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(sys.executable, sys.orig_argv)
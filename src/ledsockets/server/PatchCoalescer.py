@@ -0,0 +1,72 @@
+import asyncio
+from typing import Callable, Dict
+
+from ledsockets.dto.PartialHardwareState import PartialHardwareState
+from ledsockets.log.LogsConcern import Logs
+
+
+class PatchCoalescer(Logs):
+    """
+    Limits `patch_hardware_state` traffic to each device to at most one patch per tick
+
+    The first patch for an idle device is forwarded straight away and starts a tick.  Patches arriving during the tick
+    are merged into a single pending intent (later values win, attributed to the latest requester and traced by its
+    correlation id), which is forwarded when the tick ends and starts another.  A tick of 0 disables coalescing and
+    forwards every patch
+    """
+    LOGGER_NAME = 'ledsockets.server.patches'
+
+    def __init__(self, send: Callable[[str, PartialHardwareState], None], tick: float = 0.0):
+        """
+        :param send: callable(device_id, patch) that forwards a patch to a device
+        :param tick: float minimum seconds between patches forwarded to the same device
+        """
+        Logs.__init__(self)
+        self._send = send
+        self._tick = tick
+        self._pending: Dict[str, PartialHardwareState] = {}
+        self._tick_handles: Dict[str, asyncio.TimerHandle] = {}
+
+    @property
+    def tick(self):
+        return self._tick
+
+    def _merge(self, pending: PartialHardwareState, patch: PartialHardwareState):
+        if patch.on is not None:
+            pending.on = patch.on
+        if patch.status_description is not None:
+            pending.status_description = patch.status_description
+        pending.source = patch.source
+        pending.correlation_id = patch.correlation_id
+
+    def _forward(self, device_id: str, patch: PartialHardwareState):
+        self._send(device_id, patch)
+        if self._tick > 0:
+            self._tick_handles[device_id] = asyncio.get_running_loop().call_later(self._tick, self._on_tick, device_id)
+
+    def _on_tick(self, device_id: str):
+        del self._tick_handles[device_id]
+        patch = self._pending.pop(device_id, None)
+        if patch is not None:
+            self._forward(device_id, patch)
+
+    def add(self, device_id: str, patch: PartialHardwareState):
+        if device_id not in self._tick_handles:
+            self._forward(device_id, patch)
+            return
+
+        pending = self._pending.get(device_id)
+        if pending is None:
+            self._pending[device_id] = patch
+        else:
+            self._log(f'Coalescing patch for device "{device_id}"', 'debug')
+            self._merge(pending, patch)
+
+    def discard(self, device_id: str):
+        """
+        Drop any pending patch for a device, e.g. once it disconnects
+        """
+        self._pending.pop(device_id, None)
+        handle = self._tick_handles.pop(device_id, None)
+        if handle is not None:
+            handle.cancel()
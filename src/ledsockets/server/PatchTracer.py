@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from typing import Dict, Mapping, Tuple
+
+from ledsockets.support.Metrics import MetricFamily
+
+
+class PatchTracer:
+    """
+    Times each patch from the moment a UI client's request reaches the server to the broadcast of the state it led to,
+    hop by hop, keyed by the client that sent it and its correlation id (see `get_trace_key`)
+
+    The server records its own stages as they happen (`perf_counter` seconds); the hardware reports its stages, on its
+    own clock, with the hardware_updated it answers with.  Timestamps from the two clocks are never compared: hops on
+    the hardware are differences between its stages, and the network hop is what's left of the server's wait once the
+    time spent on the hardware is taken out.  Hops whose stages weren't both recorded (e.g. a patch that came in
+    through another worker) are skipped, and traces that never finish (e.g. patches merged into a later one) are
+    forgotten once `max_pending` newer ones have started
+    """
+    # Server stages
+    STAGE_RECEIVED = 'received'
+    STAGE_FORWARDED = 'forwarded'
+    STAGE_UPDATED = 'updated'
+    STAGE_BROADCAST = 'broadcast'
+    # Hops, each the time between two stages on the same clock
+    SERVER_HOPS = {
+        # Waiting out the device's patch tick
+        'coalesce': (STAGE_RECEIVED, STAGE_FORWARDED),
+        # Handling the update and handing it to the UI clients' outboxes
+        'fanout': (STAGE_UPDATED, STAGE_BROADCAST),
+        'total': (STAGE_RECEIVED, STAGE_BROADCAST),
+    }
+    DEVICE_HOPS = {
+        # Everything between the patch being received and the update being sent, on the hardware
+        'device': ('received', 'sent'),
+        # Setting the pins
+        'gpio': ('gpio_start', 'gpio_end'),
+    }
+    HOP_NETWORK = 'network'
+    DEFAULT_MAX_PENDING = 256
+
+    def __init__(self, histograms: MetricFamily | None = None, max_pending=DEFAULT_MAX_PENDING):
+        """
+        :param histograms: histogram family labelled by hop to record into, e.g. one registered with a MetricsRegistry;
+            a private one with the default buckets if not provided
+        :param max_pending: int unfinished traces kept
+        """
+        if histograms is None:
+            histograms = MetricFamily('patch_hop_seconds', 'Patch latency by hop', MetricFamily.HISTOGRAM, ['hop'])
+        self.histograms = histograms
+        self._max_pending = max_pending
+        self._traces: OrderedDict[Tuple[str, str], Dict[str, float]] = OrderedDict()
+
+    @staticmethod
+    def get_trace_key(source_id: str | None, correlation_id: str | None) -> Tuple[str, str] | None:
+        """
+        Key for the trace of a patch.  Correlation ids are chosen by clients, so they're only unique per client: two
+        clients sending the same id (or one replaying another's) get separate traces
+
+        :param source_id: id of the UI client that sent the patch
+        :return: None for patches that can't be traced
+        """
+        if not correlation_id:
+            return None
+        return source_id or '', correlation_id
+
+    def record(self, key: Tuple[str, str] | None, stage: str, now: float):
+        """
+        Record the time a patch reached a stage, starting its trace if it hasn't been seen yet
+
+        :param key: the patch's trace key (see `get_trace_key`)
+        """
+        if not key:
+            return
+        trace = self._traces.get(key)
+        if trace is None:
+            trace = self._traces[key] = {}
+            if len(self._traces) > self._max_pending:
+                self._traces.popitem(last=False)
+        trace.setdefault(stage, now)
+
+    def finish(self, key: Tuple[str, str] | None, now: float,
+               device_stages: Mapping | None = None) -> Dict[str, float]:
+        """
+        Record the broadcast of a patch's resulting state and its hops
+
+        :param key: the patch's trace key (see `get_trace_key`)
+        :param device_stages: the hardware's own timestamps for its stages
+        :return: the hops recorded, in seconds
+        """
+        trace = self._traces.pop(key, None) if key else None
+        if trace is None:
+            return {}
+        trace.setdefault(self.STAGE_BROADCAST, now)
+        # Reported by the hardware, so only well-formed stages are used
+        device_stages = {stage: value for stage, value in device_stages.items()
+                         if isinstance(stage, str) and type(value) in (int, float)} \
+            if isinstance(device_stages, Mapping) else {}
+
+        hops = {}
+        for stages, stage_hops in ((trace, self.SERVER_HOPS), (device_stages, self.DEVICE_HOPS)):
+            for hop, (start, end) in stage_hops.items():
+                if start in stages and end in stages:
+                    hops[hop] = stages[end] - stages[start]
+        if self.STAGE_FORWARDED in trace and self.STAGE_UPDATED in trace and 'device' in hops:
+            hops[self.HOP_NETWORK] = trace[self.STAGE_UPDATED] - trace[self.STAGE_FORWARDED] - hops['device']
+        for hop, seconds in hops.items():
+            self.histograms.labels(hop).observe(max(0.0, seconds))
+        return hops
+
+    def get_snapshots(self) -> Dict[str, Dict]:
+        """
+        Summaries of each hop's latency in seconds (see Histogram.snapshot), keyed by hop
+        """
+        return {hop: histogram.snapshot() for (hop,), histogram in self.histograms.children.items()}
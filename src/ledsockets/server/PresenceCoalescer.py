@@ -0,0 +1,78 @@
+import asyncio
+from typing import Callable, List
+
+from ledsockets.dto.RosterChange import RosterChange
+from ledsockets.log.LogsConcern import Logs
+from ledsockets.support.Message import Message
+
+
+class PresenceCoalescer(Logs):
+    """
+    Batches roster changes that arrive within a short window into a single `presence_batch` message
+
+    The window starts with the first pending change and is never extended, so no change waits longer than `window`
+    seconds.  A window of 0 disables coalescing and sends each change as its own event.  A lone change in a window is
+    also sent as its own event
+    """
+    LOGGER_NAME = 'ledsockets.server.presence'
+    BATCH_EVENT_TYPE = 'presence_batch'
+    EVENT_TYPES = {
+        RosterChange.ACTION_JOINED: 'client_joined',
+        RosterChange.ACTION_LEFT: 'client_disconnect',
+        RosterChange.ACTION_RENAMED: 'client_name_changed',
+    }
+    DEFAULT_MAX_BATCH_SIZE = 500
+
+    def __init__(self, send: Callable[..., None], window: float = 0.0, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        """
+        :param send: callable(message, exclude_ids=None, event_type=None) that broadcasts a Message
+        :param window: float coalescing window in seconds
+        :param max_batch_size: int flush early once this many changes are pending
+        """
+        Logs.__init__(self)
+        self._send = send
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending: List[RosterChange] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def window(self):
+        return self._window
+
+    def _encode_change(self, change: RosterChange):
+        return Message(self.EVENT_TYPES[change.action], {
+            "data": change.toDict()
+        })
+
+    def add(self, change: RosterChange, exclude_ids=None):
+        """
+        :param exclude_ids: recipients to skip when the change is sent immediately.  Batched changes go to everyone;
+            receivers skip changes already reflected in their roster version
+        """
+        if self._window <= 0:
+            self._send(self._encode_change(change), exclude_ids=exclude_ids,
+                       event_type=self.EVENT_TYPES[change.action])
+            return
+
+        self._pending.append(change)
+        if len(self._pending) >= self._max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self._window, self.flush)
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if len(pending) == 1:
+            self._send(self._encode_change(pending[0]), event_type=self.EVENT_TYPES[pending[0].action])
+            return
+
+        self._log(f'Sending {len(pending)} coalesced roster change(s)', 'debug')
+        self._send(Message(self.BATCH_EVENT_TYPE, {
+            "data": [change.toDict() for change in pending]
+        }), event_type=self.BATCH_EVENT_TYPE)
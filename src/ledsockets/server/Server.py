@@ -1,17 +1,30 @@
 import asyncio
-import json
 import os
+import random
 import signal
+import tempfile
 from functools import partial
+from http import HTTPStatus
 
 from dotenv import load_dotenv
 from websockets.asyncio.server import ServerConnection
 from websockets.asyncio.server import serve
 from websockets.exceptions import ConnectionClosedOK, ConnectionClosedError
+from websockets.http11 import Request
 
+from ledsockets.dto.ReconnectHint import ReconnectHint
 from ledsockets.dto.TalkbackMessage import TalkbackMessage
 from ledsockets.log.LogsConcern import Logs
+from ledsockets.server.AdmissionController import AdmissionController
+from ledsockets.server.Backplane import AbstractBackplane, UnixSocketBackplane
+from ledsockets.server.ClientOutbox import ClientOutbox
+from ledsockets.server.EventRing import EventRing
+from ledsockets.server.HotRestart import HotRestart
 from ledsockets.server.ServerConnectionManager import ServerConnectionManager, AbstractServerConnectionManager
+from ledsockets.server.WorkerSupervisor import WorkerSupervisor
+from ledsockets.support.Message import Message
+from ledsockets.support.Metrics import MetricsRegistry
+from ledsockets.support.RateLimiter import RateLimiter
 
 
 class Server(Logs):
@@ -22,16 +35,45 @@ class Server(Logs):
     LOGGER_NAME = 'ledsockets.server.manager'
     SHUTDOWN_PAYLOAD = 'BYE FOREVER!'
     CLOSE_CODE = 1001
+    RESTART_CLOSE_CODE = 1012
     KILL_MESSAGE = 'K byeeeeeeeeeeeeeeeeeee'
 
-    def __init__(self, host: str, port: int, connection_manager: AbstractServerConnectionManager):
+    def __init__(self, host: str, port: int, connection_manager: AbstractServerConnectionManager,
+                 reuse_port=False, admission: AdmissionController | None = None,
+                 hot_restart: HotRestart | None = None, drain_window: float = 0.0,
+                 metrics: MetricsRegistry | None = None, metrics_path: str | None = None):
+        """
+        :param reuse_port: bool bind with SO_REUSEPORT so several worker processes can share the port
+        :param admission: AdmissionController deciding which new connections are served; None serves every connection
+        :param hot_restart: HotRestart enabling restarts in place on SIGUSR2, carrying anything handed over by the
+            process this one replaced; None disables hot restarts
+        :param drain_window: float seconds over which disconnected clients are told to spread their reconnects, and over
+            which a drain (SIGUSR1) closes connections; 0 closes everyone at once with no reconnect hints
+        :param metrics: MetricsRegistry to record into and expose; a private one if not provided
+        :param metrics_path: str path (e.g. `/metrics`) answering plain HTTP GETs on the websocket port with the metrics
+            in the text exposition format; None doesn't expose them
+        """
         Logs.__init__(self)
         self._host = host
         self._port = port
+        self._reuse_port = reuse_port
+        self._admission = admission
         self._connection_manager: AbstractServerConnectionManager = connection_manager
         self._stop_event = asyncio.Event()
         self._shutting_down = False
+        self._restarting = False
+        self._draining = False
+        self._drain_window = drain_window
+        self._hot_restart = hot_restart
         self._connections = set()
+        self._metrics = metrics or MetricsRegistry()
+        self._metrics_path = metrics_path
+        self._metrics.gauge('ledsockets_connections', 'Open websocket connections').labels().set_function(
+            lambda: len(self._connections))
+        self._connections_accepted = self._metrics.counter('ledsockets_connections_total',
+                                                           'Websocket connections served').labels()
+        self._connections_rejected = self._metrics.counter('ledsockets_connections_rejected_total',
+                                                           'Websocket connections turned away').labels()
 
     @property
     def address(self):
@@ -44,6 +86,7 @@ class Server(Logs):
     def _record_connection(self, websocket: ServerConnection):
         self._log(f"Connection received from {websocket.remote_address}", 'info')
         self._connections.add(websocket)
+        self._connections_accepted.inc()
 
     async def _handle_connection(self, websocket):
         self._record_connection(websocket)
@@ -58,35 +101,150 @@ class Server(Logs):
         finally:
             self._record_disconnect(websocket)
 
-    async def _close_connection(self, websocket: ServerConnection):
+    def _get_reconnect_after(self, window: float | None = None):
+        """
+        :param window: float seconds to pick a point in; the drain window by default
+        """
+        window = self._drain_window if window is None else window
+        return round(random.uniform(0, window), 3) if window else None
+
+    @staticmethod
+    def _get_reconnect_hint_message(reconnect_after: float):
+        return Message('server_draining', {
+            "data": ReconnectHint(reconnect_after).toDict()
+        })
+
+    async def _close_connection(self, websocket: ServerConnection, code: int, reason='', farewell: str | None = None,
+                                reconnect_after: float | None = None):
         if websocket.close_code is not None:
             return
         try:
             # Add a timeout so a single slow client doesn't hang the whole shutdown
             async with asyncio.timeout(2.0):
-                await websocket.send(json.dumps([
-                    'talkback_message',
-                    {
-                        "data": TalkbackMessage(self.SHUTDOWN_PAYLOAD).toDict()
-                    }
-                ]))
-                await websocket.close(self.CLOSE_CODE)
+                if reconnect_after is not None:
+                    await self._get_reconnect_hint_message(reconnect_after).send(websocket)
+                if farewell:
+                    await Message('talkback_message', {
+                        "data": TalkbackMessage(farewell).toDict()
+                    }).send(websocket)
+                await websocket.close(code, reason)
         except Exception:
             self._log_exception('Exception during client disconnect')
 
-    async def _disconnect_all(self):
+    async def _disconnect_all(self, code: int = CLOSE_CODE, reason='', farewell: str | None = SHUTDOWN_PAYLOAD,
+                              hint=True, hint_window: float | None = None):
+        """
+        :param hint: bool tell each client when to reconnect, spread across the drain window
+        :param hint_window: float seconds to spread the reconnects across instead of the drain window
+        """
         if self._connections:
             self._log(f"Closing active connections ({len(self._connections)})", 'info')
-            tasks = [self._close_connection(conn) for conn in list(self._connections)]
+            tasks = [self._close_connection(conn, code, reason, farewell,
+                                            self._get_reconnect_after(hint_window) if hint else None)
+                     for conn in list(self._connections)]
             await asyncio.gather(*tasks, return_exceptions=True)
 
     async def _stop_server(self):
         await self._disconnect_all()
 
-    async def _run_server(self):
-        async with serve(self._handle_connection, self._host, self._port) as server:
-            await self._stop_event.wait()
+    async def _drain_connection(self, websocket: ServerConnection, close_after: float, reconnect_after: float):
+        try:
+            async with asyncio.timeout(2.0):
+                await self._get_reconnect_hint_message(reconnect_after).send(websocket)
+        except Exception:
+            self._log_exception('Exception sending reconnect hint')
+        await asyncio.sleep(close_after)
+        await self._close_connection(websocket, self.CLOSE_CODE, 'Server draining')
+
+    async def _drain(self, server):
+        """
+        Stop accepting, then close connections one at a time at random points across the drain window.  Each client is
+        told up front to reconnect at a random point in the window after this one: this process has stopped listening,
+        so there's nothing to reconnect to until the drain is over and it's been started again
+        """
+        server.close(close_connections=False)
+        connections = list(self._connections)
+        self._log(f'Draining {len(connections)} connection(s) over {self._drain_window}s', 'info')
+        tasks = [self._drain_connection(conn, self._get_reconnect_after() or 0.0,
+                                        self._drain_window + (self._get_reconnect_after() or 0.0))
+                 for conn in connections]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _hand_off(self, server):
+        """
+        Stop accepting, leaving the listening socket open for the replacement process, hand over state and let the
+        connection handlers finish
+        """
+        sockets = server.sockets
+        if len(sockets) != 1:
+            self._log(f'Hot restart needs exactly one listening socket (have {len(sockets)}); stopping instead',
+                      'error')
             await self._stop_server()
+            return
+        # State is captured before closing connections, while every client is still in the roster
+        self._hot_restart.prepare(sockets[0], self._connection_manager.export_state())
+        server.close(close_connections=False)
+        # The replacement is up within moments, but everyone coming straight back at once would have it sending every
+        # resume at the same time.  Clients are told when to come back, spread across the drain window but well within
+        # the time the replacement holds their place for
+        await self._disconnect_all(self.RESTART_CLOSE_CODE, 'Server restarting', farewell=None,
+                                   hint_window=min(self._drain_window, self._hot_restart.grace / 2))
+
+    async def _release_when_closed(self, websocket: ServerConnection):
+        await websocket.wait_closed()
+        self._admission.release(websocket)
+
+    def _admit(self, websocket: ServerConnection):
+        """
+        Turn the connection away with a 503 and Retry-After if there's no room for it.  An admitted connection is
+        released once it closes, whether or not its handshake completes
+        """
+        rejection = self._admission.admit(websocket)
+        if rejection:
+            self._connections_rejected.inc()
+            response = websocket.respond(HTTPStatus.SERVICE_UNAVAILABLE, f'{rejection}\n')
+            response.headers['Retry-After'] = str(self._admission.retry_after)
+            return response
+        asyncio.create_task(self._release_when_closed(websocket))
+        return None
+
+    def _process_request(self, websocket: ServerConnection, request: Request):
+        """
+        Answer metrics scrapes and turn away connections there's no room for, before the websocket handshake so neither
+        costs an upgrade; every other request carries on to it
+        """
+        if self._metrics_path and request.path.split('?', 1)[0] == self._metrics_path:
+            response = websocket.respond(HTTPStatus.OK, self._metrics.expose())
+            del response.headers['Content-Type']
+            response.headers['Content-Type'] = MetricsRegistry.CONTENT_TYPE
+            return response
+        if self._admission:
+            return self._admit(websocket)
+        return None
+
+    def _serve(self):
+        if self._hot_restart and self._hot_restart.listen_socket:
+            return serve(self._handle_connection, sock=self._hot_restart.listen_socket,
+                         max_size=self._connection_manager.max_frame_size, process_request=self._process_request)
+        return serve(self._handle_connection, self._host, self._port, reuse_port=self._reuse_port,
+                     max_size=self._connection_manager.max_frame_size, process_request=self._process_request)
+
+    async def _run_server(self):
+        await self._connection_manager.start()
+        if self._hot_restart and self._hot_restart.state:
+            self._log('Starting from handed over state', 'info')
+            self._connection_manager.import_state(self._hot_restart.state, self._hot_restart.grace)
+        try:
+            async with self._serve() as server:
+                await self._stop_event.wait()
+                if self._restarting:
+                    await self._hand_off(server)
+                elif self._draining:
+                    await self._drain(server)
+                else:
+                    await self._stop_server()
+        finally:
+            await self._connection_manager.stop()
         self._log(self.KILL_MESSAGE, 'info')
 
     def _trigger_shutdown(self, sig):
@@ -100,33 +258,137 @@ class Server(Logs):
     def _handle_sigterm(self, sig):
         self._trigger_shutdown(sig)
 
+    def stop(self):
+        """
+        Stop serving and disconnect everyone, as SIGTERM does
+        """
+        self._trigger_shutdown(signal.SIGTERM)
+
+    def _handle_sigusr1(self, sig):
+        if not self._shutting_down:
+            self._draining = True
+        self._trigger_shutdown(sig)
+
+    def _handle_sigusr2(self, sig):
+        if not self._shutting_down:
+            self._restarting = True
+        self._trigger_shutdown(sig)
+
     async def serve(self):
         self._log(f"Starting on {self.address} (pid {os.getpid()})", 'info')
         loop = asyncio.get_running_loop()
         signals = (signal.SIGINT, signal.SIGTERM)
         for sig in signals:
             loop.add_signal_handler(sig, partial(self._handle_sigterm, sig))
+        loop.add_signal_handler(signal.SIGUSR1, partial(self._handle_sigusr1, signal.SIGUSR1))
+        if self._hot_restart:
+            loop.add_signal_handler(signal.SIGUSR2, partial(self._handle_sigusr2, signal.SIGUSR2))
         try:
             await self._run_server()
         finally:
             for sig in signals:
                 loop.remove_signal_handler(sig)
+            loop.remove_signal_handler(signal.SIGUSR1)
+            if self._hot_restart:
+                loop.remove_signal_handler(signal.SIGUSR2)
             self._log("Stopped", 'info')
 
+    @property
+    def pending_restart(self) -> HotRestart | None:
+        """
+        The HotRestart to exec once the event loop has shut down, if serving ended by handing off to a replacement
+        """
+        return self._hot_restart if self._hot_restart and self._hot_restart.is_prepared else None
+
+
+def _get_rate_limiter():
+    """
+    RateLimiter.DEFAULT_LIMITS overridden by any RATE_LIMIT_<MESSAGE_TYPE> (or RATE_LIMIT_DEFAULT) env vars
+    """
+    prefix = 'RATE_LIMIT_'
+    limits = dict(RateLimiter.DEFAULT_LIMITS)
+    for key, value in os.environ.items():
+        if key.startswith(prefix):
+            limits[key[len(prefix):].lower()] = RateLimiter.parse_limit(value)
+    return RateLimiter(limits)
+
+
+def _get_drain_window():
+    return int(os.getenv('DRAIN_WINDOW_MS', '10000')) / 1000
 
-async def run_server():
-    server = Server(
+
+def _create_server(backplane: AbstractBackplane | None = None):
+    metrics = MetricsRegistry()
+    return Server(
         host=os.getenv('ECHO_SERVER_HOST', '0.0.0.0'),
         port=int(os.getenv('ECHO_SERVER_PORT', '8765')),
-        connection_manager=ServerConnectionManager()
+        connection_manager=ServerConnectionManager(
+            presence_coalesce_window=int(os.getenv('PRESENCE_COALESCE_WINDOW_MS', '20')) / 1000,
+            outbox_size=int(os.getenv('CLIENT_OUTBOX_SIZE', ClientOutbox.DEFAULT_MAX_SIZE)),
+            outbox_policy=os.getenv('CLIENT_OUTBOX_POLICY', ClientOutbox.POLICY_COLLAPSE),
+            outbox_disconnect_threshold=int(os.getenv('CLIENT_OUTBOX_DISCONNECT_THRESHOLD', '0')) or None,
+            backplane=backplane,
+            patch_tick=int(os.getenv('HARDWARE_PATCH_TICK_MS', '100')) / 1000,
+            rate_limiter=_get_rate_limiter(),
+            init_timeout=int(os.getenv('INIT_TIMEOUT_MS', '10000')) / 1000 or None,
+            heartbeat_interval=int(os.getenv('HEARTBEAT_INTERVAL_MS', '0')) / 1000 or None,
+            idle_timeout=int(os.getenv('CLIENT_IDLE_TIMEOUT_MS', '0')) / 1000 or None,
+            resume_window=int(os.getenv('RESUME_WINDOW_MS', '10000')) / 1000 or None,
+            resume_buffer_size=int(os.getenv('RESUME_BUFFER_SIZE', EventRing.DEFAULT_SIZE)),
+            client_max_frame_size=int(os.getenv('CLIENT_MAX_FRAME_SIZE',
+                                                ServerConnectionManager.DEFAULT_CLIENT_MAX_FRAME_SIZE)),
+            hardware_max_frame_size=int(os.getenv('HARDWARE_MAX_FRAME_SIZE',
+                                                  ServerConnectionManager.DEFAULT_HARDWARE_MAX_FRAME_SIZE)),
+            metrics=metrics,
+        ),
+        reuse_port=backplane is not None,
+        # Workers are restarted by their supervisor instead
+        hot_restart=None if backplane else HotRestart.from_environment(
+            grace=int(os.getenv('HOT_RESTART_GRACE_MS', '10000')) / 1000
+        ),
+        drain_window=_get_drain_window(),
+        admission=AdmissionController(
+            max_connections=int(os.getenv('SERVER_MAX_CONNECTIONS', '5000')) or None,
+            max_connections_per_ip=int(os.getenv('SERVER_MAX_CONNECTIONS_PER_IP', '50')) or None,
+            retry_after=int(os.getenv('SERVER_RETRY_AFTER', '5')),
+            trusted_proxies=[ip.strip() for ip in os.getenv('SERVER_TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+                             if ip.strip()],
+        ),
+        metrics=metrics,
+        metrics_path=os.getenv('METRICS_PATH') or None,
     )
 
+
+def run_worker(backplane_path: str):
+    """
+    Entry point for each worker process of a multi-worker server
+    """
+    asyncio.run(_create_server(UnixSocketBackplane(backplane_path)).serve())
+
+
+async def run_server() -> HotRestart | None:
+    """
+    :return: HotRestart to exec once the event loop has shut down, if the server handed off to a replacement
+    """
+    workers = int(os.getenv('SERVER_WORKERS', '1'))
+    if workers > 1:
+        port = os.getenv('ECHO_SERVER_PORT', '8765')
+        backplane_path = os.getenv('SERVER_BACKPLANE_SOCKET',
+                                   os.path.join(tempfile.gettempdir(), f'ledsockets-{port}.sock'))
+        await WorkerSupervisor(workers, run_worker, backplane_path, drain_window=_get_drain_window()).serve()
+        return None
+
+    server = _create_server()
     await server.serve()
+    return server.pending_restart
 
 
 def main():
     load_dotenv()
-    asyncio.run(run_server())
+    restart = asyncio.run(run_server())
+    # Exec'd only once asyncio.run has cancelled what's left and closed the loop
+    if restart:
+        restart.exec()
 
 
 if __name__ == "__main__":
@@ -1,22 +1,44 @@
 import asyncio
-import json
+import math
+import secrets
+import time
+from functools import partial
 from abc import ABC, abstractmethod
-from typing import Dict
+from itertools import chain
+from typing import Dict, List, Set
 
 from websockets.asyncio.server import ServerConnection
-from websockets.client import ClientConnection
 
-from ledsockets.dto.AbstractDto import DTOInvalidAttributesException, DTOInvalidPayloadException
+from ledsockets.codec.AbstractCodec import AbstractCodec
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.dto.AbstractDto import DTOInvalidException
 from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.DeviceSubscription import DeviceSubscription
 from ledsockets.dto.HardwareClient import HardwareClient
 from ledsockets.dto.HardwareState import HardwareState
 from ledsockets.dto.PartialHardwareState import PartialHardwareState
+from ledsockets.dto.RosterChange import RosterChange
 from ledsockets.dto.ServerStatus import ServerStatus
 from ledsockets.dto.TalkbackMessage import TalkbackMessage
 from ledsockets.dto.UiClient import UiClient
 from ledsockets.log.LogsConcern import Logs
+from ledsockets.server.Backplane import AbstractBackplane
+from ledsockets.server.Broadcaster import Broadcaster
+from ledsockets.server.ClientOutbox import ClientOutbox
+from ledsockets.server.EventRing import EventRing, RingEntry
+from ledsockets.server.HardwareDevice import HardwareDevice
+from ledsockets.server.PatchCoalescer import PatchCoalescer
+from ledsockets.server.PatchTracer import PatchTracer
+from ledsockets.server.PresenceCoalescer import PresenceCoalescer
+from ledsockets.server.StatusSnapshot import StatusSnapshot
+from ledsockets.support.LatencyMiddleware import LatencyMiddleware
 from ledsockets.support.Message import Message, MessageException
+from ledsockets.support.MessageDispatcher import MessageDispatcher, UnhandledMessageException
+from ledsockets.support.MessageParser import MessageParser
+from ledsockets.support.Metrics import MetricsRegistry
 from ledsockets.support.NameBroker import NameBroker
+from ledsockets.support.RateLimiter import RateLimiter
+from ledsockets.support.TimerWheel import TimerWheel
 
 
 # <editor-fold desc="Exceptions">
@@ -26,7 +48,7 @@ class InvalidHardwareInitPayloadException(Exception):
 
 
 class HardwareAlreadyConnectedException(Exception):
-    """Exception raised when hardware tries to connect with hardware already connected"""
+    """Exception raised when hardware tries to connect with a device id that is already connected"""
     pass
 
 
@@ -45,13 +67,54 @@ class ClientMessageException(Exception):
     pass
 
 
+class ClientRateLimitedException(ClientMessageException):
+    """Exception raised when a client sends a message type faster than its rate limit allows"""
+    pass
+
+
 # </editor-fold>
 
 class AbstractServerConnectionManager(ABC):
+    # The websockets default
+    DEFAULT_MAX_FRAME_SIZE = 2 ** 20
+
     @abstractmethod
     def handle(self, connection: ServerConnection):
         pass
 
+    @property
+    def max_frame_size(self) -> int:
+        """
+        Largest frame in bytes accepted from a connection before it's handled
+        """
+        return self.DEFAULT_MAX_FRAME_SIZE
+
+    async def start(self):
+        """
+        Called by the Server before it starts accepting connections
+        """
+        pass
+
+    async def stop(self):
+        """
+        Called by the Server once it has stopped serving
+        """
+        pass
+
+    def export_state(self) -> Dict:
+        """
+        JSON-serializable state to hand over to the process replacing this one on a hot restart
+        """
+        return {}
+
+    def import_state(self, state: Dict, grace: float):
+        """
+        Start from the state exported by the process this one replaced
+
+        :param grace: float seconds to hold on to handed over clients waiting for them to reconnect
+        """
+        pass
+
 
 class ServerConnectionManager(Logs, AbstractServerConnectionManager):
     """
@@ -59,62 +122,374 @@ class ServerConnectionManager(Logs, AbstractServerConnectionManager):
     Handles connection management, routing and other business logic
     """
     LOGGER_NAME = 'ledsockets.server.handler'
-    VALID_INIT_TYPES = ['init_client', 'init_hardware']
+    # Message handlers are registered by the role of the sender; connections are `init` until they've said what they are
+    ROLE_INIT = 'init'
+    ROLE_CLIENT = 'client'
+    ROLE_HARDWARE = 'hardware'
+    DEFAULT_CLIENT_MAX_FRAME_SIZE = 16 * 1024
+    DEFAULT_HARDWARE_MAX_FRAME_SIZE = 64 * 1024
+    # Backplane topics and claim keys shared by the workers of a multi-worker server
+    TOPIC_ROSTER = 'roster'
+    TOPIC_HARDWARE = 'hardware'
+    TOPIC_PATCH = 'patch'
+    TOPIC_SYNC_REQUEST = 'sync_request'
+    TOPIC_SYNC = 'sync'
+    TOPIC_SESSION_TAKEN = 'session_taken'
+    CLAIM_HARDWARE = 'hardware'
+    MAX_DEVICE_SUBSCRIPTIONS = 64
+    MAX_CORRELATION_ID_LENGTH = 64
+    HEARTBEAT_MESSAGE = Message('heartbeat', {})
+    IDLE_CLOSE_CODE = 1001
+    # Clients closing with these (normal closure, going away) are leaving for good, so they aren't held for resuming
+    LEAVING_CLOSE_CODES = (1000, 1001)
+    CLOSE_TIMEOUT = 2.0
 
-    def __init__(self):
+    def __init__(self, presence_coalesce_window: float = 0.0, outbox_size=ClientOutbox.DEFAULT_MAX_SIZE,
+                 outbox_policy=ClientOutbox.POLICY_COLLAPSE, outbox_disconnect_threshold: int | None = None,
+                 backplane: AbstractBackplane | None = None, patch_tick: float = 0.0,
+                 rate_limiter: RateLimiter | None = None, init_timeout: float | None = None,
+                 heartbeat_interval: float | None = None, idle_timeout: float | None = None,
+                 resume_window: float | None = None, resume_buffer_size=EventRing.DEFAULT_SIZE,
+                 client_max_frame_size=DEFAULT_CLIENT_MAX_FRAME_SIZE,
+                 hardware_max_frame_size=DEFAULT_HARDWARE_MAX_FRAME_SIZE, metrics: MetricsRegistry | None = None):
+        """
+        :param presence_coalesce_window: float seconds to batch join/leave/rename events into `presence_batch` frames;
+            0 sends each immediately
+        :param outbox_size: int frames queued per slow client before its overflow policy kicks in
+        :param outbox_policy: str ClientOutbox overflow policy
+        :param outbox_disconnect_threshold: int dropped frames before a client is disconnected under the disconnect
+            policy
+        :param backplane: AbstractBackplane shared with the other workers of a multi-worker server; None when running
+            as a single process
+        :param patch_tick: float minimum seconds between patches forwarded to each device; 0 forwards every patch
+        :param rate_limiter: RateLimiter applied to each client's messages; None leaves clients unlimited
+        :param init_timeout: float seconds a new connection has to send its init message; None waits indefinitely
+        :param heartbeat_interval: float seconds of silence after which a client is sent a `heartbeat` to answer; None
+            disables heartbeats and idle eviction
+        :param idle_timeout: float seconds of silence after which a client is evicted; defaults to 3 heartbeat intervals
+        :param resume_window: float seconds a dropped client keeps its place in the roster, able to resume its session
+            and be sent just the broadcasts it missed; None disables resuming
+        :param resume_buffer_size: int recent broadcasts kept for resuming clients
+        :param client_max_frame_size: int largest frame in bytes a UI client may send
+        :param hardware_max_frame_size: int largest frame in bytes hardware may send
+        :param metrics: MetricsRegistry to record into, e.g. the one the Server exposes; a private one if not provided
+        """
+        if outbox_policy not in ClientOutbox.POLICIES:
+            raise ValueError(f'Invalid outbox policy "{outbox_policy}"')
         Logs.__init__(self)
-        self._hardware_state: HardwareState = HardwareState()
-        self._hardware_connection: HardwareClient | None = None
+        self._devices: Dict[str, HardwareDevice] = {}
+        # Clients that haven't narrowed their subscription get updates from every device
+        self._all_devices_subscriber_ids: Set[str] = set()
         self._client_connections: Dict[str, UiClient] = {}
         self._hardware_lock = asyncio.Lock()
         self._name_broker = NameBroker()
+        self._roster_version = 0
+        self._broadcaster = Broadcaster(self._on_broadcast_failed)
+        self._status = StatusSnapshot(self._get_status)
+        self._presence = PresenceCoalescer(self._broadcast_to_clients, presence_coalesce_window)
+        self._patches = PatchCoalescer(self._forward_patch, patch_tick)
+        self._rate_limiter = rate_limiter
+        self._metrics = metrics or MetricsRegistry()
+        self._register_metrics()
+        self._dispatcher = MessageDispatcher()
+        # Init handlers run for the life of the connection, so only the message handlers are timed
+        self._handler_latency = LatencyMiddleware(self._metrics.histogram(
+            'ledsockets_handler_duration_seconds', 'Time spent handling a message', ['role', 'type']))
+        self._dispatcher.use(self._handler_latency, roles=[self.ROLE_CLIENT, self.ROLE_HARDWARE])
+        self._register_handlers()
+        # Frames are checked against the types and sizes their sender may send before they're decoded.  Until a
+        # connection has said what it is, it may send either init message at the larger of the two sizes
+        self._init_parser = MessageParser(self._dispatcher.get_types(self.ROLE_INIT),
+                                          max(client_max_frame_size, hardware_max_frame_size))
+        self._client_parser = MessageParser(self._dispatcher.get_types(self.ROLE_CLIENT), client_max_frame_size)
+        self._hardware_parser = MessageParser(self._dispatcher.get_types(self.ROLE_HARDWARE), hardware_max_frame_size)
+        self._init_timeout = init_timeout
+        self._heartbeat_interval = heartbeat_interval
+        self._idle_timeout = idle_timeout or (heartbeat_interval * 3 if heartbeat_interval else None)
+        self._idle_timers: TimerWheel | None = None
+        self._idle_reaper_task: asyncio.Task | None = None
+        if heartbeat_interval:
+            tick = min(1.0, heartbeat_interval / 4)
+            self._idle_timers = TimerWheel(tick, math.ceil(self._idle_timeout / tick) + 2)
+        self._outbox_size = outbox_size
+        self._outbox_policy = outbox_policy
+        self._outbox_disconnect_threshold = outbox_disconnect_threshold
+        self._backplane = backplane
+        # UI clients connected to other workers, and the worker each one is connected to
+        self._remote_clients: Dict[str, UiClient] = {}
+        self._remote_client_workers: Dict[str, str] = {}
+        self._resume_window = resume_window
+        # Recent broadcasts for resuming clients; None when resuming is disabled
+        self._events = EventRing(resume_buffer_size) if resume_window else None
+        # Resume tokens and the ids of the clients they were issued to
+        self._sessions: Dict[str, str] = {}
+        # Dropped UI clients (and those handed over by the process this one replaced) held in the roster until they
+        # resume or their time runs out, with the timers that run out
+        self._returning_clients: Dict[str, UiClient] = {}
+        self._returning_expiry: Dict[str, asyncio.TimerHandle] = {}
+        # Devices whose last known state was handed over
+        self._handed_over_device_ids: Set[str] = set()
+        self._handoff_grace_handle: asyncio.TimerHandle | None = None
+        # Set once state has been exported to a replacement process; everyone is about to be disconnected, so there's
+        # no one left worth telling about the disconnects
+        self._handed_off = False
+
+    async def start(self):
+        if self._idle_timers is not None:
+            self._idle_reaper_task = asyncio.create_task(self._run_idle_reaper())
+        if self._backplane:
+            self._backplane.subscribe(self._on_backplane_message)
+            await self._backplane.start()
+            self._publish(self.TOPIC_SYNC_REQUEST, {})
+
+    async def stop(self):
+        if self._handoff_grace_handle:
+            self._handoff_grace_handle.cancel()
+            self._handoff_grace_handle = None
+        for handle in self._returning_expiry.values():
+            handle.cancel()
+        if self._idle_reaper_task:
+            self._idle_reaper_task.cancel()
+            self._idle_reaper_task = None
+        if self._backplane:
+            await self._backplane.stop()
+
+    def _register_metrics(self):
+        metrics = self._metrics
+        metrics.gauge('ledsockets_ui_clients', 'UI clients connected').labels().set_function(
+            lambda: len(self._client_connections))
+        metrics.gauge('ledsockets_returning_clients', 'Dropped UI clients held for resuming').labels().set_function(
+            lambda: len(self._returning_clients))
+        metrics.gauge('ledsockets_hardware_devices', 'Hardware devices connected').labels().set_function(
+            lambda: sum(1 for device in self._devices.values() if device.is_local))
+        metrics.gauge('ledsockets_outbox_frames', 'Frames queued for slow UI clients').labels().set_function(
+            lambda: sum(client.outbox.depth for client in self._client_connections.values() if client.outbox))
+        self._messages_rejected = metrics.counter('ledsockets_messages_rejected_total',
+                                                  'Messages that had no effect', ['role', 'reason'])
+        self._clients_dropped = metrics.counter('ledsockets_clients_dropped_total',
+                                                'UI clients disconnected by the server', ['reason'])
+        self._broadcast_duration = metrics.histogram('ledsockets_broadcast_duration_seconds',
+                                                     'Time spent handing a broadcast to its recipients').labels()
+        self._broadcast_frames = metrics.counter('ledsockets_broadcast_frames_total',
+                                                 'Frames handed to UI clients by broadcasts').labels()
+        self._hardware_round_trip = metrics.histogram(
+            'ledsockets_hardware_round_trip_seconds',
+            'Time from forwarding a patch to hardware to hearing its updated state').labels()
+        self._patch_tracer = PatchTracer(metrics.histogram(
+            'ledsockets_patch_hop_seconds', 'Time a patch spends on each hop from UI client to broadcast', ['hop']))
+
+    def _register_handlers(self):
+        register = self._dispatcher.register
+        register(self.ROLE_INIT, 'init_hardware', self._handle_hardware_connection)
+        register(self.ROLE_INIT, 'init_client', self._handle_client_connection)
+        register(self.ROLE_CLIENT, 'patch_hardware_state', self._on_client_patch_hardware)
+        register(self.ROLE_CLIENT, 'talkback_message', self._on_client_talkback_message)
+        register(self.ROLE_CLIENT, 'change_name', self._on_change_name)
+        register(self.ROLE_CLIENT, 'request_status', self._on_request_status)
+        register(self.ROLE_CLIENT, 'subscribe', self._on_subscribe)
+        register(self.ROLE_CLIENT, 'heartbeat', self._on_heartbeat)
+        register(self.ROLE_HARDWARE, 'hardware_updated', self._on_hardware_updated)
+        register(self.ROLE_HARDWARE, 'talkback_message', self._on_hardware_talkback_message)
+
+    @property
+    def max_frame_size(self) -> int:
+        return self._init_parser.max_size
+
+    def get_outbox_depths(self) -> Dict[str, int]:
+        """
+        Number of frames queued for each connected client, keyed by client id
+        """
+        return {client_id: client.outbox.depth for client_id, client in self._client_connections.items()}
+
+    def get_throttled_counts(self) -> Dict[str, int]:
+        """
+        Number of client messages dropped by rate limiting, keyed by message type
+        """
+        return self._rate_limiter.get_throttled_counts() if self._rate_limiter else {}
+
+    def get_handler_latencies(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Summaries of message handler latencies in seconds, keyed by sender role and message type
+        """
+        return self._handler_latency.get_snapshots()
+
+    def get_patch_latencies(self) -> Dict[str, Dict]:
+        """
+        Summaries of the time patches spend on each hop, in seconds, keyed by hop; see PatchTracer
+        """
+        return self._patch_tracer.get_snapshots()
 
     @property
     def is_hardware_connected(self):
-        return self._hardware_connection is not None
+        return any(device.is_connected for device in self._devices.values())
 
-    async def _handle_client_disconnect(self, client: UiClient):
-        self._log(f'Client disconnected', 'info')
-        client_id = client.id
-        if client_id and client_id in self._client_connections:
-            del self._client_connections[client_id]
+    def _get_device(self, device_id: str):
+        device = self._devices.get(device_id)
+        if device is None:
+            device = self._devices[device_id] = HardwareDevice(device_id)
+        return device
+
+    def _get_primary_device(self):
+        """
+        The device reported in the single-device `hardware_state`/`hardware_client` status relationships: the default
+        device if it's connected, otherwise the first connected device
+        """
+        default = self._devices.get(HardwareDevice.DEFAULT_ID)
+        if default and default.is_connected:
+            return default
+        return next((device for device in self._devices.values() if device.is_connected), default)
+
+    def _get_device_subscriber_ids(self, device: HardwareDevice):
+        return chain(device.subscriber_ids, self._all_devices_subscriber_ids)
+
+    @staticmethod
+    def _get_trace_key(state: HardwareState | PartialHardwareState):
+        """
+        Trace key of the patch a state came from; the hardware answers with the patch's source and correlation id
+        """
+        return PatchTracer.get_trace_key(state.source.id if state.source else None, state.correlation_id)
+
+    # <editor-fold desc="State mutations">
+    # All changes to state reflected in the status snapshot go through these so the snapshot is marked dirty
+    def _set_hardware_state(self, device: HardwareDevice, hardware_state: HardwareState):
+        hardware_state.id = device.id
+        device.state = hardware_state
+        self._status.invalidate()
+
+    def _set_hardware_connection(self, device: HardwareDevice, hardware: HardwareClient | None):
+        device.hardware = hardware
+        self._status.invalidate()
+
+    def _add_client(self, client: UiClient):
+        self._client_connections[client.id] = client
+        self._all_devices_subscriber_ids.add(client.id)
+        self._status.invalidate()
+
+    def _discard_client(self, client: UiClient):
+        del self._client_connections[client.id]
+        self._unsubscribe(client)
+        if self._idle_timers is not None:
+            self._idle_timers.remove(client.id)
+        self._status.invalidate()
+
+    def _restore_client(self, client: UiClient):
+        # Takes the place of the returning client with the same id and name, so the status is unchanged
+        del self._returning_clients[client.id]
+        self._returning_expiry.pop(client.id).cancel()
+        self._client_connections[client.id] = client
+        self._subscribe(client, client.device_ids)
+
+    def _hold_returning_client(self, client: UiClient, timeout: float):
+        self._returning_clients[client.id] = client
+        self._returning_expiry[client.id] = asyncio.get_running_loop().call_later(
+            timeout, self._expire_returning_client, client)
+        self._status.invalidate()
+
+    def _discard_returning_client(self, client: UiClient):
+        del self._returning_clients[client.id]
+        self._returning_expiry.pop(client.id).cancel()
+        self._status.invalidate()
+
+    def _add_remote_client(self, client: UiClient, worker_id: str):
+        self._remote_clients[client.id] = client
+        self._remote_client_workers[client.id] = worker_id
+        self._status.invalidate()
+
+    def _discard_remote_client(self, client: UiClient):
+        del self._remote_clients[client.id]
+        del self._remote_client_workers[client.id]
+        self._status.invalidate()
+
+    # </editor-fold>
+
+    def _record_roster_change(self, action: str, client: UiClient, change_detail: ChangeDetail | None = None):
+        self._roster_version += 1
+        self._status.invalidate()
+        change = RosterChange(self._roster_version, action)
+        change.ui_client = client
+        if change_detail:
+            change.change_detail = change_detail
+        return change
+
+    def _announce_departure(self, client: UiClient):
+        self._sessions.pop(client.resume_token, None)
+        if self._rate_limiter:
+            self._rate_limiter.forget(client.id)
         self._name_broker.release_name(client.name)
 
-        payload = self._get_status()
-        payload.ui_client = client
+        change = self._record_roster_change(RosterChange.ACTION_LEFT, client)
+        self._presence.add(change, exclude_ids=[client.id])
+        self._publish_roster_change(change)
 
-        await self._broadcast_to_clients(json.dumps([
-            'client_disconnect',
-            {
-                "data": payload.toDict()
-            }
-        ]), exclude_ids=[client.id])
+    def _remove_client(self, client: UiClient):
+        """
+        Remove a client from the roster and let everyone else know.  Safe to call more than once per client
+        """
+        if self._client_connections.get(client.id) is not client:
+            return
+        self._discard_client(client)
+        client.outbox.close()
+        self._announce_departure(client)
+
+    def _suspend_client(self, client: UiClient):
+        """
+        Take a dropped client off its connection but hold its place in the roster for the resume window, so it can come
+        back without anyone else noticing it was gone.  Safe to call more than once per client
+        """
+        if self._client_connections.get(client.id) is not client:
+            return
+        self._discard_client(client)
+        client.outbox.close()
+        self._hold_returning_client(client, self._resume_window)
+
+    def _expire_returning_client(self, client: UiClient):
+        if self._returning_clients.get(client.id) is not client:
+            return
+        self._log(f'Client {client.id} did not come back', 'info')
+        self._discard_returning_client(client)
+        self._announce_departure(client)
+
+    async def _handle_client_disconnect(self, client: UiClient):
+        self._log(f'Client disconnected', 'info')
+        if self._resume_window and client.connection.close_code not in self.LEAVING_CLOSE_CODES:
+            self._suspend_client(client)
+        else:
+            self._remove_client(client)
 
     async def _on_talkback_message(self, message: Message, source: str):
         try:
             talkback = TalkbackMessage.from_message(message)
             self._log(f'{source} talkback message received: "{talkback.message}"', 'info')
-        except DTOInvalidPayloadException as e:
+        except DTOInvalidException as e:
             exception_message = f'Invalid talkback payload "{e}"'
             if source == 'Client':
                 raise ClientMessageException(exception_message)
             else:
                 raise HardwareMessageException(exception_message)
 
+    async def _on_client_talkback_message(self, message: Message, client: UiClient):
+        await self._on_talkback_message(message, 'Client')
+
     async def _on_client_patch_hardware(self, message: Message, client: UiClient):
         self._log('Processing patch hardware state message', 'info')
         try:
             model = PartialHardwareState.from_message(message)
             model.source = client
-        except DTOInvalidAttributesException as e:
+        except DTOInvalidException as e:
             raise ClientMessageException(str(e)) from e
 
-        await self._send_message_to_hardware(json.dumps([
-            'patch_hardware_state',
-            {
-                "data": model.toDict()
-            }
-        ]))
+        # Patches without a target device go to the primary device
+        device = self._devices.get(model.id) if model.id else self._get_primary_device()
+        if not device or not device.is_connected:
+            raise ClientMessageException(f'Hardware device "{model.id}" is not connected')
+        model.id = device.id
+        if not model.correlation_id:
+            model.correlation_id = secrets.token_hex(8)
+        elif len(model.correlation_id) > self.MAX_CORRELATION_ID_LENGTH:
+            raise ClientMessageException(f'Correlation id too long (max {self.MAX_CORRELATION_ID_LENGTH})')
+        self._patch_tracer.record(self._get_trace_key(model), PatchTracer.STAGE_RECEIVED, time.perf_counter())
+
+        self._patches.add(device.id, model)
 
     async def _on_change_name(self, message: Message, client: UiClient):
         original_name = client.name
@@ -125,10 +500,7 @@ class ServerConnectionManager(Logs, AbstractServerConnectionManager):
         self._name_broker.release_name(original_name)
         client.name = new_name
 
-        payload: ServerStatus = self._get_status()
-        payload.ui_client = client
-
-        payload.change_detail = ChangeDetail.from_attributes({
+        change = self._record_roster_change(RosterChange.ACTION_RENAMED, client, ChangeDetail.from_attributes({
             "description": f'{original_name} is now "{new_name}"',
             "source_name": original_name,
             "action_description": f'is now "{new_name}"',
@@ -136,74 +508,261 @@ class ServerConnectionManager(Logs, AbstractServerConnectionManager):
             "source_id": client.id,
             "old_value": original_name,
             "new_value": new_name,
-        })
+        }))
 
-        await self._broadcast_to_clients(json.dumps([
-            'client_name_changed',
-            {
-                "data": payload.toDict()
-            }
-        ]))
+        self._presence.add(change)
+        self._publish_roster_change(change)
+
+    async def _on_request_status(self, message: Message, client: UiClient):
+        self._send_to_client(client, self._status.message('server_status', extra_relationships={
+            'ui_client': client
+        }), 'server_status')
+
+    def _subscribe(self, client: UiClient, device_ids: Set[str] | None):
+        client.device_ids = device_ids
+        if device_ids is None:
+            self._all_devices_subscriber_ids.add(client.id)
+            return
+        for device_id in device_ids:
+            self._get_device(device_id).subscriber_ids.add(client.id)
+
+    def _unsubscribe(self, client: UiClient):
+        if client.device_ids is None:
+            self._all_devices_subscriber_ids.discard(client.id)
+            return
+        for device_id in client.device_ids:
+            device = self._devices.get(device_id)
+            if device:
+                device.subscriber_ids.discard(client.id)
+                # Forget devices nobody is connected to or listening for
+                if not device.subscriber_ids and not device.is_connected:
+                    del self._devices[device_id]
+
+    async def _on_subscribe(self, message: Message, client: UiClient):
+        try:
+            subscription = DeviceSubscription.from_message(message)
+        except DTOInvalidException as e:
+            raise ClientMessageException(str(e)) from e
+        if subscription.device_ids is not None and len(subscription.device_ids) > self.MAX_DEVICE_SUBSCRIPTIONS:
+            raise ClientMessageException(f'Too many devices (max {self.MAX_DEVICE_SUBSCRIPTIONS})')
+
+        self._unsubscribe(client)
+        self._subscribe(client, None if subscription.device_ids is None else set(subscription.device_ids))
+        self._log(f'Client {client.id} subscribed to {client.device_ids or "all devices"}', 'info')
+        await self._on_request_status(message, client)
+
+    async def _on_heartbeat(self, message: Message, client: UiClient):
+        # Receiving it already marked the client as alive
+        pass
 
-    async def _handle_client_message(self, raw_message: str, client: UiClient):
-        self._log(f'Client message: {raw_message}', 'debug')
+    async def _handle_client_message(self, raw_message: str | bytes, client: UiClient):
+        self._log('Client message: %s', 'debug', raw_message)
 
+        try:
+            message_type = self._client_parser.read_type(raw_message)
+        except MessageException as e:
+            raise ClientMessageException(str(e)) from e
+        # Throttled messages aren't worth decoding
+        if self._rate_limiter and not self._rate_limiter.allow(client.id, message_type):
+            raise ClientRateLimitedException(f'Rate limit exceeded for "{message_type}"')
         try:
             message = Message.parse(raw_message)
         except MessageException as e:
             raise ClientMessageException(str(e)) from e
 
-        match message.type:
-            case 'patch_hardware_state':
-                await self._on_client_patch_hardware(message, client)
-            case 'talkback_message':
-                await self._on_talkback_message(message, 'Client')
-            case 'change_name':
-                await self._on_change_name(message, client)
-            case _:
-                raise ClientMessageException(f"Unrecognized message type: \"{message.type}\"")
+        try:
+            await self._dispatcher.dispatch(self.ROLE_CLIENT, message, client)
+        except UnhandledMessageException as e:
+            raise ClientMessageException(str(e)) from e
 
     async def _run_client_connection(self, client: UiClient):
         connection = client.connection
+        loop = asyncio.get_running_loop()
         async for message in connection:
+            client.last_seen = loop.time()
             try:
                 await self._handle_client_message(message, client)
+            except ClientRateLimitedException as e:
+                self._log(f'Client {client.id} throttled: {e}', 'debug')
+                self._messages_rejected.labels(self.ROLE_CLIENT, 'throttled').inc()
+                await self._send_error_message(f"Message had no effect ({e})", connection)
             except ClientMessageException as e:
                 self._log_exception(f"Ignoring invalid message: {e}")
+                self._messages_rejected.labels(self.ROLE_CLIENT, 'invalid').inc()
                 await self._send_error_message(f"Message had no effect ({e})", connection)
 
-    async def _init_client_connection(self, client: UiClient):
-        payload = self._get_status()
-        payload.ui_client = client
-        payload.append_relationship('talkback_messages', TalkbackMessage("Hello, client!"))
-        await client.connection.send(json.dumps([
-            'client_init',
-            {
-                "data": payload.toDict()
-            }
-        ]))
-        payload.remove_relationship('talkback_messages')
-        await self._broadcast_to_clients(json.dumps([
-            'client_joined',
-            {
-                "data": payload.toDict()
-            }
-        ]), exclude_ids=[client.id])
+    async def _init_client_connection(self, client: UiClient, restored=False, last_seq: int | None = None):
+        """
+        :param restored: bool the client is resuming its place in the roster, so nobody else needs to hear about it
+        :param last_seq: int sequence number of the last broadcast a resuming client received
+        """
+        missed = self._get_missed_events(client, last_seq) if restored else None
+        if missed is not None:
+            self._log(f'Client {client.id} resumed; replaying {len(missed)} missed frame(s)', 'info')
+            self._send_to_client(client, Message('client_resumed', {
+                "data": client.toDict(),
+                "meta": self._get_init_reply_meta(client),
+            }), 'client_resumed')
+            for entry in missed:
+                self._send_to_client(client, entry.message, entry.event_type)
+            return
+
+        change = None if restored else self._record_roster_change(RosterChange.ACTION_JOINED, client)
+        init_message = self._status.message('client_init', extra_relationships={
+            'ui_client': client,
+            'talkback_messages': [TalkbackMessage("Hello, client!")],
+        }, meta=self._get_init_reply_meta(client))
+        if change:
+            # Announce the join before awaiting the init send so no other roster change can land between the two
+            self._presence.add(change, exclude_ids=[client.id])
+            self._publish_roster_change(change)
+        self._send_to_client(client, init_message, 'client_init')
 
     def _record_client_connection(self, websocket: ServerConnection, message: Message):
+        """
+        :return: tuple of the new UiClient and whether it's a returning client restored to its place in the roster
+        """
         try:
             payload_client: UiClient = UiClient.from_message(message)
-        except DTOInvalidPayloadException as e:
+        except DTOInvalidException as e:
             raise InitPayloadInvalidException(f'Invalid client initialization payload') from e
         except KeyError as e:
             raise InitPayloadInvalidException(f'Invalid client initialization payload') from e
 
         self._log(f'Initializing client from {websocket.remote_address}', 'info')
-        name = self._name_broker.get_name(payload_client.name)
-        client = UiClient(str(websocket.id), websocket, name)
-        self._client_connections[client.id] = client
+        meta = self._get_meta(message)
+        resume_token = meta.get('resume_token')
+        returning = self._take_resumable_client(resume_token)
+        if returning is None and isinstance(resume_token, str):
+            # The session may be held by another worker, which lets it go rather than keeping it in the roster until
+            # the resume window runs out
+            self._publish(self.TOPIC_SESSION_TAKEN, {"resume_token": resume_token})
+        if returning:
+            # Its name is still reserved
+            client = UiClient(returning.id, websocket, returning.name)
+            client.device_ids = returning.device_ids
+            self._sessions.pop(returning.resume_token, None)
+        else:
+            client = UiClient(str(websocket.id), websocket, self._name_broker.get_name(payload_client.name))
+        client.codec = Codecs.negotiate(meta.get('codecs'))
+        client.included = meta.get('included') is True
+        client.outbox = ClientOutbox(
+            websocket,
+            partial(self._on_outbox_failed, client.id),
+            self._outbox_size,
+            self._outbox_policy,
+            self._outbox_disconnect_threshold,
+            codec=client.codec,
+            included=client.included
+        )
+        client.outbox.start()
+        client.last_seen = asyncio.get_running_loop().time()
+        if returning:
+            self._restore_client(client)
+        else:
+            self._add_client(client)
+        if self._resume_window:
+            self._issue_resume_token(client)
+        if self._idle_timers is not None:
+            self._idle_timers.add(client.id, self._heartbeat_interval)
+
+        return client, returning is not None
+
+    # <editor-fold desc="Resuming sessions">
+    # A client that drops without saying goodbye is held in the roster for the resume window.  It resumes by presenting
+    # the token from its last init along with the seq of the last broadcast it received, and is sent just the
+    # broadcasts it missed if they are all still in the event ring, or a full status otherwise
+    @staticmethod
+    def _get_meta(message: Message) -> Dict:
+        meta = message.payload.get('meta') if isinstance(message.payload, dict) else None
+        return meta if isinstance(meta, dict) else {}
+
+    def _issue_resume_token(self, client: UiClient):
+        # A fresh token per init, so a token can only ever be used once
+        client.resume_token = secrets.token_urlsafe(16)
+        self._sessions[client.resume_token] = client.id
+
+    def _get_init_reply_meta(self, client: UiClient) -> Dict:
+        meta = {"codec": client.codec.NAME}
+        if client.included:
+            meta['included'] = True
+        if client.resume_token:
+            meta['resume_token'] = client.resume_token
+            meta['seq'] = self._events.seq if self._events is not None else 0
+        return meta
+
+    def _take_resumable_client(self, resume_token) -> UiClient | None:
+        client_id = self._sessions.get(resume_token) if isinstance(resume_token, str) else None
+        if client_id is None:
+            return None
+        current = self._client_connections.get(client_id)
+        if current:
+            # Its old connection hasn't noticed it's gone yet; the new one takes over
+            self._log(f'Client {client_id} reconnected before its old connection closed', 'info')
+            self._suspend_client(current)
+            asyncio.create_task(self._close_client_connection(current))
+        return self._returning_clients.get(client_id)
+
+    def _get_missed_events(self, client: UiClient, last_seq) -> List[RingEntry] | None:
+        """
+        :return: the ring entries a resuming client missed, or None if it needs a full status instead
+        """
+        if self._events is None or isinstance(last_seq, bool) or not isinstance(last_seq, int):
+            return None
+        entries = self._events.since(last_seq)
+        # Replaying more than the outbox holds would have its policy drop some of them
+        if entries is None or len(entries) > self._outbox_size:
+            return None
+        return [entry for entry in entries if client.id not in entry.exclude_ids and (
+                entry.device_id is None or client.device_ids is None or entry.device_id in client.device_ids)]
+
+    # </editor-fold>
+
+    # <editor-fold desc="Idle clients">
+    # Each client has one timer on the wheel.  Activity only updates `last_seen`; when a timer fires the client is
+    # re-checked and rescheduled, sent a heartbeat, or evicted
+    async def _run_idle_reaper(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += self._idle_timers.tick
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            now = loop.time()
+            for client_id in self._idle_timers.advance():
+                client = self._client_connections.get(client_id)
+                if client:
+                    self._check_idle_client(client, now)
 
-        return client
+    def _check_idle_client(self, client: UiClient, now: float):
+        idle = now - client.last_seen
+        if idle >= self._idle_timeout:
+            self._log(f'Client {client.id} silent for {idle:.1f}s; evicting', 'info')
+            asyncio.create_task(self._evict_client(client))
+        elif idle >= self._heartbeat_interval:
+            self._send_to_client(client, self.HEARTBEAT_MESSAGE, 'heartbeat')
+            self._idle_timers.add(client.id, self._idle_timeout - idle)
+        else:
+            self._idle_timers.add(client.id, self._heartbeat_interval - idle)
+
+    async def _close_client_connection(self, client: UiClient, code=1000, reason=''):
+        """
+        Close a client's connection, giving up on the closing handshake after CLOSE_TIMEOUT
+        """
+        connection: ServerConnection = client.connection
+        try:
+            async with asyncio.timeout(self.CLOSE_TIMEOUT):
+                await connection.close(code, reason)
+        except Exception:
+            # Half-open sockets never answer the close frame
+            connection.transport.abort()
+
+    async def _evict_client(self, client: UiClient):
+        await self._close_client_connection(client, self.IDLE_CLOSE_CODE, 'Idle timeout')
+        self._clients_dropped.labels('idle').inc()
+        # Evicted clients aren't held for resuming, whatever their connection closed with
+        self._remove_client(client)
+
+    # </editor-fold>
 
     def _prune_dead_clients(self, results_by_id):
         """
@@ -216,172 +775,455 @@ class ServerConnectionManager(Logs, AbstractServerConnectionManager):
                 dead_clients.append(client_id)
 
         for client_id in dead_clients:
-            if client_id and client_id in self._client_connections:
+            client: UiClient | None = self._client_connections.get(client_id)
+            if client:
                 self._log(f'Dropping dead client connection {client_id}', 'info')
-                # Close the connection just in case it's still active. This will drop any connections we can't successfully send to and remove it from tracking
-                try:
-                    client: UiClient | None = self._client_connections.get(client_id)
-                    connection: ClientConnection | None = client.connection if client else None
-                    if (connection):
-                        # idempotent: closing it again is fine
-                        connection.close()
-                except Exception:
-                    pass
-                del self._client_connections[client_id]
-
-    async def _broadcast_to_clients(self, message, send_to_ids=None, exclude_ids=None):
+                self._clients_dropped.labels('send_failed').inc()
+                self._remove_client(client)
+                # Close the connection in case it's still active; closing an already closed connection is fine
+                asyncio.create_task(self._close_client_connection(client))
+
+    def _on_broadcast_failed(self, failed_by_id: Dict[str, Exception]):
+        self._prune_dead_clients(failed_by_id.items())
+
+    def _on_outbox_failed(self, client_id: str, exception: Exception):
+        self._prune_dead_clients([(client_id, exception)])
+
+    def _send_to_client(self, client: UiClient, message: Message, event_type: str | None = None):
+        """
+        Queue a message for a single client without waiting on its connection
+        """
+        try:
+            client.outbox.push(message, event_type)
+        except Exception as e:
+            self._prune_dead_clients([(client.id, e)])
+
+    def _broadcast_to_clients(self, message: Message, device: HardwareDevice | None = None, exclude_ids=None,
+                              event_type: str | None = None):
+        """
+        Write a message to connected clients without waiting on any of them.  It's encoded once for each codec the
+        recipients negotiated.  Failed recipients are pruned out-of-band by the broadcaster
+
+        :param device: HardwareDevice to send the message to the subscribers of; None for every client
+        """
+        if self._handed_off:
+            return
+        exclude_ids = exclude_ids or ()
+        if self._events is not None:
+            # Kept even with nobody connected, for the clients that will resume
+            message = self._events.append(message, event_type, device.id if device else None, exclude_ids)
         if not self._client_connections:
             return
-        target_ids = send_to_ids if send_to_ids else list(self._client_connections.keys())
-        if (exclude_ids):
-            target_ids = list(set(target_ids) - set(exclude_ids))
-        log_message = f"Broadcasting message to {len(target_ids)}/{len(self._client_connections)} client(s):"
-        self._log(log_message, 'info')
-        self._log(message, 'debug')
-        if len(target_ids):
-            tasks = [self._client_connections[cid].connection.send(message) for cid in target_ids]
+        if device is None:
+            clients = self._client_connections.values()
+        else:
+            clients = [self._client_connections[cid] for cid in self._get_device_subscriber_ids(device) if
+                       cid in self._client_connections]
+        recipients = [(client.id, client.outbox) for client in clients if client.id not in exclude_ids]
+        self._log(f"Broadcasting {message.type} to {len(recipients)}/{len(self._client_connections)} client(s):",
+                  'info')
+        self._log('%s', 'debug', message.payload)
+        if recipients:
+            start = time.perf_counter()
+            self._broadcast_frames.inc(self._broadcaster.broadcast(message, recipients, event_type))
+            self._broadcast_duration.observe(time.perf_counter() - start)
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            self._prune_dead_clients(zip(target_ids, results))
+    async def _send_message_to_hardware(self, device: HardwareDevice, message: Message):
+        if device.is_local:
+            self._log(f'Sending {message.type} to hardware "{device.id}"', 'debug')
+            await message.send(device.hardware.connection, device.hardware.codec)
 
-    async def _send_message_to_hardware(self, message: str):
-        if self._hardware_connection:
-            self._log(f'Sending message to hardware: "{message}"', 'debug')
-            await self._hardware_connection.connection.send(message)
+    def _forward_patch(self, device_id: str, patch: PartialHardwareState):
+        device = self._devices.get(device_id)
+        if not device or not device.is_connected:
+            return
+        if device.is_local:
+            now = time.perf_counter()
+            # Timed from the first patch the hardware hasn't answered yet
+            if device.patch_sent_at is None:
+                device.patch_sent_at = now
+            self._patch_tracer.record(self._get_trace_key(patch), PatchTracer.STAGE_FORWARDED, now)
+            asyncio.create_task(self._send_message_to_hardware(device, Message('patch_hardware_state', {
+                "data": patch.toDict()
+            })))
+        else:
+            # The device is connected to another worker, which coalesces and forwards it on
+            self._log(f'Publishing patch for remote hardware "{device_id}"', 'debug')
+            self._publish(self.TOPIC_PATCH, {"device_id": device_id, "patch": patch.toDict()})
 
-    def _get_status(self):
-        obj = ServerStatus(self.is_hardware_connected)
-        obj.set_relationship('hardware_state', self._hardware_state)
+    def _get_status(self, include_roster=True):
+        """
+        Build a fresh ServerStatus.  Use the cached `self._status` snapshot rather than calling this directly
+
+        :param include_roster: bool whether to include the full ui_clients roster.  Roster changes are otherwise
+            communicated as versioned RosterChange deltas
+        """
+        obj = ServerStatus(self.is_hardware_connected, self._roster_version)
+        primary = self._get_primary_device()
+        obj.set_relationship('hardware_state', primary.state if primary else HardwareState())
 
-        if self._hardware_connection:
-            obj.set_relationship('hardware_client', self._hardware_connection)
+        if primary and primary.is_connected:
+            obj.set_relationship('hardware_client', primary.hardware)
 
-        [obj.append_relationship('ui_clients', self._client_connections[cId]) for cId in
-         list(self._client_connections.keys())]
+        for device in self._devices.values():
+            if device.is_connected:
+                obj.append_relationship('hardware_clients', device.hardware)
+                obj.append_relationship('hardware_states', device.state)
+
+        if include_roster:
+            [obj.append_relationship('ui_clients', self._client_connections[cId]) for cId in
+             list(self._client_connections.keys())]
+            [obj.append_relationship('ui_clients', client) for client in self._remote_clients.values()]
+            [obj.append_relationship('ui_clients', client) for client in self._returning_clients.values()]
 
         return obj
 
-    async def _handle_hardware_disconnect(self):
-        self._log(f'Hardware disconnected', 'info')
-        self._hardware_connection = None
-        self._hardware_state = HardwareState()
-        self._log(f'Sending hardware disconnect signal to {len(self._client_connections)} client(s)', 'info')
-        payload = self._get_status()
-        await self._broadcast_to_clients(json.dumps([
-            'hardware_disconnected',
-            {
-                "data": payload.toDict()
-            }
-        ]))
-
-    async def _on_hardware_updated(self, message: Message):
+    def _broadcast_to_device_subscribers(self, device: HardwareDevice, message: Message, event_type: str):
+        self._broadcast_to_clients(message, device=device, event_type=event_type)
+
+    def _broadcast_hardware_updated(self, device: HardwareDevice):
+        self._broadcast_to_device_subscribers(device, Message('hardware_updated', {
+            "data": device.state.toDict()
+        }), 'hardware_updated')
+
+    def _clear_hardware(self, device: HardwareDevice):
+        self._set_hardware_connection(device, None)
+        device.patch_sent_at = None
+        self._set_hardware_state(device, HardwareState())
+        self._log(f'Sending hardware "{device.id}" disconnect signal to subscribers', 'info')
+        self._broadcast_to_device_subscribers(device, self._status.message('hardware_disconnected',
+                                                                            include_roster=False),
+                                              'hardware_disconnected')
+
+    async def _handle_hardware_disconnect(self, device: HardwareDevice):
+        self._log(f'Hardware "{device.id}" disconnected', 'info')
+        self._patches.discard(device.id)
+        self._clear_hardware(device)
+        if self._backplane:
+            # Publish before releasing so other workers hear about the disconnect before any new owner's connect
+            self._publish(self.TOPIC_HARDWARE, {"event": "disconnected", "device_id": device.id})
+            self._backplane.release(self._get_hardware_claim_key(device.id))
+
+    async def _on_hardware_updated(self, message: Message, device: HardwareDevice):
+        now = time.perf_counter()
         try:
             hardware_state: HardwareState = HardwareState.from_message(message)
-        except DTOInvalidAttributesException as e:
+        except DTOInvalidException as e:
             raise HardwareMessageException(f'{e}') from e
         except KeyError as e:
             raise HardwareMessageException(f'Key missing {e}') from e
-        self._hardware_state = hardware_state
-        self._log(f"Hardware state updated: {self._hardware_state.get_attributes()}", 'info')
-        await self._broadcast_to_clients(json.dumps([
-            'hardware_updated',
-            {
-                "data": hardware_state.toDict()
-            }
-        ]))
-
-    async def _handle_hardware_message(self, raw_message: str):
-        self._log(f'Hardware message: {raw_message}', 'debug')
+        if device.patch_sent_at is not None:
+            self._hardware_round_trip.observe(now - device.patch_sent_at)
+            device.patch_sent_at = None
+        self._patch_tracer.record(self._get_trace_key(hardware_state), PatchTracer.STAGE_UPDATED, now)
+        self._set_hardware_state(device, hardware_state)
+        self._log(f'Hardware "{device.id}" state updated: {hardware_state.get_attributes()}', 'info')
+        self._publish(self.TOPIC_HARDWARE, {
+            "event": "updated",
+            "device_id": device.id,
+            "hardware_state": hardware_state.toDict(),
+        })
+        self._broadcast_hardware_updated(device)
+        self._patch_tracer.finish(self._get_trace_key(hardware_state), time.perf_counter(),
+                                  self._get_meta(message).get('trace'))
+
+    async def _on_hardware_talkback_message(self, message: Message, device: HardwareDevice):
+        await self._on_talkback_message(message, 'Hardware')
+
+    async def _handle_hardware_message(self, raw_message: str | bytes, device: HardwareDevice):
+        self._log('Hardware message: %s', 'debug', raw_message)
         try:
-            message = Message.parse(raw_message)
+            message = self._hardware_parser.parse(raw_message)
         except MessageException as e:
             raise HardwareMessageException(str(e)) from e
         except KeyError as e:
             raise HardwareMessageException(f"Payload key error: {e}") from e
 
-        match message.type:
-            case 'hardware_updated':
-                await self._on_hardware_updated(message)
-            case 'talkback_message':
-                await self._on_talkback_message(message, 'Hardware')
-            case _:
-                raise HardwareMessageException(f'Unrecognized message type: "{message.type}"')
+        try:
+            await self._dispatcher.dispatch(self.ROLE_HARDWARE, message, device)
+        except UnhandledMessageException as e:
+            raise HardwareMessageException(str(e)) from e
 
-    async def _run_hardware_connection(self, hardware: HardwareClient):
-        connection = hardware.connection
+    async def _run_hardware_connection(self, device: HardwareDevice):
+        connection = device.hardware.connection
         async for message in connection:
             try:
-                await self._handle_hardware_message(message)
+                await self._handle_hardware_message(message, device)
             except HardwareMessageException as e:
                 self._log(f"Ignoring invalid Hardware message: {e}", 'warning')
+                self._messages_rejected.labels(self.ROLE_HARDWARE, 'invalid').inc()
                 await self._send_error_message(f"Message had no effect ({e})", connection)
 
-    async def _init_hardware_connection(self, hardware: HardwareClient):
-        connection = hardware.connection
-        asyncio.create_task(connection.send(json.dumps([
-            'talkback_message',
-            {
-                "data": TalkbackMessage("Hello, hardware").toDict()
-            }
-        ])))
-        payload = self._get_status()
-        await self._broadcast_to_clients(json.dumps([
-            'hardware_connected',
-            {
-                "data": payload.toDict()
-            }
-        ]))
-
-    def _record_hardware_connection(self, websocket: ServerConnection, message: Message):
-        self._log(f'Initializing hardware from {websocket.remote_address}', 'info')
+    async def _init_hardware_connection(self, device: HardwareDevice):
+        asyncio.create_task(self._send_message_to_hardware(device, Message('talkback_message', {
+            "data": TalkbackMessage("Hello, hardware").toDict(),
+            # The first message back tells the hardware which codec it got
+            "meta": {"codec": device.hardware.codec.NAME},
+        })))
+        self._broadcast_to_device_subscribers(device, self._status.message('hardware_connected', include_roster=False),
+                                              'hardware_connected')
+        self._publish(self.TOPIC_HARDWARE, self._get_hardware_sync_payload(device))
+
+    def _parse_hardware_init(self, message: Message) -> HardwareState:
         try:
             hardware_state = HardwareState.from_message(message)
         except KeyError as e:
             raise InvalidHardwareInitPayloadException(f'Invalid attributes payload: "{e}"') from e
-        except DTOInvalidAttributesException as e:
+        except DTOInvalidException as e:
             raise InvalidHardwareInitPayloadException(f'{e}') from e
+        if hardware_state.id is None:
+            hardware_state.id = ''
 
-        self._hardware_connection = HardwareClient(str(websocket.id), websocket)
-        self._hardware_state = hardware_state
+        return hardware_state
 
-        return self._hardware_connection
+    def _record_hardware_connection(self, websocket: ServerConnection, device: HardwareDevice,
+                                    hardware_state: HardwareState, codec: AbstractCodec):
+        self._log(f'Initializing hardware "{device.id}" from {websocket.remote_address}', 'info')
+        hardware = HardwareClient(device.id, websocket)
+        hardware.codec = codec
+        self._set_hardware_connection(device, hardware)
+        self._set_hardware_state(device, hardware_state)
 
-    async def _handle_hardware_connection(self, websocket: ServerConnection, message: Message):
+    async def _handle_hardware_connection(self, message: Message, websocket: ServerConnection):
+        self._limit_frame_size(websocket, self._hardware_parser)
+        # The hardware declares its device id as the id of its initial state
+        hardware_state = self._parse_hardware_init(message)
+        device_id = hardware_state.id or HardwareDevice.DEFAULT_ID
         async with self._hardware_lock:
-            if self.is_hardware_connected:
-                raise HardwareAlreadyConnectedException()
+            if self._get_device(device_id).is_connected:
+                raise HardwareAlreadyConnectedException(device_id)
+            if self._backplane and not await self._backplane.claim(self._get_hardware_claim_key(device_id)):
+                raise HardwareAlreadyConnectedException(device_id)
 
-            hardware = self._record_hardware_connection(websocket, message)
+            device = self._get_device(device_id)
+            self._record_hardware_connection(websocket, device, hardware_state,
+                                             Codecs.negotiate(self._get_meta(message).get('codecs')))
         try:
-            await self._init_hardware_connection(hardware)
-            await self._run_hardware_connection(hardware)
+            await self._init_hardware_connection(device)
+            await self._run_hardware_connection(device)
         finally:
-            await self._handle_hardware_disconnect()
+            await self._handle_hardware_disconnect(device)
 
-    async def _handle_client_connection(self, websocket: ServerConnection, message: Message):
-        client = self._record_client_connection(websocket, message)
+    async def _handle_client_connection(self, message: Message, websocket: ServerConnection):
+        self._limit_frame_size(websocket, self._client_parser)
+        client, restored = self._record_client_connection(websocket, message)
         try:
-            await self._init_client_connection(client)
+            await self._init_client_connection(client, restored, self._get_meta(message).get('last_seq'))
             await self._run_client_connection(client)
         finally:
             await self._handle_client_disconnect(client)
 
+    # <editor-fold desc="Hot restart">
+    def export_state(self) -> Dict:
+        self._handed_off = True
+        return {
+            "roster_version": self._roster_version,
+            "events": self._events.export_state() if self._events is not None else None,
+            "sessions": [self._get_session_export(client) for client in
+                         chain(self._client_connections.values(), self._returning_clients.values())],
+            "hardware_states": [device.state.toDict() for device in self._devices.values() if device.is_connected],
+        }
+
+    @staticmethod
+    def _get_session_export(client: UiClient) -> Dict:
+        return {
+            "ui_client": client.toDict(),
+            "resume_token": client.resume_token,
+            "device_ids": None if client.device_ids is None else sorted(client.device_ids),
+        }
+
+    def import_state(self, state: Dict, grace: float):
+        self._roster_version = state['roster_version']
+        if self._events is not None and state['events'] is not None:
+            # Carried on as-is, so clients resuming from before the restart are sent just what they missed
+            self._events.import_state(state['events'])
+        for session in state['sessions']:
+            client = UiClient.from_dict(session['ui_client'])
+            client.device_ids = None if session['device_ids'] is None else set(session['device_ids'])
+            client.resume_token = session['resume_token']
+            if client.resume_token:
+                self._sessions[client.resume_token] = client.id
+            self._name_broker.reserve_name(client.name)
+            self._hold_returning_client(client, grace)
+        # The last known state is shown until the hardware reconnects and reports its own
+        for state_data in state['hardware_states']:
+            hardware_state = HardwareState.from_dict(state_data)
+            self._set_hardware_state(self._get_device(hardware_state.id), hardware_state)
+            self._handed_over_device_ids.add(hardware_state.id)
+        self._status.invalidate()
+        self._log(f'Holding {len(self._returning_clients)} handed over client(s) for {grace}s', 'info')
+        self._handoff_grace_handle = asyncio.get_running_loop().call_later(grace, self._end_handoff_grace)
+
+    def _end_handoff_grace(self):
+        # Handed over clients that haven't come back expire on their own timers
+        self._handoff_grace_handle = None
+        for device_id in self._handed_over_device_ids:
+            device = self._devices.get(device_id)
+            if device and not device.is_connected:
+                self._clear_hardware(device)
+        self._handed_over_device_ids.clear()
+
+    # </editor-fold>
+
+    # <editor-fold desc="Backplane">
+    # Workers of a multi-worker server mirror each other's UI clients and hardware devices.  Changes received over the
+    # backplane are applied as local changes, so each worker's roster versions stay contiguous
+    def _publish(self, topic: str, payload: Dict):
+        if self._backplane:
+            self._backplane.publish(topic, payload)
+
+    def _publish_roster_change(self, change: RosterChange):
+        self._publish(self.TOPIC_ROSTER, change.toDict())
+
+    def _get_hardware_claim_key(self, device_id: str):
+        return f'{self.CLAIM_HARDWARE}:{device_id}'
+
+    def _get_hardware_sync_payload(self, device: HardwareDevice):
+        return {
+            "event": "connected",
+            "device_id": device.id,
+            "hardware_client": device.hardware.toDict(),
+            "hardware_state": device.state.toDict(),
+        }
+
+    def _on_backplane_message(self, topic: str, payload: Dict, worker_id: str):
+        match topic:
+            case self.TOPIC_ROSTER:
+                self._on_remote_roster_change(RosterChange.from_dict(payload), worker_id)
+            case self.TOPIC_HARDWARE:
+                self._on_remote_hardware(payload)
+            case self.TOPIC_PATCH:
+                self._on_remote_patch(payload)
+            case self.TOPIC_SYNC_REQUEST:
+                self._on_sync_request(worker_id)
+            case self.TOPIC_SYNC:
+                self._on_sync(payload, worker_id)
+            case self.TOPIC_SESSION_TAKEN:
+                self._on_session_taken(payload)
+            case AbstractBackplane.TOPIC_WORKER_LEFT:
+                self._on_worker_left(payload, worker_id)
+            case _:
+                self._log(f'Ignoring unknown backplane topic "{topic}"', 'warning')
+
+    def _on_remote_join(self, client: UiClient, worker_id: str):
+        if client.id in self._remote_clients or client.id in self._client_connections:
+            return
+        self._name_broker.reserve_name(client.name)
+        self._add_remote_client(client, worker_id)
+        self._presence.add(self._record_roster_change(RosterChange.ACTION_JOINED, client))
+
+    def _on_remote_leave(self, client: UiClient):
+        self._discard_remote_client(client)
+        self._name_broker.release_name(client.name)
+        self._presence.add(self._record_roster_change(RosterChange.ACTION_LEFT, client))
+
+    def _on_remote_roster_change(self, remote_change: RosterChange, worker_id: str):
+        if remote_change.action == RosterChange.ACTION_JOINED:
+            self._on_remote_join(remote_change.ui_client, worker_id)
+            return
+
+        client = self._remote_clients.get(remote_change.ui_client.id)
+        if not client:
+            return
+        match remote_change.action:
+            case RosterChange.ACTION_LEFT:
+                self._on_remote_leave(client)
+            case RosterChange.ACTION_RENAMED:
+                self._name_broker.release_name(client.name)
+                client.name = remote_change.ui_client.name
+                self._name_broker.reserve_name(client.name)
+                self._presence.add(self._record_roster_change(RosterChange.ACTION_RENAMED, client,
+                                                              remote_change.change_detail))
+
+    def _on_remote_hardware(self, payload: Dict):
+        device = self._get_device(payload['device_id'])
+        match payload['event']:
+            case 'connected':
+                self._set_hardware_connection(device, HardwareClient.from_dict(payload['hardware_client']))
+                self._set_hardware_state(device, HardwareState.from_dict(payload['hardware_state']))
+                self._broadcast_to_device_subscribers(device, self._status.message('hardware_connected',
+                                                                                    include_roster=False),
+                                                      'hardware_connected')
+            case 'disconnected':
+                if device.is_connected and not device.is_local:
+                    self._clear_hardware(device)
+            case 'updated':
+                self._set_hardware_state(device, HardwareState.from_dict(payload['hardware_state']))
+                self._broadcast_hardware_updated(device)
+
+    def _on_remote_patch(self, payload: Dict):
+        device = self._devices.get(payload['device_id'])
+        if device and device.is_local:
+            self._patches.add(device.id, PartialHardwareState.from_dict(payload['patch']))
+
+    def _on_session_taken(self, payload: Dict):
+        # A client resumed one of this worker's sessions on another worker, which has announced it as a new client
+        client_id = self._sessions.get(payload['resume_token'])
+        if client_id is None:
+            return
+        current = self._client_connections.get(client_id)
+        if current:
+            self._suspend_client(current)
+            asyncio.create_task(self._close_client_connection(current))
+        returning = self._returning_clients.get(client_id)
+        if returning:
+            self._log(f'Client {client_id} resumed on another worker', 'info')
+            self._discard_returning_client(returning)
+            self._announce_departure(returning)
+
+    def _on_sync_request(self, worker_id: str):
+        self._publish(self.TOPIC_SYNC, {
+            "to": worker_id,
+            "ui_clients": [client.toDict() for client in
+                           chain(self._client_connections.values(), self._returning_clients.values())],
+            "hardware": [self._get_hardware_sync_payload(device) for device in self._devices.values() if
+                         device.is_local],
+        })
+
+    def _on_sync(self, payload: Dict, worker_id: str):
+        if payload['to'] != self._backplane.worker_id:
+            return
+        for client_data in payload['ui_clients']:
+            self._on_remote_join(UiClient.from_dict(client_data), worker_id)
+        for hardware_payload in payload['hardware']:
+            if not self._get_device(hardware_payload['device_id']).is_connected:
+                self._on_remote_hardware(hardware_payload)
+
+    def _on_worker_left(self, payload: Dict, worker_id: str):
+        self._log(f'Worker {worker_id} left the backplane', 'warning')
+        for client_id in [cid for cid, wid in self._remote_client_workers.items() if wid == worker_id]:
+            self._on_remote_leave(self._remote_clients[client_id])
+        claim_prefix = self._get_hardware_claim_key('')
+        for key in payload['keys']:
+            if key.startswith(claim_prefix):
+                self._on_remote_hardware({"event": "disconnected", "device_id": key[len(claim_prefix):]})
+
+    # </editor-fold>
+
+    @staticmethod
+    def _limit_frame_size(websocket: ServerConnection, parser: MessageParser):
+        """
+        Have the connection itself refuse frames over the parser's limit (closing with 1009, message too big) as they're
+        read, rather than buffering them whole only to be turned away
+        """
+        websocket.protocol.max_message_size = parser.max_size
+
     async def _handle(self, websocket: ServerConnection):
-        init_message = await websocket.recv()
-        self._log(f'Init message received: {init_message}', 'debug')
         try:
-            message = Message.parse(init_message)
-            message_type = message.type
+            async with asyncio.timeout(self._init_timeout):
+                init_message = await websocket.recv()
+        except TimeoutError as e:
+            raise InitPayloadInvalidException(f'No init message received within {self._init_timeout}s') from e
+        self._log('Init message received: %s', 'debug', init_message)
+        try:
+            message = self._init_parser.parse(init_message)
         except MessageException as e:
             raise InitPayloadInvalidException(str(e)) from e
 
-        match message_type:
-            case 'init_hardware':
-                await self._handle_hardware_connection(websocket, message)
-            case 'init_client':
-                await self._handle_client_connection(websocket, message)
-            case _:
-                raise InitPayloadInvalidException(f'Invalid initialization type "{message_type}"')
+        try:
+            await self._dispatcher.dispatch(self.ROLE_INIT, message, websocket)
+        except UnhandledMessageException as e:
+            raise InitPayloadInvalidException(f'Invalid initialization type "{message.type}"') from e
 
     async def handle(self, websocket: ServerConnection):
         try:
@@ -395,15 +1237,12 @@ class ServerConnectionManager(Logs, AbstractServerConnectionManager):
             self._log_exception('Hardware Init Error')
             await self._send_error_message(message, websocket)
         except HardwareAlreadyConnectedException as e:
-            self._log('Hardware already connected; aborting connection', 'warning')
-            await self._send_error_message('Hardware already connected.  Buh bye now.', websocket)
+            self._log(f'Hardware "{e}" already connected; aborting connection', 'warning')
+            await self._send_error_message(f'Hardware "{e}" already connected.  Buh bye now.', websocket)
 
     async def _send_error_message(self, message: str, connection: ServerConnection):
-        await connection.send(json.dumps([
-            'error',
-            {
-                "errors": [{
-                    "detail": message
-                }]
-            }
-        ]))
+        await Message('error', {
+            "errors": [{
+                "detail": message
+            }]
+        }).send(connection)
@@ -0,0 +1,109 @@
+from typing import Callable, Dict, List
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.dto.AbstractDto import AbstractDto
+from ledsockets.dto.ServerStatus import ServerStatus
+from ledsockets.support.Message import Message
+
+
+class StatusSnapshot:
+    """
+    Authoritative, lazily built ServerStatus for a connection manager
+
+    The status is built and serialized at most once between invalidations.  JSON frames reuse the cached encoding and
+    splice any per-recipient relationships (e.g. the recipient's own `ui_client`) onto the end of the document, so only
+    the per-recipient part is encoded for each send.  Other codecs encode the cached document whole
+    """
+    # A serialized status always ends by closing its relationships object and then the document itself
+    DOCUMENT_TAIL = b'}}'
+
+    def __init__(self, build: Callable[[bool], ServerStatus]):
+        """
+        :param build: callable(include_roster) returning a fresh ServerStatus
+        """
+        self._build = build
+        self._statuses: Dict[bool, ServerStatus] = {}
+        self._documents: Dict[bool, Dict] = {}
+        self._encoded: Dict[bool, bytes] = {}
+
+    @property
+    def is_dirty(self):
+        return not self._statuses
+
+    def invalidate(self):
+        self._statuses.clear()
+        self._documents.clear()
+        self._encoded.clear()
+
+    def get_status(self, include_roster=True) -> ServerStatus:
+        """
+        The cached status.  Treat it as read only; use `frame(extra_relationships=...)` for per-recipient data
+        """
+        status = self._statuses.get(include_roster)
+        if status is None:
+            status = self._build(include_roster)
+            self._statuses[include_roster] = status
+        return status
+
+    def get_document(self, include_roster=True) -> Dict:
+        document = self._documents.get(include_roster)
+        if document is None:
+            document = self.get_status(include_roster).toDict()
+            self._documents[include_roster] = document
+        return document
+
+    def get_encoded(self, include_roster=True) -> bytes:
+        encoded = self._encoded.get(include_roster)
+        if encoded is None:
+            encoded = Codecs.JSON.dumps(self.get_document(include_roster))
+            self._encoded[include_roster] = encoded
+        return encoded
+
+    @staticmethod
+    def _get_relationships(extra_relationships: Dict[str, AbstractDto | List[AbstractDto]]) -> Dict[str, Dict]:
+        return {
+            key: {"data": [item.toDict() for item in model] if isinstance(model, list) else model.toDict()}
+            for key, model in extra_relationships.items()
+        }
+
+    def frame(self, event_type: str, include_roster=True,
+              extra_relationships: Dict[str, AbstractDto | List[AbstractDto]] | None = None,
+              meta: Dict | None = None) -> bytes:
+        """
+        Build a JSON encoded `[event_type, {"data": server_status}]` frame
+
+        :param extra_relationships: relationships to splice into this frame only, keyed by relationship name
+        :param meta: Dict sent alongside the status as the payload's `meta`
+        """
+        return self._splice(event_type, include_roster,
+                            self._get_relationships(extra_relationships) if extra_relationships else None, meta)
+
+    def message(self, event_type: str, include_roster=True,
+                extra_relationships: Dict[str, AbstractDto | List[AbstractDto]] | None = None,
+                meta: Dict | None = None) -> Message:
+        """
+        Build a `[event_type, {"data": server_status}]` Message, already encoded as a JSON frame
+
+        :param extra_relationships: relationships to add to this message only, keyed by relationship name
+        :param meta: Dict sent alongside the status as the payload's `meta`
+        """
+        document = self.get_document(include_roster)
+        relationships = self._get_relationships(extra_relationships) if extra_relationships else None
+        if relationships:
+            document = {**document, "relationships": {**document['relationships'], **relationships}}
+        payload = {"data": document}
+        if meta:
+            payload['meta'] = meta
+        encoded = self._splice(event_type, include_roster, relationships, meta)
+        return Message(event_type, payload, {Codecs.JSON.NAME: encoded})
+
+    def _splice(self, event_type: str, include_roster: bool, relationships: Dict[str, Dict] | None,
+                meta: Dict | None) -> bytes:
+        dumps = Codecs.JSON.dumps
+        document = self.get_encoded(include_roster)
+        if relationships:
+            spliced = b''.join(b',' + dumps(key) + b':' + dumps(data) for key, data in relationships.items())
+            document = document[:-len(self.DOCUMENT_TAIL)] + spliced + self.DOCUMENT_TAIL
+        if meta:
+            return b''.join((b'[', dumps(event_type), b',{"data":', document, b',"meta":', dumps(meta), b'}]'))
+        return b''.join((b'[', dumps(event_type), b',{"data":', document, b'}]'))
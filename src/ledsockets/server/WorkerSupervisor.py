@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+from functools import partial
+from typing import Callable, List
+
+from ledsockets.log.LogsConcern import Logs
+from ledsockets.server.BackplaneHub import BackplaneHub
+
+
+class WorkerSupervisor(Logs):
+    """
+    Runs a multi-worker server: starts the backplane hub, then spawns `workers` processes that each serve the same
+    port (SO_REUSEPORT) and share state over the hub.  Workers that die are restarted until shutdown, and SIGUSR2
+    replaces the workers one at a time, draining each, so the port is always served
+    """
+    LOGGER_NAME = 'ledsockets.server.supervisor'
+    MONITOR_INTERVAL = 1.0
+    STOP_TIMEOUT = 10.0
+    # Seconds a replacement worker is given to start serving before the worker it replaces is stopped
+    ROLLING_RESTART_DELAY = 2.0
+
+    def __init__(self, workers: int, target: Callable[[str], None], backplane_path: str, drain_window: float = 0.0):
+        """
+        :param workers: int number of worker processes
+        :param target: picklable callable(backplane_path) run in each worker process
+        :param backplane_path: str Unix socket path for the backplane hub
+        :param drain_window: float seconds a worker takes to drain its connections (see Server)
+        """
+        Logs.__init__(self)
+        self._workers = workers
+        self._target = target
+        self._drain_window = drain_window
+        self._hub = BackplaneHub(backplane_path)
+        self._context = multiprocessing.get_context('spawn')
+        self._processes: List[multiprocessing.Process] = []
+        self._stop_event = asyncio.Event()
+        self._restart_task: asyncio.Task | None = None
+
+    def _spawn(self):
+        process = self._context.Process(target=self._target, args=(self._hub.path,), daemon=False)
+        process.start()
+        self._log(f'Started worker pid {process.pid}', 'info')
+        return process
+
+    def _restart_dead_workers(self):
+        for i, process in enumerate(self._processes):
+            if not process.is_alive():
+                self._log(f'Worker pid {process.pid} exited ({process.exitcode}); restarting', 'warning')
+                self._processes[i] = self._spawn()
+
+    async def _join_worker(self, process: multiprocessing.Process, timeout: float = STOP_TIMEOUT):
+        await asyncio.get_running_loop().run_in_executor(None, process.join, timeout)
+        if process.is_alive():
+            self._log(f'Worker pid {process.pid} did not stop; killing', 'warning')
+            process.kill()
+
+    async def _stop_workers(self):
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            await self._join_worker(process)
+
+    async def _rolling_restart(self):
+        for i, process in enumerate(list(self._processes)):
+            self._processes[i] = self._spawn()
+            await asyncio.sleep(self.ROLLING_RESTART_DELAY)
+            if process.is_alive():
+                self._log(f'Draining replaced worker pid {process.pid}', 'info')
+                os.kill(process.pid, signal.SIGUSR1)
+                await self._join_worker(process, self._drain_window + self.STOP_TIMEOUT)
+        self._log('Rolling restart complete', 'info')
+
+    def _handle_restart_signal(self, sig):
+        if self._restart_task and not self._restart_task.done():
+            self._log(f'[{sig.name}] Already restarting', 'warning')
+            return
+        self._log(f'[{sig.name}] Restarting {len(self._processes)} worker(s)', 'info')
+        self._restart_task = asyncio.create_task(self._rolling_restart())
+
+    def _handle_signal(self, sig):
+        self._log(f'[{sig.name}] Stopping {len(self._processes)} worker(s)', 'info')
+        self._stop_event.set()
+
+    async def serve(self):
+        self._log(f'Starting {self._workers} worker(s) (pid {os.getpid()})', 'info')
+        loop = asyncio.get_running_loop()
+        signals = (signal.SIGINT, signal.SIGTERM)
+        for sig in signals:
+            loop.add_signal_handler(sig, partial(self._handle_signal, sig))
+        loop.add_signal_handler(signal.SIGUSR2, partial(self._handle_restart_signal, signal.SIGUSR2))
+        await self._hub.start()
+        try:
+            self._processes = [self._spawn() for _ in range(self._workers)]
+            while not self._stop_event.is_set():
+                try:
+                    async with asyncio.timeout(self.MONITOR_INTERVAL):
+                        await self._stop_event.wait()
+                except TimeoutError:
+                    self._restart_dead_workers()
+        finally:
+            if self._restart_task:
+                self._restart_task.cancel()
+            await self._stop_workers()
+            await self._hub.stop()
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+            loop.remove_signal_handler(signal.SIGUSR2)
+            self._log('Stopped', 'info')
@@ -0,0 +1,71 @@
+import bisect
+from typing import Dict, Iterable, List
+
+
+class Histogram:
+    """
+    Counts observations into fixed buckets, Prometheus style
+
+    Each bucket counts the observations no greater than its upper bound, so observing costs a bisect and an increment
+    whatever has been observed before.  Percentiles are estimated by interpolating within the bucket they fall in
+    """
+    # Seconds, from 100µs to 10s
+    LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        """
+        :param buckets: upper bounds, ascending; observations above the last go in an implicit +Inf bucket
+        """
+        self.bounds = tuple(buckets)
+        if not self.bounds or list(self.bounds) != sorted(set(self.bounds)):
+            raise ValueError('Histogram buckets must be ascending and unique')
+        self._counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self._counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self) -> List[int]:
+        """
+        :return: observations no greater than each bound, then the total (the +Inf bucket)
+        """
+        counts = []
+        total = 0
+        for count in self._counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Estimate the value below which `q` (0-1) of the observations fall
+
+        :return: None if nothing has been observed; the last bound if the estimate falls in the +Inf bucket
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.bounds, self._counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * max(0.0, rank - seen) / count
+            seen += count
+            lower = bound
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict:
+        """
+        JSON-serializable summary: count, sum, p50, p99 and p999
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "p999": self.percentile(0.999),
+        }
+
@@ -0,0 +1,44 @@
+import time
+from typing import Dict
+
+from ledsockets.support.MessageDispatcher import Handler
+from ledsockets.support.Metrics import MetricFamily
+
+
+class LatencyMiddleware:
+    """
+    MessageDispatcher middleware timing each handler into a histogram per role and message type
+
+    Handlers that raise are timed too
+    """
+
+    def __init__(self, histograms: MetricFamily | None = None):
+        """
+        :param histograms: histogram family labelled by role and message type to record into, e.g. one registered
+            with a MetricsRegistry; a private one with the default buckets if not provided
+        """
+        if histograms is None:
+            histograms = MetricFamily('handler_duration_seconds', 'Message handler latency', MetricFamily.HISTOGRAM,
+                                      ['role', 'type'])
+        self.histograms = histograms
+
+    def __call__(self, role: str, message_type: str, handler: Handler) -> Handler:
+        histogram = self.histograms.labels(role, message_type)
+
+        async def timed(message, *args):
+            start = time.perf_counter()
+            try:
+                return await handler(message, *args)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return timed
+
+    def get_snapshots(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Summaries of the handlers' latencies in seconds (see Histogram.snapshot), keyed by role and message type
+        """
+        snapshots = {}
+        for (role, message_type), histogram in self.histograms.children.items():
+            snapshots.setdefault(role, {})[message_type] = histogram.snapshot()
+        return snapshots
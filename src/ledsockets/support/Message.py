@@ -1,32 +1,91 @@
 import json
 from typing import Dict
 
+from ledsockets.codec.AbstractCodec import AbstractCodec, CodecException
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.support.Sideloader import Sideloader
+
 
 class MessageException(Exception):
     pass
 
 
 class Message:
-    def __init__(self, type: str, payload: Dict):
+    def __init__(self, type: str, payload: Dict, encoded: Dict[str, bytes] | None = None):
+        """
+        :param encoded: this message already encoded as a frame, keyed by codec name
+        """
         self.type = type
         self.payload = payload
+        # Frames are encoded at most once per codec however many connections they go to, so treat the payload as
+        # read only once the message has been encoded
+        self._encoded: Dict[str, bytes] = encoded or {}
+        self._sideloaded: Message | None = None
+
+    def encode(self, codec: AbstractCodec | None = None) -> bytes:
+        """
+        The message encoded as the payload of a websocket frame
+        """
+        codec = codec or Codecs.DEFAULT
+        encoded = self._encoded.get(codec.NAME)
+        if encoded is None:
+            encoded = codec.dumps([self.type, self.payload])
+            self._encoded[codec.NAME] = encoded
+        return encoded
+
+    def with_seq(self, seq: int) -> 'Message':
+        """
+        A copy of the message with `seq` added to its payload.  A JSON frame already encoded is carried over with the
+        sequence number spliced onto the end of its payload rather than encoded again
+        """
+        encoded = {}
+        frame = self._encoded.get(Codecs.JSON.NAME)
+        # A compact JSON frame of a dict payload ends by closing the payload and then the frame: `...}]`
+        if frame is not None and isinstance(self.payload, dict) and 'seq' not in self.payload and \
+                frame.endswith(b'}]'):
+            separator = b',' if self.payload else b''
+            encoded[Codecs.JSON.NAME] = b''.join((frame[:-2], separator, b'"seq":', str(seq).encode(), b'}]'))
+        return Message(self.type, {**self.payload, "seq": seq}, encoded)
+
+    def sideloaded(self) -> 'Message':
+        """
+        This message with the related resources in its payload's data sideloaded into an `included` list (see
+        Sideloader), built at most once however many clients asked for it.  It's this message itself when there's
+        nothing to sideload
+        """
+        if self._sideloaded is None:
+            data = self.payload.get('data') if isinstance(self.payload, dict) else None
+            included = Sideloader(data).sideload() if isinstance(data, (dict, list)) else None
+            if included and included[1]:
+                self._sideloaded = Message(self.type, {**self.payload, "data": included[0], "included": included[1]})
+            else:
+                self._sideloaded = self
+        return self._sideloaded
+
+    async def send(self, connection, codec: AbstractCodec | None = None):
+        """
+        :param connection: websockets Connection to send the message over
+        """
+        codec = codec or Codecs.DEFAULT
+        await connection.send(self.encode(codec), text=not codec.BINARY)
 
-    def toJson(self):
-        return json.dumps([
-            self.type,
-            self.payload
-        ])
+    def toJson(self) -> str:
+        return json.dumps([self.type, self.payload])
 
     @classmethod
-    def parse(cls, message: str):
+    def parse(cls, message: str | bytes, codec: AbstractCodec | None = None):
+        """
+        :param codec: AbstractCodec the message is encoded with; recognised from the message itself by default
+        """
+        codec = codec or Codecs.for_frame(message)
         try:
-            data = json.loads(message)
+            data = codec.loads(message)
             message_type = data[0]
             message_payload = data[1]
             if not message_type:
                 raise MessageException("No message type provided")
-        except json.JSONDecodeError as e:
-            raise MessageException('Non-JSON payload') from e
+        except CodecException as e:
+            raise MessageException(str(e)) from e
         except KeyError as e:
             message = str(e)
             message = 'no message type provided' if message == '0' else "no message payload provided"
@@ -0,0 +1,68 @@
+from typing import Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+
+from ledsockets.support.Message import Message, MessageException
+
+# Called with the message and whatever the dispatcher was given along with it (e.g. the client that sent it)
+Handler = Callable[..., Awaitable]
+# Called with the role, message type and the handler it wraps, once per registered handler; returns the wrapped handler
+Middleware = Callable[[str, str, Handler], Handler]
+
+
+class UnhandledMessageException(MessageException):
+    """Exception raised when no handler is registered for a message's role and type"""
+    pass
+
+
+class MessageDispatcher:
+    """
+    Routes messages to the handler registered for the role of their sender (e.g. `client`) and their type, through a
+    chain of middleware
+
+    Middleware wraps handlers rather than being called per message: each registered handler is wrapped in the chain
+    once, when the handler or middleware is added, so dispatching is a single lookup in a prebuilt table.  Middleware
+    added first is outermost, seeing every message before (and every result after) the middleware added after it
+    """
+
+    def __init__(self):
+        self._handlers: Dict[Tuple[str, str], Handler] = {}
+        self._middleware: List[Tuple[Middleware, Set[str] | None]] = []
+        self._table: Dict[Tuple[str, str], Handler] = {}
+
+    def register(self, role: str, message_type: str, handler: Handler):
+        """
+        Handle messages of a type from a role, replacing any handler already registered for them
+        """
+        self._handlers[(role, message_type)] = handler
+        self._table[(role, message_type)] = self._wrap(role, message_type, handler)
+
+    def use(self, middleware: Middleware, roles: Iterable[str] | None = None):
+        """
+        Add middleware inside any already added
+
+        :param roles: roles whose handlers it wraps; None for all of them
+        """
+        self._middleware.append((middleware, None if roles is None else set(roles)))
+        self._table = {key: self._wrap(*key, handler) for key, handler in self._handlers.items()}
+
+    def _wrap(self, role: str, message_type: str, handler: Handler) -> Handler:
+        for middleware, roles in reversed(self._middleware):
+            if roles is None or role in roles:
+                handler = middleware(role, message_type, handler)
+        return handler
+
+    def get_types(self, role: str) -> List[str]:
+        """
+        Message types with a handler registered for a role
+        """
+        return [message_type for handler_role, message_type in self._handlers if handler_role == role]
+
+    async def dispatch(self, role: str, message: Message, *args):
+        """
+        Pass a message, and any args, to the handler for its role and type
+
+        :raises UnhandledMessageException: if there isn't one
+        """
+        handler = self._table.get((role, message.type))
+        if handler is None:
+            raise UnhandledMessageException(f'Unrecognized message type: "{message.type}"')
+        return await handler(message, *args)
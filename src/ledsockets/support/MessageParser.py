@@ -0,0 +1,59 @@
+from typing import Iterable
+
+from ledsockets.codec.AbstractCodec import CodecException
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.support.Message import Message, MessageException
+
+
+class FrameTooLargeException(MessageException):
+    """Exception raised when a frame is larger than its sender may send"""
+    pass
+
+
+class UnexpectedMessageTypeException(MessageException):
+    """Exception raised when a frame's message type isn't one its sender may send"""
+    pass
+
+
+class MessageParser:
+    """
+    Parses the frames one kind of connection (e.g. UI clients) sends, in two phases
+
+    First the frame's size is checked and its message type read from the first few bytes and checked against the types
+    the sender may send; only then is the payload decoded.  Oversized and unexpected frames are turned away without
+    their bodies ever being materialized, and callers can act on the type (e.g. rate limit it) before paying for the
+    decode
+    """
+
+    def __init__(self, types: Iterable[str], max_size: int | None = None):
+        """
+        :param types: message types the sender may send
+        :param max_size: int largest frame in bytes the sender may send; None for no limit
+        """
+        self.types = frozenset(types)
+        self.max_size = max_size
+
+    def read_type(self, frame: str | bytes) -> str:
+        """
+        :raises FrameTooLargeException: if the frame is over max_size
+        :raises UnexpectedMessageTypeException: if the frame's type isn't one of types
+        :raises MessageException: if the frame has no readable type
+        """
+        # Text frames arrive as str, whose length in characters can only understate its size in bytes; the connection
+        # enforces the exact limit as frames are read
+        if self.max_size is not None and len(frame) > self.max_size:
+            raise FrameTooLargeException(f'Frame too large (max {self.max_size} bytes)')
+        try:
+            message_type = Codecs.for_frame(frame).read_type(frame)
+        except CodecException as e:
+            raise MessageException(str(e)) from e
+        if message_type not in self.types:
+            raise UnexpectedMessageTypeException(f'Unrecognized message type: "{message_type}"')
+        return message_type
+
+    def parse(self, frame: str | bytes) -> Message:
+        """
+        Check and decode a frame; see read_type for the checks made before decoding
+        """
+        self.read_type(frame)
+        return Message.parse(frame)
@@ -0,0 +1,163 @@
+import math
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from ledsockets.support.Histogram import Histogram
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ('value', '_function')
+
+    def __init__(self):
+        self.value = 0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """
+        Read the gauge's value from `function` when it's collected, for values the owner already keeps (e.g. the size
+        of a dict), so keeping them costs nothing between scrapes
+        """
+        self._function = function
+
+    def get(self) -> float:
+        return self._function() if self._function else self.value
+
+
+class MetricFamily:
+    """
+    A named metric and its children, one per combination of label values
+    """
+    COUNTER = 'counter'
+    GAUGE = 'gauge'
+    HISTOGRAM = 'histogram'
+    TYPES = (COUNTER, GAUGE, HISTOGRAM)
+
+    def __init__(self, name: str, description: str, metric_type: str, label_names: Iterable[str] = (),
+                 buckets: Iterable[float] = Histogram.LATENCY_BUCKETS):
+        """
+        :param buckets: histogram bucket upper bounds; ignored by other types
+        """
+        if metric_type not in self.TYPES:
+            raise ValueError(f'Invalid metric type "{metric_type}"')
+        self.name = name
+        self.description = description
+        self.type = metric_type
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.children: Dict[Tuple[str, ...], Counter | Gauge | Histogram] = {}
+
+    def labels(self, *values) -> Counter | Gauge | Histogram:
+        """
+        The child for a combination of label values, created on first use.  Callers updating the same child often
+        should hold on to it rather than looking it up each time
+        """
+        child = self.children.get(values)
+        if child is not None:
+            return child
+        if len(values) != len(self.label_names):
+            raise ValueError(f'{self.name} takes labels {self.label_names}')
+        if self.type == self.COUNTER:
+            child = Counter()
+        elif self.type == self.GAUGE:
+            child = Gauge()
+        else:
+            child = Histogram(self.buckets)
+        self.children[values] = child
+        return child
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+            return str(int(value))
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+
+    @staticmethod
+    def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+        pairs = []
+        for name, value in zip(names, values):
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{name}="{value}"')
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def expose(self) -> List[str]:
+        """
+        :return: the family's lines in the text exposition format
+        """
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.type}']
+        for values, child in self.children.items():
+            if self.type == self.HISTOGRAM:
+                bounds = [self._format_value(bound) for bound in child.bounds] + ['+Inf']
+                for bound, count in zip(bounds, child.get_cumulative_counts()):
+                    labels = self._format_labels(self.label_names + ('le',), values + (bound,))
+                    lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = self._format_labels(self.label_names, values)
+                lines.append(f'{self.name}_sum{labels} {self._format_value(child.sum)}')
+                lines.append(f'{self.name}_count{labels} {child.count}')
+            else:
+                value = child.get() if self.type == self.GAUGE else child.value
+                lines.append(f'{self.name}{self._format_labels(self.label_names, values)} {self._format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges and fixed-bucket histograms, collected in the Prometheus text exposition format
+
+    Updating a metric is an attribute increment (or a bisect, for histograms) on an object its owner holds on to; all
+    the formatting is left to collection
+    """
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _get_family(self, name: str, description: str, metric_type: str, label_names: Iterable[str],
+                    **kwargs) -> MetricFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = MetricFamily(name, description, metric_type, label_names, **kwargs)
+        elif family.type != metric_type or family.label_names != tuple(label_names):
+            raise ValueError(f'Metric "{name}" is already registered as a {family.type} with labels '
+                             f'{family.label_names}')
+        return family
+
+    def counter(self, name: str, description: str, label_names: Iterable[str] = ()) -> MetricFamily:
+        """
+        Register a counter, or get the one already registered with the same name
+        """
+        return self._get_family(name, description, MetricFamily.COUNTER, label_names)
+
+    def gauge(self, name: str, description: str, label_names: Iterable[str] = ()) -> MetricFamily:
+        return self._get_family(name, description, MetricFamily.GAUGE, label_names)
+
+    def histogram(self, name: str, description: str, label_names: Iterable[str] = (),
+                  buckets: Iterable[float] = Histogram.LATENCY_BUCKETS) -> MetricFamily:
+        return self._get_family(name, description, MetricFamily.HISTOGRAM, label_names, buckets=buckets)
+
+    def expose(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines += family.expose()
+        return '\n'.join(lines) + '\n'
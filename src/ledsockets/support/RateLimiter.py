@@ -0,0 +1,75 @@
+from collections import Counter
+from typing import Dict, Mapping, Tuple
+
+from ledsockets.support.TokenBucket import TokenBucket
+
+# (events per second, burst)
+Limit = Tuple[float, int]
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limits per client and message type
+
+    Message types without their own limit share a `default` bucket; a limit of None leaves a type unlimited.  Buckets
+    are created on a client's first message of each type, and counts of throttled messages are kept per type
+    """
+    DEFAULT_KEY = 'default'
+    DEFAULT_LIMITS: Dict[str, Limit] = {
+        'default': (20, 40),
+        'patch_hardware_state': (10, 20),
+        'change_name': (1, 3),
+        'request_status': (2, 5),
+        'subscribe': (2, 5),
+    }
+
+    def __init__(self, limits: Mapping[str, Limit | None] | None = None):
+        """
+        :param limits: limits keyed by message type, plus an optional `default`; DEFAULT_LIMITS if not provided
+        """
+        self._limits = dict(self.DEFAULT_LIMITS if limits is None else limits)
+        self._default = self._limits.pop(self.DEFAULT_KEY, None)
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._throttled = Counter()
+
+    @staticmethod
+    def parse_limit(value: str) -> Limit | None:
+        """
+        Parse a "<rate>/<burst>" limit such as "1/3" (one per second, bursts of three).  "0" or "" disables the limit
+        """
+        value = value.strip()
+        if value in ('', '0'):
+            return None
+        rate, _, burst = value.partition('/')
+        rate = float(rate)
+        return rate, int(burst) if burst else max(1, int(rate))
+
+    def allow(self, client_id: str, message_type: str) -> bool:
+        # Types without their own limit share the client's default bucket, so unknown types can't grow the tables
+        if isinstance(message_type, str) and message_type in self._limits:
+            key, limit = message_type, self._limits[message_type]
+        else:
+            key, limit = self.DEFAULT_KEY, self._default
+        if limit is None:
+            return True
+
+        client_buckets = self._buckets.get(client_id)
+        if client_buckets is None:
+            client_buckets = self._buckets[client_id] = {}
+        bucket = client_buckets.get(key)
+        if bucket is None:
+            bucket = client_buckets[key] = TokenBucket(*limit)
+
+        if bucket.take():
+            return True
+        self._throttled[key] += 1
+        return False
+
+    def forget(self, client_id: str):
+        self._buckets.pop(client_id, None)
+
+    def get_throttled_counts(self) -> Dict[str, int]:
+        """
+        Number of messages throttled since startup, keyed by message type (or `default`)
+        """
+        return dict(self._throttled)
@@ -0,0 +1,295 @@
+"""
+Compiles the DTO types described in `src/types/types.yaml` into `ledsockets/dto/_compiled.py`
+
+    python -m ledsockets.support.SchemaCompiler          # regenerate
+    python -m ledsockets.support.SchemaCompiler --check  # exit 1 if the checked in module is out of date
+
+Needs PyYAML, so it's run at build time and its output checked in; nothing reads types.yaml at runtime
+"""
+import argparse
+import os
+import sys
+import textwrap
+from typing import Dict, List, NamedTuple
+
+from ledsockets.support.TypeDescriptions import TypeDescriptions
+
+
+class AttributeSpec(NamedTuple):
+    name: str
+    kind: str
+    is_list: bool
+    nullable: bool
+    optional: bool
+
+
+class RelationshipSpec(NamedTuple):
+    name: str
+    resource_type: str
+    is_list: bool
+    optional: bool
+
+
+class SchemaCompiler:
+    """
+    Generates a module of straight-line validators and attribute serializers, one of each per DTO type
+
+    `read_<type>(data, path)` checks a resource document field by field, with no lookups beyond the document itself, and
+    returns its id, attributes and relationships (each read by the related type's reader) as a tuple in the order
+    they're described.  `write_<type>_attributes(dto)` builds a DTO's attributes object.  Malformed documents raise
+    DTOInvalidPayloadException, and attributes of the wrong type DTOInvalidAttributesException, naming the offending
+    field by its path
+    """
+    OUTPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'dto', '_compiled.py')
+    LINE_LENGTH = 120
+    KINDS = {'': 'str', 'string': 'str', 'false': 'bool', 'true': 'bool', 'number': 'number', 'any': 'any'}
+    # Expression true for a value that isn't of the kind, and how the kind is described in errors
+    CHECKS = {
+        'str': ('type({0}) is not str', 'a string'),
+        'bool': ('type({0}) is not bool', 'a boolean'),
+        'int': ('type({0}) is not int', 'an integer'),
+        'number': ('type({0}) is not int and type({0}) is not float', 'a number'),
+    }
+    # Names the generated readers use for their own locals
+    RESERVED_NAMES = {'data', 'path', 'resource_id', 'attributes', 'relationships', 'related', 'related_path', 'item',
+                      'i', 'type'}
+    HEADER = '''\
+# Generated from src/types/types.yaml by `python -m ledsockets.support.SchemaCompiler`; do not edit
+"""
+Validators and attribute serializers for the DTO types described in types.yaml; see SchemaCompiler
+"""
+from ledsockets.dto.AbstractDto import DTOInvalidAttributesException, DTOInvalidPayloadException
+
+_MISSING = object()
+_NO_RELATIONSHIPS = {}
+
+
+def _read_resource(data, path, resource_type):
+    if type(data) is not dict:
+        raise DTOInvalidPayloadException(f'{path} must be an object')
+    if data.get('type') != resource_type:
+        raise DTOInvalidPayloadException(f'{path}.type must be "{resource_type}"')
+    resource_id = data.get('id')
+    if resource_id is not None and type(resource_id) is not str:
+        raise DTOInvalidPayloadException(f'{path}.id must be a string')
+    attributes = data.get('attributes')
+    if type(attributes) is not dict:
+        raise DTOInvalidPayloadException(f'{path}.attributes must be an object')
+    return resource_id, attributes
+
+
+def _invalid_attribute(value, path, key, expected):
+    if value is _MISSING:
+        return DTOInvalidAttributesException(f'{path}.attributes.{key} is required')
+    return DTOInvalidAttributesException(f'{path}.attributes.{key} must be {expected}')
+
+
+def _read_relationships(data, path):
+    relationships = data.get('relationships')
+    if relationships is None:
+        return _NO_RELATIONSHIPS
+    if type(relationships) is not dict:
+        raise DTOInvalidPayloadException(f'{path}.relationships must be an object')
+    return relationships
+
+
+def _read_related(relationships, key, path, required):
+    """
+    :return: (the relationship's data, the path to it); data is None for a missing optional relationship
+    """
+    relationship = relationships.get(key)
+    if relationship is None:
+        if required:
+            raise DTOInvalidPayloadException(f'{path}.relationships.{key} is required')
+        return None, None
+    if type(relationship) is not dict or 'data' not in relationship:
+        raise DTOInvalidPayloadException(f'{path}.relationships.{key} must be an object with data')
+    related = relationship['data']
+    if related is None and required:
+        raise DTOInvalidPayloadException(f'{path}.relationships.{key}.data is required')
+    return related, f'{path}.relationships.{key}.data'
+
+
+def _read_list(related, path):
+    if type(related) is not list:
+        raise DTOInvalidPayloadException(f'{path} must be a list')
+    return related
+'''
+
+    def __init__(self, descriptions: TypeDescriptions):
+        self._descriptions = descriptions
+
+    # <editor-fold desc="Reading descriptions">
+    def _get_attribute_spec(self, key: str, description) -> AttributeSpec:
+        name = key.rstrip('?')
+        if name in self.RESERVED_NAMES or not name.isidentifier():
+            raise ValueError(f'Unsupported attribute name "{name}"')
+        if isinstance(description, bool) or not isinstance(description, (str, int, float)):
+            raise ValueError(f'Unsupported description for attribute "{name}": {description!r}')
+        if isinstance(description, int):
+            kind, is_list, nullable = 'int', False, False
+        elif isinstance(description, float):
+            kind, is_list, nullable = 'number', False, False
+        else:
+            options = [option.strip() for option in description.split('|')]
+            nullable = 'null' in options
+            options = [option for option in options if option != 'null']
+            if len(options) != 1:
+                raise ValueError(f'Unsupported description for attribute "{name}": {description!r}')
+            is_list = options[0].endswith('[]')
+            kind = self.KINDS.get(options[0][:-2] if is_list else options[0])
+            if kind is None or (is_list and kind == 'any'):
+                raise ValueError(f'Unsupported description for attribute "{name}": {description!r}')
+        return AttributeSpec(name, kind, is_list, nullable, key.endswith('?'))
+
+    def _get_relationship_spec(self, key: str, description, optional: bool) -> RelationshipSpec:
+        name = key.rstrip('?')
+        if name in self.RESERVED_NAMES or not name.isidentifier():
+            raise ValueError(f'Unsupported relationship name "{name}"')
+        resource_type = description['data'] if isinstance(description, dict) else None
+        if not isinstance(resource_type, str):
+            raise ValueError(f'Unsupported description for relationship "{name}": {description!r}')
+        is_list = resource_type.endswith('[]')
+        if is_list:
+            resource_type = resource_type[:-2]
+        if resource_type not in self._descriptions.resources:
+            raise ValueError(f'Relationship "{name}" is to unknown type "{resource_type}"')
+        return RelationshipSpec(name, resource_type, is_list, optional or key.endswith('?'))
+
+    def get_specs(self, description: Dict):
+        attributes = [self._get_attribute_spec(key, value) for key, value in
+                      (description.get('attributes') or {}).items()]
+        relationships = []
+        for key in ('relationships', 'relationships?'):
+            relationships += [self._get_relationship_spec(name, value, key.endswith('?')) for name, value in
+                              (description.get(key) or {}).items()]
+        return attributes, relationships
+
+    # </editor-fold>
+
+    # <editor-fold desc="Generating code">
+    def _get_check(self, spec: AttributeSpec):
+        """
+        :return: (expression true for an invalid value, description of valid values); expression is None for any value
+        """
+        if spec.kind == 'any':
+            return None, 'set'
+        check, expected = self.CHECKS[spec.kind]
+        if spec.is_list:
+            check = f'type({{0}}) is not list or any({check.format("item")} for item in {{0}})'
+            expected = f'a list of {expected.split(" ", 1)[1]}s'
+        check = check.format(spec.name)
+        if spec.nullable:
+            expected += ' or null'
+        if spec.nullable or spec.optional:
+            check = f'{spec.name} is not None and ' + (f'({check})' if ' or ' in check or ' and ' in check else check)
+        return check, expected
+
+    def _compile_attribute_read(self, spec: AttributeSpec) -> List[str]:
+        default = '' if spec.optional else ', _MISSING'
+        lines = [f"    {spec.name} = attributes.get('{spec.name}'{default})"]
+        check, expected = self._get_check(spec)
+        if check is None and not spec.optional:
+            check = f'{spec.name} is _MISSING'
+        if check is not None:
+            lines += [
+                f'    if {check}:',
+                f"        raise _invalid_attribute({spec.name}, path, '{spec.name}', '{expected}')",
+            ]
+        return lines
+
+    @staticmethod
+    def _compile_relationship_read(spec: RelationshipSpec) -> List[str]:
+        lines = [f"    related, related_path = _read_related(relationships, '{spec.name}', path, {not spec.optional})"]
+        reader = f'read_{spec.resource_type}'
+        if spec.is_list:
+            lines += [
+                f'    {spec.name} = None if related is None else [',
+                f"        {reader}(item, f'{{related_path}}[{{i}}]') for i, item in "
+                f"enumerate(_read_list(related, related_path))",
+                '    ]',
+            ]
+        else:
+            lines.append(f'    {spec.name} = None if related is None else {reader}(related, related_path)')
+        return lines
+
+    def compile_reader(self, resource_type: str, description: Dict) -> str:
+        attributes, relationships = self.get_specs(description)
+        fields = ['resource_id'] + [spec.name for spec in attributes] + [spec.name for spec in relationships]
+        lines = [
+            f"def read_{resource_type}(data, path='data'):",
+            '    """',
+            *textwrap.wrap(f':return: ({", ".join(["id"] + fields[1:])}{"," if len(fields) == 1 else ""})',
+                           self.LINE_LENGTH, initial_indent=' ' * 4, subsequent_indent=' ' * 8),
+            '    """',
+            f"    resource_id, attributes = _read_resource(data, path, '{resource_type}')",
+        ]
+        for spec in attributes:
+            lines += self._compile_attribute_read(spec)
+        if relationships:
+            lines.append('    relationships = _read_relationships(data, path)')
+            for spec in relationships:
+                lines += self._compile_relationship_read(spec)
+        returned = f'    return {", ".join(fields)}' + (',' if len(fields) == 1 else '')
+        if len(returned) > self.LINE_LENGTH:
+            returned = '\n'.join(['    return ('] + textwrap.wrap(
+                ', '.join(fields), self.LINE_LENGTH, initial_indent=' ' * 8, subsequent_indent=' ' * 8) + ['    )'])
+        lines.append(returned)
+        return '\n'.join(lines)
+
+    def compile_writer(self, resource_type: str, description: Dict) -> str:
+        attributes, _ = self.get_specs(description)
+        required = [spec for spec in attributes if not spec.optional]
+        optional = [spec for spec in attributes if spec.optional]
+        lines = [f'def write_{resource_type}_attributes(dto):']
+        if required:
+            lines.append(f'    {"return" if not optional else "attributes ="} {{')
+            lines += [f'        "{spec.name}": dto.{spec.name},' for spec in required]
+            lines.append('    }')
+        else:
+            lines.append(f'    {"return" if not optional else "attributes ="} {{}}')
+        if optional:
+            for spec in optional:
+                lines += [
+                    f'    if dto.{spec.name} is not None:',
+                    f"        attributes['{spec.name}'] = dto.{spec.name}",
+                ]
+            lines.append('    return attributes')
+        return '\n'.join(lines)
+
+    def compile(self) -> str:
+        sections = [self.HEADER]
+        for resource_type, description in self._descriptions.resources.items():
+            if not resource_type.isidentifier():
+                raise ValueError(f'Unsupported type name "{resource_type}"')
+            sections.append(self.compile_reader(resource_type, description) + '\n')
+            sections.append(self.compile_writer(resource_type, description) + '\n')
+        return '\n\n'.join(sections)
+
+    # </editor-fold>
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the DTO types in types.yaml into validators and serializers')
+    parser.add_argument('--types', default=TypeDescriptions.DEFAULT_PATH, help='path to the type descriptions')
+    parser.add_argument('--output', default=SchemaCompiler.OUTPUT_PATH, help='module to write')
+    parser.add_argument('--check', action='store_true', help="don't write; exit 1 if the module is out of date")
+    args = parser.parse_args()
+
+    try:
+        descriptions = TypeDescriptions.load(args.types)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    source = SchemaCompiler(descriptions).compile()
+    if args.check:
+        with open(args.output) as output_file:
+            if output_file.read() != source:
+                print(f'{os.path.relpath(args.output)} is out of date with {os.path.relpath(args.types)}')
+                sys.exit(1)
+        return
+    with open(args.output, 'w') as output_file:
+        output_file.write(source)
+
+
+if __name__ == '__main__':
+    main()
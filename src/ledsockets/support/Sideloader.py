@@ -0,0 +1,86 @@
+from typing import Dict, List, Tuple
+
+
+class Sideloader:
+    """
+    Rewrites resource documents so each related resource is serialized once, JSON:API `included` style
+
+    A related resource that appears more than once across the documents (e.g. a client that's in the roster and is also
+    the status's `ui_client`) is serialized once in an `included` list, and every relationship to it carries only its
+    `{"type", "id"}`.  Resources that appear once stay where they are, since a reference plus an included copy is
+    bigger than the resource alone, as do resources without an id, which can't be referenced.  Relationships to one of
+    the documents themselves are references too.  Where a resource appears with different contents (e.g. a stale
+    `source` snapshot of a client since renamed), the first one found is kept.  Documents are never modified
+    """
+
+    def __init__(self, data: Dict | List[Dict]):
+        """
+        :param data: resource document or list of them, e.g. a message payload's data
+        """
+        self._data = data
+        self._primary = set()
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._included: Dict[Tuple[str, str], Dict | None] = {}
+
+    @staticmethod
+    def _get_key(resource) -> Tuple[str, str] | None:
+        if not isinstance(resource, dict) or not resource.get('id'):
+            return None
+        return resource.get('type'), resource['id']
+
+    @staticmethod
+    def _get_related(resource: Dict) -> List[Dict]:
+        related = []
+        for relationship in (resource.get('relationships') or {}).values():
+            data = relationship.get('data') if isinstance(relationship, dict) else None
+            if isinstance(data, list):
+                related += data
+            elif data is not None:
+                related.append(data)
+        return related
+
+    def _count(self, resource: Dict):
+        for related in self._get_related(resource):
+            key = self._get_key(related)
+            if key is None:
+                self._count(related)
+                continue
+            self._counts[key] = self._counts.get(key, 0) + 1
+            # A resource's own relations count once however many times it appears
+            if self._counts[key] == 1 and key not in self._primary:
+                self._count(related)
+
+    def _link(self, resource: Dict) -> Dict:
+        if not isinstance(resource, dict) or not resource.get('relationships'):
+            return resource
+        relationships = {}
+        for name, relationship in resource['relationships'].items():
+            data = relationship.get('data') if isinstance(relationship, dict) else None
+            if isinstance(data, list):
+                relationship = {**relationship, "data": [self._reference(related) for related in data]}
+            elif data is not None:
+                relationship = {**relationship, "data": self._reference(data)}
+            relationships[name] = relationship
+        return {**resource, "relationships": relationships}
+
+    def _reference(self, resource: Dict) -> Dict:
+        key = self._get_key(resource)
+        if key is None or (self._counts.get(key, 0) < 2 and key not in self._primary):
+            return self._link(resource)
+        if key not in self._primary and key not in self._included:
+            # Hold its place, so resources are included in the order they're first found
+            self._included[key] = None
+            self._included[key] = self._link(resource)
+        return {"type": resource['type'], "id": resource['id']}
+
+    def sideload(self) -> Tuple[Dict | List[Dict], List[Dict]]:
+        """
+        :return: (the rewritten data, the included resources)
+        """
+        documents = self._data if isinstance(self._data, list) else [self._data]
+        self._primary = {key for key in map(self._get_key, documents) if key is not None}
+        for document in documents:
+            if isinstance(document, dict):
+                self._count(document)
+        linked = [self._link(document) for document in documents]
+        return linked if isinstance(self._data, list) else linked[0], list(self._included.values())
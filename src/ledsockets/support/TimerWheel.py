@@ -0,0 +1,60 @@
+import math
+from typing import Dict, Hashable, List, Set
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel: `slots` buckets of `tick` seconds each, advanced one bucket per tick by its owner
+
+    Adding and removing a timer are O(1) and advancing costs only the timers that expire, so many thousands of timers
+    can be kept without a heap or a per-timer event loop handle.  Delays are rounded up to whole ticks and must be
+    shorter than the wheel's span (`slots * tick`); longer delays are clamped to the span
+    """
+
+    def __init__(self, tick: float, slots: int):
+        if tick <= 0 or slots < 2:
+            raise ValueError('TimerWheel needs a positive tick and at least 2 slots')
+        self.tick = tick
+        self._slots: List[Set[Hashable]] = [set() for _ in range(slots)]
+        self._slot_by_key: Dict[Hashable, int] = {}
+        self._cursor = 0
+
+    def __len__(self):
+        return len(self._slot_by_key)
+
+    def __contains__(self, key: Hashable):
+        return key in self._slot_by_key
+
+    @property
+    def span(self):
+        return self.tick * (len(self._slots) - 1)
+
+    def add(self, key: Hashable, delay: float):
+        """
+        Schedule `key` to expire after `delay` seconds, replacing any timer it already has
+        """
+        self.remove(key)
+        ticks = min(max(1, math.ceil(delay / self.tick)), len(self._slots) - 1)
+        slot = (self._cursor + ticks) % len(self._slots)
+        self._slots[slot].add(key)
+        self._slot_by_key[key] = slot
+
+    def remove(self, key: Hashable):
+        slot = self._slot_by_key.pop(key, None)
+        if slot is not None:
+            self._slots[slot].discard(key)
+
+    def advance(self) -> List[Hashable]:
+        """
+        Move the wheel on one tick
+
+        :return: the keys whose timers expired
+        """
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        expired = self._slots[self._cursor]
+        if not expired:
+            return []
+        self._slots[self._cursor] = set()
+        for key in expired:
+            del self._slot_by_key[key]
+        return list(expired)
@@ -0,0 +1,28 @@
+import time
+
+
+class TokenBucket:
+    """
+    Allows up to `burst` events at once, refilled at `rate` events per second
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def take(self, now: float | None = None) -> bool:
+        """
+        Spend a token if one is available
+
+        :param now: float monotonic time; defaults to the current time
+        :return: bool whether the event is allowed
+        """
+        now = time.monotonic() if now is None else now
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
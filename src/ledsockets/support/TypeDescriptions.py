@@ -0,0 +1,59 @@
+import os
+import re
+from typing import Dict, List, Tuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class TypeDescriptions:
+    """
+    The DTO types and message formats described in `src/types/types.yaml`
+
+    Resource types (documents with a `type`) are keyed by type, plain types (e.g. `Errors`) by the comment naming them
+    and message formats are (message type, payload type) pairs in the order they're described.  Values are kept as the
+    strings they're written as (`on: false` reads as `{'on': 'false'}`) rather than YAML's booleans.  Reading them
+    needs PyYAML, which is only a development dependency
+    """
+    DEFAULT_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'types', 'types.yaml')
+    # Message formats aren't quite YAML (`['presence_batch', roster_change[]]`), so they're read as text
+    MESSAGE_FORMAT = re.compile(r"^\[\s*'(\w+)',\s*([\w{}]+(?:\[])?)\s*]", re.MULTILINE)
+
+    def __init__(self, resources: Dict[str, Dict], plain: Dict[str, Dict], messages: List[Tuple[str, str]]):
+        self.resources = resources
+        self.plain = plain
+        self.messages = messages
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> 'TypeDescriptions':
+        if yaml is None:
+            raise RuntimeError('PyYAML is needed to read the type descriptions: pip install -e ".[dev]"')
+
+        class Loader(yaml.SafeLoader):
+            pass
+
+        Loader.yaml_implicit_resolvers = {
+            key: [resolver for resolver in resolvers if resolver[0] != 'tag:yaml.org,2002:bool']
+            for key, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+        }
+
+        resources: Dict[str, Dict] = {}
+        plain: Dict[str, Dict] = {}
+        messages: List[Tuple[str, str]] = []
+        with open(path) as types_file:
+            chunks = types_file.read().split('\n---')
+        for chunk in chunks:
+            message_format = cls.MESSAGE_FORMAT.search(chunk)
+            if message_format:
+                messages.append((message_format.group(1), message_format.group(2)))
+                continue
+            document = yaml.load(chunk, Loader)
+            if isinstance(document, dict) and 'type' in document:
+                resources[document['type']] = document
+            elif isinstance(document, dict):
+                comments = [line[1:].strip() for line in chunk.strip().splitlines() if line.startswith('#')]
+                if comments:
+                    plain[comments[0]] = document
+        return cls(resources, plain, messages)
@@ -0,0 +1,46 @@
+import unittest
+from types import SimpleNamespace
+
+from ledsockets.server.AdmissionController import AdmissionController
+
+
+def make_connection(ip, headers=None):
+    return SimpleNamespace(remote_address=(ip, 50000), request=SimpleNamespace(headers=headers or {}))
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_global_cap_rejects_with_retry_after(self):
+        """Test connections over the global cap are rejected with a retry-after reason until one is released."""
+        admission = AdmissionController(max_connections=2, retry_after=7)
+        first, second, third = make_connection('10.0.0.1'), make_connection('10.0.0.2'), make_connection('10.0.0.3')
+
+        self.assertIsNone(admission.admit(first))
+        self.assertIsNone(admission.admit(second))
+        self.assertEqual('Server at capacity; retry after 7s', admission.admit(third))
+        self.assertEqual(1, admission.rejected_count)
+
+        admission.release(first)
+        self.assertIsNone(admission.admit(third))
+
+    def test_per_ip_cap(self):
+        """Test one address can't take more than its share of connections."""
+        admission = AdmissionController(max_connections_per_ip=1)
+
+        self.assertIsNone(admission.admit(make_connection('10.0.0.1')))
+        self.assertIsNotNone(admission.admit(make_connection('10.0.0.1')))
+        self.assertIsNone(admission.admit(make_connection('10.0.0.2')))
+
+    def test_forwarded_ip_only_trusted_from_proxies(self):
+        """Test X-Real-IP is used for trusted proxies and ignored for anyone else."""
+        admission = AdmissionController(trusted_proxies=['127.0.0.1'])
+
+        self.assertEqual('203.0.113.9', admission.get_client_ip(make_connection('127.0.0.1', {
+            'X-Real-IP': '203.0.113.9'
+        })))
+        self.assertEqual('10.0.0.1', admission.get_client_ip(make_connection('10.0.0.1', {
+            'X-Real-IP': '203.0.113.9'
+        })))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from ledsockets.server.Backplane import AbstractBackplane, UnixSocketBackplane
+from ledsockets.server.BackplaneHub import BackplaneHub
+
+
+class TestBackplaneHub(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.hub = BackplaneHub(os.path.join(self.tmpdir.name, 'backplane.sock'))
+        await self.hub.start()
+        self.received = {'a': [], 'b': []}
+        self.workers = {}
+        for worker_id in ('a', 'b'):
+            backplane = UnixSocketBackplane(self.hub.path, worker_id)
+            backplane.subscribe(lambda topic, payload, origin, wid=worker_id:
+                                self.received[wid].append((topic, payload, origin)))
+            await backplane.start()
+            self.workers[worker_id] = backplane
+        await asyncio.sleep(0.05)
+
+    async def asyncTearDown(self):
+        for backplane in self.workers.values():
+            await backplane.stop()
+        await self.hub.stop()
+        self.tmpdir.cleanup()
+
+    async def test_publish_relays_to_other_workers_only(self):
+        """Test a published message reaches every other worker but not its publisher."""
+        self.workers['a'].publish('roster', {"id": "1"})
+        await asyncio.sleep(0.05)
+
+        self.assertEqual([('roster', {"id": "1"}, 'a')], self.received['b'])
+        self.assertEqual([], self.received['a'])
+
+    async def test_bad_frames_are_skipped(self):
+        """Test a frame that fails to decode doesn't stop a worker hearing the messages after it."""
+        self.hub._writers['b'].write(b'{not json\n[1]\n')
+        self.workers['a'].publish('roster', {"id": "1"})
+        await asyncio.sleep(0.05)
+
+        self.assertEqual([('roster', {"id": "1"}, 'a')], self.received['b'])
+
+    async def test_claim_is_exclusive_until_released(self):
+        """Test only one worker holds a claim at a time."""
+        self.assertTrue(await self.workers['a'].claim('hardware'))
+        self.assertFalse(await self.workers['b'].claim('hardware'))
+        self.workers['a'].release('hardware')
+
+        self.assertTrue(await self.workers['b'].claim('hardware'))
+
+    async def test_worker_left_releases_claims(self):
+        """Test a departing worker's claims are released and announced."""
+        self.assertTrue(await self.workers['a'].claim('hardware'))
+        await self.workers.pop('a').stop()
+        await asyncio.sleep(0.05)
+
+        self.assertEqual([(AbstractBackplane.TOPIC_WORKER_LEFT, {"keys": ['hardware']}, 'a')], self.received['b'])
+        self.assertTrue(await self.workers['b'].claim('hardware'))
+
+
+if __name__ == '__main__':
+    unittest.main()
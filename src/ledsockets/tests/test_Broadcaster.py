@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+from ledsockets.server.Broadcaster import Broadcaster
+from ledsockets.server.ClientOutbox import RecipientClosedException
+
+
+class StubOutbox:
+    def __init__(self, exception: Exception | None = None):
+        self.exception = exception
+        self.frames = []
+
+    def push(self, frame, event_type=None):
+        if self.exception:
+            raise self.exception
+        self.frames.append((event_type, frame))
+
+
+class TestBroadcaster(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.failures = []
+        self.broadcaster = Broadcaster(self.failures.append)
+
+    async def test_broadcast_pushes_same_encoded_frame_to_all_recipients(self):
+        """Test the message is encoded once and pushed to every recipient."""
+        recipients = [('a', StubOutbox()), ('b', StubOutbox())]
+        sent = self.broadcaster.broadcast('["hello", {}]', recipients, 'hello')
+
+        self.assertEqual(2, sent)
+        event_type, frame_a = recipients[0][1].frames[0]
+        _, frame_b = recipients[1][1].frames[0]
+        self.assertEqual('hello', event_type)
+        self.assertEqual(b'["hello", {}]', frame_a)
+        self.assertIs(frame_a, frame_b)
+
+    async def test_broadcast_reports_failures_out_of_band(self):
+        """Test failing recipients are skipped and reported after the broadcast returns."""
+        closed = RecipientClosedException('closed')
+        recipients = [('open', StubOutbox()), ('closed', StubOutbox(closed))]
+        sent = self.broadcaster.broadcast(b'[]', recipients)
+
+        self.assertEqual(1, sent)
+        self.assertEqual([], self.failures)
+        await asyncio.sleep(0)
+        self.assertEqual([{'closed': closed}], self.failures)
+
+
+if __name__ == '__main__':
+    unittest.main()
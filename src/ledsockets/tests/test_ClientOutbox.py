@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+
+from websockets.protocol import State
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.server.ClientOutbox import ClientOutbox, RecipientClosedException, SlowRecipientException
+from ledsockets.support.Message import Message
+
+
+class StubProtocol:
+    def __init__(self):
+        self.state = State.OPEN
+        self.frames = []
+
+    def send_text(self, frame):
+        self.frames.append(frame)
+
+    def send_binary(self, frame):
+        self.frames.append(('binary', frame))
+
+
+class StubTransport:
+    def __init__(self):
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+
+class StubConnection:
+    def __init__(self):
+        self.protocol = StubProtocol()
+        self.transport = StubTransport()
+        self.sent = []
+        self.release = asyncio.Event()
+
+    def send_data(self):
+        pass
+
+    async def send(self, frame, text=None):
+        await self.release.wait()
+        self.sent.append(frame)
+
+
+class TestClientOutbox(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.connection = StubConnection()
+        self.failures = []
+
+    def make_outbox(self, **kwargs):
+        outbox = ClientOutbox(self.connection, self.failures.append, **kwargs)
+        outbox.start()
+        self.addCleanup(outbox.close)
+        return outbox
+
+    async def test_writes_straight_through_when_connection_keeps_up(self):
+        """Test frames skip the queue while the connection's write buffer is small."""
+        outbox = self.make_outbox()
+        outbox.push('["a", {}]')
+
+        self.assertEqual([b'["a", {}]'], self.connection.protocol.frames)
+        self.assertEqual(0, outbox.depth)
+
+    async def test_encodes_messages_with_its_codec(self):
+        """Test Messages are encoded with the outbox's codec and sent as binary frames for binary codecs."""
+        message = Message('a', {})
+        self.make_outbox().push(message)
+        self.make_outbox(codec=Codecs.PACKED).push(message)
+
+        self.assertEqual([b'["a",{}]', ('binary', Codecs.PACKED.dumps(['a', {}]))], self.connection.protocol.frames)
+
+    async def test_queues_while_backed_up_and_drains_in_order(self):
+        """Test frames queue once the write buffer backs up and are sent in order by the writer task."""
+        outbox = self.make_outbox(max_buffer_size=10)
+        self.connection.transport.buffered = 11
+        outbox.push(b'1')
+        outbox.push(b'2')
+        self.assertEqual(2, outbox.depth)
+
+        self.connection.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual([b'1', b'2'], self.connection.sent)
+        self.assertEqual(0, outbox.depth)
+
+    async def test_drop_oldest_policy(self):
+        """Test the oldest frames are discarded on overflow."""
+        outbox = self.make_outbox(max_size=2, policy=ClientOutbox.POLICY_DROP_OLDEST, max_buffer_size=0)
+        self.connection.transport.buffered = 1
+        for frame in [b'1', b'2', b'3']:
+            outbox.push(frame)
+
+        self.assertEqual([b'2', b'3'], [frame for _, frame in outbox._queue])
+        self.assertEqual(1, outbox.dropped)
+
+    async def test_collapse_policy_keeps_latest_hardware_update(self):
+        """Test only the newest hardware_updated survives an overflow under the collapse policy."""
+        outbox = self.make_outbox(max_size=2, policy=ClientOutbox.POLICY_COLLAPSE, max_buffer_size=0)
+        self.connection.transport.buffered = 1
+        outbox.push(b'on', 'hardware_updated')
+        outbox.push(b'joined', 'client_joined')
+        outbox.push(b'off', 'hardware_updated')
+
+        self.assertEqual([b'joined', b'off'], [frame for _, frame in outbox._queue])
+
+    async def test_disconnect_policy_gives_up_after_threshold(self):
+        """Test the disconnect policy raises once too many frames have been dropped."""
+        outbox = self.make_outbox(max_size=1, policy=ClientOutbox.POLICY_DISCONNECT, disconnect_threshold=2,
+                                  max_buffer_size=0)
+        self.connection.transport.buffered = 1
+        outbox.push(b'1')
+        outbox.push(b'2')
+        with self.assertRaises(SlowRecipientException):
+            outbox.push(b'3')
+        self.assertTrue(outbox.closed)
+        with self.assertRaises(RecipientClosedException):
+            outbox.push(b'4')
+
+    async def test_invalid_policy(self):
+        """Test unknown policies are rejected."""
+        with self.assertRaises(ValueError):
+            ClientOutbox(self.connection, self.failures.append, policy='nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
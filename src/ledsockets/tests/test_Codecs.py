@@ -0,0 +1,72 @@
+import json
+import unittest
+from unittest import mock
+
+from ledsockets.codec.AbstractCodec import CodecException
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.codec.JsonCodec import JsonCodec
+from ledsockets.support.Message import Message, MessageException
+
+
+class TestCodecs(unittest.TestCase):
+    def test_negotiate(self):
+        """Test the first offered codec that's supported wins, falling back to JSON."""
+        with mock.patch.object(Codecs.PACKED, 'accelerated', True):
+            self.assertIs(Codecs.PACKED, Codecs.negotiate(['msgpack', 'packed', 'json']))
+        self.assertIs(Codecs.JSON, Codecs.negotiate(['json', 'packed']))
+        self.assertIs(Codecs.JSON, Codecs.negotiate(['msgpack']))
+        self.assertIs(Codecs.JSON, Codecs.negotiate('packed'))
+        self.assertIs(Codecs.JSON, Codecs.negotiate(None))
+
+    def test_packed_needs_msgpack(self):
+        """Test packed isn't agreed to when it would fall back to the pure Python packer."""
+        with mock.patch.object(Codecs.PACKED, 'accelerated', False):
+            self.assertIs(Codecs.JSON, Codecs.negotiate(['packed', 'json']))
+
+    def test_messages_parse_from_either_codec(self):
+        """Test Message.parse recognises the codec of a frame, whether it arrived as text or binary."""
+        for frame in ['["a", {"data": 1}]', Codecs.JSON.dumps(['a', {"data": 1}]), Codecs.PACKED.dumps(['a', {"data": 1}])]:
+            with self.subTest(frame=frame):
+                message = Message.parse(frame)
+                self.assertEqual(('a', {"data": 1}), (message.type, message.payload))
+
+        with self.assertRaises(MessageException):
+            Message.parse(b'\x92\xc1')
+
+    def test_json_frames_with_leading_whitespace(self):
+        """Test binary JSON frames are recognised after leading whitespace."""
+        frame = b' \t\r\n["a", {"data": 1}]'
+        self.assertIs(Codecs.JSON, Codecs.for_frame(frame))
+        self.assertEqual('a', Codecs.JSON.read_type(frame))
+        message = Message.parse(frame)
+        self.assertEqual(('a', {"data": 1}), (message.type, message.payload))
+        self.assertIs(Codecs.JSON, Codecs.for_frame(b'  '))
+
+    def test_messages_encode_once_per_codec(self):
+        """Test a message is encoded at most once for each codec."""
+        message = Message('a', {"data": 1})
+        json_frame = message.encode(Codecs.JSON)
+        packed_frame = message.encode(Codecs.PACKED)
+
+        self.assertEqual(b'["a",{"data":1}]', json_frame)
+        self.assertIs(json_frame, message.encode(Codecs.JSON))
+        self.assertIs(packed_frame, message.encode(Codecs.PACKED))
+        self.assertEqual(json.loads(json_frame), json.loads(message.toJson()))
+
+    def test_json_backends_agree(self):
+        """Test the accelerated and standard library JSON backends encode to the same bytes and read each other."""
+        value = ['a', {"data": {"name": "Zoë", "on": True, "version": 3, "ids": None}}]
+        accelerated = JsonCodec()
+        standard = JsonCodec(accelerated=False)
+
+        self.assertEqual('json', standard.backend)
+        self.assertEqual(standard.dumps(value), accelerated.dumps(value))
+        self.assertEqual(value, standard.loads(accelerated.dumps(value)))
+        self.assertEqual(value, accelerated.loads(standard.dumps(value)))
+        for codec in (accelerated, standard):
+            with self.subTest(backend=codec.backend), self.assertRaises(CodecException):
+                codec.loads(b'["a", {')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from ledsockets.dto.AbstractDto import DTOInvalidAttributesException
+from ledsockets.dto.DeviceSubscription import DeviceSubscription
+
+
+class TestDeviceSubscription(unittest.TestCase):
+    def test_from_attributes_accepts_device_list(self):
+        """Test a list of device ids is parsed."""
+        subscription = DeviceSubscription.from_attributes({"device_ids": ["porch", "garage"]})
+
+        self.assertEqual(["porch", "garage"], subscription.device_ids)
+
+    def test_from_attributes_accepts_null_for_all_devices(self):
+        """Test null device_ids subscribes to every device."""
+        subscription = DeviceSubscription.from_attributes({"device_ids": None})
+
+        self.assertIsNone(subscription.device_ids)
+
+    def test_from_attributes_rejects_invalid_device_ids(self):
+        """Test device_ids must be a list of strings."""
+        with self.assertRaises(DTOInvalidAttributesException):
+            DeviceSubscription.from_attributes({"device_ids": "porch"})
+        with self.assertRaises(DTOInvalidAttributesException):
+            DeviceSubscription.from_attributes({"device_ids": [1, 2]})
+        with self.assertRaises(DTOInvalidAttributesException):
+            DeviceSubscription.from_attributes({})
+
+
+if __name__ == '__main__':
+    unittest.main()
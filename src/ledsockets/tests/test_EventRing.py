@@ -0,0 +1,89 @@
+import unittest
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.server.EventRing import EventRing
+from ledsockets.support.Message import Message
+
+
+class TestEventRing(unittest.TestCase):
+    def test_append_numbers_messages(self):
+        """Test appended messages get the next sequence number added to a copy of their payload."""
+        ring = EventRing(seq=41)
+        message = Message('hardware_updated', {"data": {"id": "1"}})
+        sequenced = ring.append(message, 'hardware_updated', '1', ['a'])
+
+        self.assertEqual(b'["hardware_updated",{"data":{"id":"1"},"seq":42}]', sequenced.encode(Codecs.JSON))
+        self.assertEqual({"data": {"id": "1"}}, message.payload)
+        self.assertEqual(42, ring.seq)
+        [entry] = ring.since(41)
+        self.assertEqual((42, sequenced, 'hardware_updated', '1', ('a',)), entry)
+
+    def test_append_keeps_encoding(self):
+        """Test an already encoded JSON frame gets the sequence number spliced in rather than being encoded again."""
+        ring = EventRing()
+        encoded = Message('server_status', {"data": {"id": "1"}, "meta": {"codec": "json"}}).encode(Codecs.JSON)
+        message = Message('server_status', {"data": {"id": "1"}, "meta": {"codec": "json"}}, {'json': encoded})
+        empty = Message('heartbeat', {}, {'json': b'["heartbeat",{}]'})
+
+        sequenced = ring.append(message)
+        self.assertEqual(encoded[:-2] + b',"seq":1}]', sequenced.encode(Codecs.JSON))
+        self.assertEqual({"data": {"id": "1"}, "meta": {"codec": "json"}, "seq": 1},
+                         Message.parse(sequenced.encode(Codecs.JSON)).payload)
+        self.assertEqual(b'["heartbeat",{"seq":2}]', ring.append(empty).encode(Codecs.JSON))
+
+    def test_since(self):
+        """Test `since` returns just the newer entries, oldest first, and nothing when caught up."""
+        ring = EventRing()
+        for i in range(3):
+            ring.append(Message('talkback', {"data": i}))
+
+        self.assertEqual([2, 3], [entry.seq for entry in ring.since(1)])
+        self.assertEqual([1, 2, 3], [entry.seq for entry in ring.since(0)])
+        self.assertEqual([], ring.since(3))
+
+    def test_since_unknown_seq(self):
+        """Test `since` returns None for sequence numbers that were never issued."""
+        ring = EventRing()
+        ring.append(Message('talkback', {"data": 1}))
+
+        self.assertIsNone(ring.since(2))
+        self.assertIsNone(ring.since(-1))
+
+    def test_since_overflowed(self):
+        """Test `since` returns None once entries after the given seq have been dropped from the ring."""
+        ring = EventRing(2)
+        for i in range(4):
+            ring.append(Message('talkback', {"data": i}))
+
+        self.assertEqual(2, len(ring))
+        self.assertEqual([4], [entry.seq for entry in ring.since(3)])
+        self.assertEqual([3, 4], [entry.seq for entry in ring.since(2)])
+        self.assertIsNone(ring.since(1))
+
+    def test_since_skipped_seq(self):
+        """Test a ring counting on from a handed over seq has nothing to replay from before it."""
+        ring = EventRing(seq=11)
+        ring.append(Message('talkback', {"data": 1}))
+
+        self.assertIsNone(ring.since(10))
+        self.assertEqual([12], [entry.seq for entry in ring.since(11)])
+
+    def test_state_round_trip(self):
+        """Test a ring carrying on from another's exported state replays the same entries and carries on numbering."""
+        ring = EventRing()
+        ring.append(Message('talkback', {"data": 1}))
+        ring.append(Message('hardware_updated', {"data": 2}), 'hardware_updated', '1', ['a'])
+
+        restored = EventRing()
+        restored.import_state(Codecs.JSON.loads(Codecs.JSON.dumps(ring.export_state())))
+
+        self.assertEqual(2, restored.seq)
+        [entry] = restored.since(1)
+        self.assertEqual((2, 'hardware_updated', '1', ('a',)),
+                         (entry.seq, entry.event_type, entry.device_id, entry.exclude_ids))
+        self.assertEqual(ring.since(1)[0].message.encode(Codecs.JSON), entry.message.encode(Codecs.JSON))
+        self.assertEqual(3, restored.append(Message('talkback', {"data": 3})).payload['seq'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.dto.ServerStatus import ServerStatus
+from ledsockets.dto.UiClient import UiClient
+
+
+class TestHardwareState(unittest.TestCase):
+    def setUp(self):
+        self.state = HardwareState(False, '', 'porch')
+
+    def test_serializations_are_cached(self):
+        """Test toDict() and encode() are only rebuilt after a change."""
+        document = self.state.toDict()
+        encoded = self.state.encode(Codecs.PACKED)
+        self.assertIs(document, self.state.toDict())
+        self.assertIs(encoded, self.state.encode(Codecs.PACKED))
+        self.assertEqual(Codecs.JSON.dumps(document), self.state.encode(Codecs.JSON))
+
+    def test_setters_invalidate_the_cache(self):
+        """Test changing a field through its setter bumps the version and rebuilds the serializations."""
+        for field, value in [('on', True), ('status_description', 'On'), ('id', 'garage'),
+                             ('source', UiClient('client_1', None, 'Client A')),
+                             ('change_detail', ChangeDetail(True, False, source_id='client_1'))]:
+            with self.subTest(field=field):
+                version = self.state.version
+                document = self.state.toDict()
+                encoded = self.state.encode()
+                setattr(self.state, field, value)
+                self.assertGreater(self.state.version, version)
+                self.assertIsNot(document, self.state.toDict())
+                self.assertEqual(Codecs.DEFAULT.dumps(self.state.toDict()), self.state.encode())
+                self.assertNotEqual(encoded, self.state.encode())
+
+    def test_unchanged_relations_are_reused(self):
+        """Test statuses share the cached documents of clients that haven't changed, and pick up ones that have."""
+        client = UiClient('client_1', None, 'Client A')
+        first = ServerStatus(True)
+        first.append_relationship('ui_clients', client)
+        second = ServerStatus(True)
+        second.append_relationship('ui_clients', client)
+        self.assertIs(first.toDict()['relationships']['ui_clients']['data'][0],
+                      second.toDict()['relationships']['ui_clients']['data'][0])
+
+        client.name = 'Client B'
+        third = ServerStatus(True)
+        third.append_relationship('ui_clients', client)
+        self.assertEqual('Client B', third.toDict()['relationships']['ui_clients']['data'][0]['attributes']['name'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from ledsockets.support.Histogram import Histogram
+
+
+class TestHistogram(unittest.TestCase):
+    def test_observations_are_bucketed(self):
+        """Test each observation counts towards the first bucket whose bound it doesn't exceed."""
+        histogram = Histogram([1, 5, 10])
+        for value in (0.5, 1, 3, 10, 50):
+            histogram.observe(value)
+
+        self.assertEqual([2, 3, 4, 5], histogram.get_cumulative_counts())
+        self.assertEqual(5, histogram.count)
+        self.assertEqual(64.5, histogram.sum)
+
+    def test_percentiles_interpolate_within_buckets(self):
+        """Test percentiles are estimated from the bucket they fall in."""
+        histogram = Histogram([10, 20, 30])
+        for value in range(1, 21):
+            histogram.observe(value)
+
+        self.assertEqual(10, histogram.percentile(0.5))
+        self.assertEqual(15, histogram.percentile(0.75))
+        self.assertEqual(20, histogram.percentile(1))
+        self.assertIsNone(Histogram().percentile(0.5))
+
+    def test_overflow_is_reported_as_the_last_bound(self):
+        """Test observations beyond the last bucket don't invent a value."""
+        histogram = Histogram([1, 2])
+        histogram.observe(100)
+
+        self.assertEqual(2, histogram.percentile(0.99))
+
+    def test_invalid_buckets(self):
+        """Test buckets must be ascending and unique."""
+        for buckets in ([], [2, 1], [1, 1]):
+            with self.subTest(buckets=buckets), self.assertRaises(ValueError):
+                Histogram(buckets)
+
+
+if __name__ == '__main__':
+    unittest.main()
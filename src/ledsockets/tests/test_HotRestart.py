@@ -0,0 +1,44 @@
+import os
+import socket
+import unittest
+from unittest import mock
+
+from ledsockets.server.HotRestart import HotRestart
+
+
+class TestHotRestart(unittest.TestCase):
+    def test_handover_round_trip(self):
+        """Test the listening socket and state prepared by one process are picked up from the environment by the next."""
+        listener = socket.create_server(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+        state = {"roster_version": 3, "ui_clients": []}
+
+        restart = HotRestart()
+        restart.prepare(listener, state)
+        self.assertTrue(restart.is_prepared)
+        listener.close()
+
+        with mock.patch.dict(os.environ, restart.get_environment()):
+            inherited = HotRestart.from_environment(grace=2.0)
+            self.assertNotIn(HotRestart.LISTEN_FD_ENV, os.environ)
+
+        self.assertEqual(state, inherited.state)
+        self.assertEqual(2.0, inherited.grace)
+        self.assertEqual(port, inherited.listen_socket.getsockname()[1])
+        with socket.create_connection(('127.0.0.1', port)):
+            accepted, _ = inherited.listen_socket.accept()
+            accepted.close()
+        inherited.listen_socket.close()
+
+    def test_nothing_inherited(self):
+        """Test a normally started process inherits nothing."""
+        with mock.patch.dict(os.environ, {}, clear=True):
+            inherited = HotRestart.from_environment()
+
+        self.assertIsNone(inherited.listen_socket)
+        self.assertIsNone(inherited.state)
+        self.assertFalse(inherited.is_prepared)
+
+
+if __name__ == '__main__':
+    unittest.main()
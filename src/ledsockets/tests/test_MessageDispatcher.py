@@ -0,0 +1,95 @@
+import unittest
+
+from ledsockets.support.LatencyMiddleware import LatencyMiddleware
+from ledsockets.support.Message import Message
+from ledsockets.support.MessageDispatcher import MessageDispatcher, UnhandledMessageException
+
+
+class TestMessageDispatcher(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = []
+        self.dispatcher = MessageDispatcher()
+
+    def record(self, name):
+        async def handler(message, *args):
+            self.calls.append((name, message.type, args))
+            return name
+
+        return handler
+
+    def middleware(self, name):
+        def wrap(role, message_type, handler):
+            async def wrapped(message, *args):
+                self.calls.append(f'{name} before {role}.{message_type}')
+                result = await handler(message, *args)
+                self.calls.append(f'{name} after')
+                return result
+
+            return wrapped
+
+        return wrap
+
+    async def test_routes_by_role_and_type(self):
+        """Test messages go to the handler for their sender's role and type, with the dispatched args."""
+        self.dispatcher.register('client', 'talkback_message', self.record('client talkback'))
+        self.dispatcher.register('hardware', 'talkback_message', self.record('hardware talkback'))
+
+        result = await self.dispatcher.dispatch('hardware', Message('talkback_message', {}), 'device')
+
+        self.assertEqual('hardware talkback', result)
+        self.assertEqual([('hardware talkback', 'talkback_message', ('device',))], self.calls)
+        self.assertEqual(['talkback_message'], self.dispatcher.get_types('client'))
+
+    async def test_unhandled_messages(self):
+        """Test a type registered for another role only isn't handled."""
+        self.dispatcher.register('hardware', 'hardware_updated', self.record('updated'))
+
+        with self.assertRaises(UnhandledMessageException):
+            await self.dispatcher.dispatch('client', Message('hardware_updated', {}))
+        self.assertEqual([], self.calls)
+
+    async def test_middleware_order(self):
+        """Test middleware added first runs outermost, whether added before or after the handler."""
+        self.dispatcher.use(self.middleware('outer'))
+        self.dispatcher.register('client', 'heartbeat', self.record('heartbeat'))
+        self.dispatcher.use(self.middleware('inner'))
+
+        await self.dispatcher.dispatch('client', Message('heartbeat', {}))
+
+        self.assertEqual(['outer before client.heartbeat', 'inner before client.heartbeat',
+                          ('heartbeat', 'heartbeat', ()), 'inner after', 'outer after'], self.calls)
+
+    async def test_middleware_roles(self):
+        """Test middleware limited to roles leaves other roles' handlers alone."""
+        self.dispatcher.use(self.middleware('timed'), roles=['client'])
+        self.dispatcher.register('client', 'heartbeat', self.record('heartbeat'))
+        self.dispatcher.register('init', 'init_client', self.record('init'))
+
+        await self.dispatcher.dispatch('init', Message('init_client', {}))
+
+        self.assertEqual([('init', 'init_client', ())], self.calls)
+
+    async def test_latency_middleware(self):
+        """Test handler latencies are recorded per role and type, including handlers that raise."""
+        async def fail(message):
+            raise ValueError('nope')
+
+        latency = LatencyMiddleware()
+        self.dispatcher.use(latency)
+        self.dispatcher.register('client', 'heartbeat', self.record('heartbeat'))
+        self.dispatcher.register('client', 'change_name', fail)
+
+        await self.dispatcher.dispatch('client', Message('heartbeat', {}))
+        await self.dispatcher.dispatch('client', Message('heartbeat', {}))
+        with self.assertRaises(ValueError):
+            await self.dispatcher.dispatch('client', Message('change_name', {}))
+
+        snapshots = latency.get_snapshots()
+        self.assertEqual({'heartbeat', 'change_name'}, set(snapshots['client']))
+        self.assertEqual(2, snapshots['client']['heartbeat']['count'])
+        self.assertEqual(1, snapshots['client']['change_name']['count'])
+        self.assertGreater(snapshots['client']['heartbeat']['p50'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
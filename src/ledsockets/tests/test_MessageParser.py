@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.support.Message import MessageException
+from ledsockets.support.MessageParser import FrameTooLargeException, MessageParser, UnexpectedMessageTypeException
+
+
+class TestMessageParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = MessageParser(['change_name', 'heartbeat'], max_size=64)
+
+    def test_reads_the_type_from_either_codec(self):
+        """Test the type is read from the start of JSON and packed frames, whether text or binary."""
+        for frame in ['[ "change_name" , {"data": {}}]', Codecs.JSON.dumps(['change_name', {}]),
+                      Codecs.PACKED.dumps(['change_name', {}]), Codecs.PACKED.dumps(['heartbeat', {}])]:
+            with self.subTest(frame=frame):
+                self.assertIn(self.parser.read_type(frame), self.parser.types)
+
+    def test_parse(self):
+        """Test frames that pass the checks are decoded."""
+        message = self.parser.parse(Codecs.PACKED.dumps(['change_name', {"data": {"name": "Ann"}}]))
+        self.assertEqual(('change_name', {"data": {"name": "Ann"}}), (message.type, message.payload))
+
+    def test_rejects_unexpected_types_without_decoding(self):
+        """Test frames of types the sender may not send are rejected before the payload is decoded."""
+        for codec in (Codecs.JSON, Codecs.PACKED):
+            frame = codec.dumps(['hardware_updated', {"data": "x" * 30}])
+            with self.subTest(codec=codec.NAME), mock.patch.object(type(codec), 'loads') as loads:
+                with self.assertRaises(UnexpectedMessageTypeException):
+                    self.parser.parse(frame)
+                loads.assert_not_called()
+
+    def test_rejects_oversized_frames(self):
+        """Test frames over the size limit are rejected whatever their type."""
+        with self.assertRaises(FrameTooLargeException):
+            self.parser.read_type(Codecs.JSON.dumps(['change_name', {"data": "x" * 64}]))
+        self.assertEqual('change_name', MessageParser(['change_name']).read_type('["change_name", "' + 'x' * 64 + '"]'))
+
+    def test_rejects_frames_without_a_plain_type(self):
+        """Test frames that don't open with a plain message type are rejected."""
+        for frame in ['{"type": "change_name"}', '["change\\u005fname", {}]', '[1, {}]', '', b'\x92\x01\x80']:
+            with self.subTest(frame=frame), self.assertRaises(MessageException):
+                self.parser.read_type(frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
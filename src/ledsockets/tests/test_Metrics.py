@@ -0,0 +1,55 @@
+import unittest
+
+from ledsockets.support.Metrics import MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counters_and_gauges(self):
+        """Test counters and gauges are exposed per label values, with gauges read from their function if set."""
+        messages = self.registry.counter('messages_total', 'Messages handled', ['type'])
+        messages.labels('change_name').inc()
+        messages.labels('change_name').inc(2)
+        messages.labels('say "hi"\n').inc()
+        clients = []
+        self.registry.gauge('clients', 'Clients connected').labels().set_function(lambda: len(clients))
+        clients.append('a')
+
+        self.assertEqual('\n'.join([
+            '# HELP messages_total Messages handled',
+            '# TYPE messages_total counter',
+            'messages_total{type="change_name"} 3',
+            'messages_total{type="say \\"hi\\"\\n"} 1',
+            '# HELP clients Clients connected',
+            '# TYPE clients gauge',
+            'clients 1',
+        ]) + '\n', self.registry.expose())
+
+    def test_histograms(self):
+        """Test histograms are exposed as cumulative buckets with their sum and count."""
+        latency = self.registry.histogram('latency_seconds', 'Latency', ['role'], buckets=[0.1, 1])
+        for value in (0.05, 0.5, 5):
+            latency.labels('client').observe(value)
+
+        self.assertEqual([
+            'latency_seconds_bucket{role="client",le="0.1"} 1',
+            'latency_seconds_bucket{role="client",le="1"} 2',
+            'latency_seconds_bucket{role="client",le="+Inf"} 3',
+            'latency_seconds_sum{role="client"} 5.55',
+            'latency_seconds_count{role="client"} 3',
+        ], self.registry.expose().splitlines()[2:])
+
+    def test_registering_twice(self):
+        """Test registering a name again returns the same metric, unless it's registered as something else."""
+        family = self.registry.counter('messages_total', 'Messages handled', ['type'])
+        self.assertIs(family, self.registry.counter('messages_total', 'Messages handled', ['type']))
+        with self.assertRaises(ValueError):
+            self.registry.gauge('messages_total', 'Messages handled', ['type'])
+        with self.assertRaises(ValueError):
+            family.labels('change_name', 'extra')
+
+
+if __name__ == '__main__':
+    unittest.main()
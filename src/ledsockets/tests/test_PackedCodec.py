@@ -0,0 +1,69 @@
+import json
+import unittest
+
+from ledsockets.codec.AbstractCodec import CodecException
+from ledsockets.codec.PackedCodec import PackedCodec
+
+
+class TestPackedCodec(unittest.TestCase):
+    def setUp(self):
+        self.accelerated = PackedCodec()
+        self.standard = PackedCodec(accelerated=False)
+        # Just the pure Python backend when msgpack isn't installed
+        self.codecs = [self.accelerated, self.standard] if self.accelerated.accelerated else [self.standard]
+
+    def test_round_trip(self):
+        """Test every JSON type survives packing and unpacking, across the integer and length formats."""
+        value = ['hardware_updated', {
+            "data": {"type": "hardware_state", "id": "default", "attributes": {"on": True, "status_description": ""}},
+            "ints": [0, 127, 128, -1, -32, -33, -129, 256, 70000, -70000, 2 ** 40, -2 ** 40, 2 ** 64 - 1],
+            "floats": [1.5, -0.25],
+            "strings": ['x' * 31, 'x' * 32, 'x' * 300, 'x' * 70000, 'héllo ☃'],
+            "lists": [list(range(15)), list(range(16)), []],
+            "maps": {str(i): i for i in range(20)},
+            "null": None,
+            "false": False,
+        }]
+
+        for codec in self.codecs:
+            with self.subTest(backend=codec.backend):
+                self.assertEqual(value, codec.loads(codec.dumps(value)))
+
+    @unittest.skipUnless(PackedCodec().accelerated, 'msgpack is not installed')
+    def test_backends_agree(self):
+        """Test msgpack and the pure Python backend encode to the same bytes and read each other."""
+        value = ['hardware_updated', {"data": {"name": "Zoë", "on": True, "version": 300, "ids": None, "x": -1.5,
+                                               "long": 'x' * 300, "ints": [-33, -129, 70000, 2 ** 40]}}]
+
+        self.assertEqual('python', self.standard.backend)
+        self.assertEqual(self.standard.dumps(value), self.accelerated.dumps(value))
+        self.assertEqual(value, self.standard.loads(self.accelerated.dumps(value)))
+        self.assertEqual(value, self.accelerated.loads(self.standard.dumps(value)))
+
+    def test_smaller_than_json(self):
+        """Test frames pack smaller than the same frame in compact JSON."""
+        frame = ['hardware_updated', {"data": {"type": "hardware_state", "id": "", "attributes": {"on": True}}}]
+        for codec in self.codecs:
+            with self.subTest(backend=codec.backend):
+                self.assertLess(len(codec.dumps(frame)), len(json.dumps(frame, separators=(',', ':'))))
+
+    def test_malformed_payloads(self):
+        """Test malformed, truncated and trailing bytes, and extension types, raise CodecException."""
+        for codec in self.codecs:
+            for data in [b'', b'\x92\x01', b'\xd4\x01\x00', b'\xd4\x00\xff', b'\xc1', b'\xa5ab', b'\x81\x90\x01',
+                         b'\x91\x01\x01', '["json", {}]']:
+                with self.subTest(backend=codec.backend, data=data), self.assertRaises(CodecException):
+                    codec.loads(data)
+
+    def test_unpackable_values(self):
+        """Test values with no MessagePack representation are refused."""
+        for codec in self.codecs:
+            with self.subTest(backend=codec.backend):
+                with self.assertRaises(TypeError):
+                    codec.dumps({1, 2})
+                with self.assertRaises(ValueError):
+                    codec.dumps(2 ** 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
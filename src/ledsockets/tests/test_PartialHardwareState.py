@@ -35,10 +35,10 @@ class TestPartialHardwareState(unittest.TestCase):
         attributes = state.get_attributes()
         self.assertEqual(attributes, {})
 
-    def test_inst_from_attributes_creates_instance_correctly(self):
-        """Test _inst_from_attributes() correctly creates an instance with attributes."""
+    def test_from_attributes_creates_instance_correctly(self):
+        """Test from_attributes() correctly creates an instance with attributes."""
         attributes = {"on": False, "status_description": "inactive"}
-        state = PartialHardwareState._inst_from_attributes(attributes, id="123")
+        state = PartialHardwareState.from_attributes(attributes, id="123")
         self.assertEqual(state.on, False)
         self.assertEqual(state.status_description, "inactive")
         self.assertEqual(state.id, "123")
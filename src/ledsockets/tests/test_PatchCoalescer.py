@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+from ledsockets.dto.PartialHardwareState import PartialHardwareState
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.server.PatchCoalescer import PatchCoalescer
+
+
+def make_patch(on, requester):
+    patch = PartialHardwareState(on, correlation_id=f'{requester}_patch')
+    patch.source = UiClient(requester, None, requester)
+    return patch
+
+
+class TestPatchCoalescer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent = []
+        self.correlation_ids = []
+
+    def _send(self, device_id, patch):
+        self.sent.append((device_id, patch.on, patch.source.id))
+        self.correlation_ids.append(patch.correlation_id)
+
+    async def test_zero_tick_forwards_every_patch(self):
+        """Test every patch is forwarded when coalescing is disabled."""
+        coalescer = PatchCoalescer(self._send, 0)
+        coalescer.add('default', make_patch(True, 'a'))
+        coalescer.add('default', make_patch(False, 'b'))
+
+        self.assertEqual([('default', True, 'a'), ('default', False, 'b')], self.sent)
+
+    async def test_patches_within_tick_forward_latest_intent(self):
+        """Test the first patch goes out immediately and the rest of the tick collapses to the latest, last requester."""
+        coalescer = PatchCoalescer(self._send, 0.02)
+        coalescer.add('default', make_patch(True, 'a'))
+        coalescer.add('default', make_patch(False, 'b'))
+        coalescer.add('default', make_patch(True, 'c'))
+        self.assertEqual([('default', True, 'a')], self.sent)
+
+        await asyncio.sleep(0.03)
+        self.assertEqual([('default', True, 'a'), ('default', True, 'c')], self.sent)
+        self.assertEqual(['a_patch', 'c_patch'], self.correlation_ids)
+
+        await asyncio.sleep(0.03)
+        self.assertEqual(2, len(self.sent))
+
+    async def test_devices_tick_independently(self):
+        """Test a busy device doesn't hold back patches for another device."""
+        coalescer = PatchCoalescer(self._send, 0.02)
+        coalescer.add('porch', make_patch(True, 'a'))
+        coalescer.add('garage', make_patch(True, 'b'))
+
+        self.assertEqual([('porch', True, 'a'), ('garage', True, 'b')], self.sent)
+
+    async def test_discard_drops_pending_patch(self):
+        """Test a pending patch isn't forwarded once its device is discarded."""
+        coalescer = PatchCoalescer(self._send, 0.02)
+        coalescer.add('default', make_patch(True, 'a'))
+        coalescer.add('default', make_patch(False, 'b'))
+        coalescer.discard('default')
+
+        await asyncio.sleep(0.03)
+        self.assertEqual([('default', True, 'a')], self.sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
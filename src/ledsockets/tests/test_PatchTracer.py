@@ -0,0 +1,56 @@
+import unittest
+
+from ledsockets.server.PatchTracer import PatchTracer
+
+
+class TestPatchTracer(unittest.TestCase):
+    def setUp(self):
+        self.tracer = PatchTracer()
+
+    def test_hops(self):
+        """Test each hop is timed on a single clock and the network hop excludes the time spent on the hardware."""
+        self.tracer.record('a', PatchTracer.STAGE_RECEIVED, 10.0)
+        self.tracer.record('a', PatchTracer.STAGE_FORWARDED, 10.5)
+        self.tracer.record('a', PatchTracer.STAGE_UPDATED, 11.5)
+        # The hardware's clock has nothing to do with the server's
+        hops = self.tracer.finish('a', 11.75, {"received": 500.0, "gpio_start": 500.1, "gpio_end": 500.3,
+                                               "sent": 500.4})
+
+        self.assertEqual({'coalesce': 0.5, 'fanout': 0.25, 'total': 1.75, 'device': 0.4, 'gpio': 0.2},
+                         {hop: round(seconds, 6) for hop, seconds in hops.items() if hop != 'network'})
+        self.assertAlmostEqual(0.6, hops['network'])
+        self.assertEqual(1, self.tracer.get_snapshots()['total']['count'])
+
+    def test_partial_traces(self):
+        """Test hops missing a stage are skipped, as are malformed hardware stages."""
+        self.tracer.record('a', PatchTracer.STAGE_FORWARDED, 1.0)
+        self.tracer.record('a', PatchTracer.STAGE_UPDATED, 2.0)
+
+        self.assertEqual({'fanout': 0.5}, self.tracer.finish('a', 2.5, {"received": "soon", "sent": 1.0}))
+
+    def test_trace_keys_are_per_client(self):
+        """Test two clients sending the same correlation id get separate traces."""
+        self.assertIsNone(PatchTracer.get_trace_key('client_a', None))
+        key_a = PatchTracer.get_trace_key('client_a', 'same')
+        key_b = PatchTracer.get_trace_key('client_b', 'same')
+        self.tracer.record(key_a, PatchTracer.STAGE_RECEIVED, 1.0)
+        self.tracer.record(key_b, PatchTracer.STAGE_RECEIVED, 5.0)
+
+        self.assertEqual({'total': 1.0}, self.tracer.finish(key_a, 2.0))
+        self.assertEqual({'total': 1.0}, self.tracer.finish(key_b, 6.0))
+
+    def test_unknown_and_forgotten_traces(self):
+        """Test finishing an unknown patch records nothing and the oldest unfinished traces are forgotten."""
+        tracer = PatchTracer(max_pending=2)
+        for correlation_id in ('a', 'b', 'c'):
+            tracer.record(correlation_id, PatchTracer.STAGE_RECEIVED, 1.0)
+        tracer.record(None, PatchTracer.STAGE_RECEIVED, 1.0)
+
+        self.assertEqual({}, tracer.finish('a', 2.0))
+        self.assertEqual({}, tracer.finish(None, 2.0))
+        self.assertEqual({'total': 1.0}, tracer.finish('c', 2.0))
+        self.assertEqual({'total'}, set(tracer.get_snapshots()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import unittest
+
+from ledsockets.dto.RosterChange import RosterChange
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.server.PresenceCoalescer import PresenceCoalescer
+
+
+def make_change(version, action=RosterChange.ACTION_JOINED):
+    change = RosterChange(version, action)
+    change.ui_client = UiClient(str(version), None, f'Client {version}')
+    return change
+
+
+class TestPresenceCoalescer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent = []
+
+    def _send(self, message, exclude_ids=None, event_type=None):
+        self.sent.append((json.loads(message.toJson()), exclude_ids))
+
+    async def test_zero_window_sends_immediately(self):
+        """Test each change is sent as its own event when coalescing is disabled."""
+        coalescer = PresenceCoalescer(self._send, 0)
+        coalescer.add(make_change(1), exclude_ids=['1'])
+        coalescer.add(make_change(2, RosterChange.ACTION_LEFT))
+
+        self.assertEqual(['client_joined', 'client_disconnect'], [frame[0] for frame, _ in self.sent])
+        self.assertEqual(['1'], self.sent[0][1])
+
+    async def test_changes_within_window_are_batched(self):
+        """Test changes in the same window go out as one presence_batch frame, in order."""
+        coalescer = PresenceCoalescer(self._send, 0.01)
+        for version in range(1, 4):
+            coalescer.add(make_change(version))
+        self.assertEqual([], self.sent)
+
+        await asyncio.sleep(0.03)
+        self.assertEqual(1, len(self.sent))
+        frame, _ = self.sent[0]
+        self.assertEqual('presence_batch', frame[0])
+        self.assertEqual([1, 2, 3], [item['attributes']['version'] for item in frame[1]['data']])
+
+    async def test_lone_change_in_window_is_sent_as_its_own_event(self):
+        """Test a single pending change isn't wrapped in a batch."""
+        coalescer = PresenceCoalescer(self._send, 0.01)
+        coalescer.add(make_change(1, RosterChange.ACTION_RENAMED))
+        await asyncio.sleep(0.03)
+
+        self.assertEqual('client_name_changed', self.sent[0][0][0])
+
+    async def test_max_batch_size_flushes_early(self):
+        """Test reaching the batch size limit flushes without waiting for the window."""
+        coalescer = PresenceCoalescer(self._send, 10, max_batch_size=2)
+        coalescer.add(make_change(1))
+        coalescer.add(make_change(2))
+
+        self.assertEqual(1, len(self.sent))
+        self.assertEqual(2, len(self.sent[0][0][1]['data']))
+
+
+if __name__ == '__main__':
+    unittest.main()
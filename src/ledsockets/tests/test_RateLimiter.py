@@ -0,0 +1,60 @@
+import unittest
+
+from ledsockets.support.RateLimiter import RateLimiter
+from ledsockets.support.TokenBucket import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_allows_burst_then_refills_at_rate(self):
+        """Test a bucket allows `burst` events at once and refills at `rate` per second."""
+        bucket = TokenBucket(2, 3)
+        now = bucket._updated_at
+        self.assertEqual([True, True, True, False], [bucket.take(now) for _ in range(4)])
+
+        self.assertTrue(bucket.take(now + 0.5))
+        self.assertFalse(bucket.take(now + 0.5))
+
+    def test_refill_is_capped_at_burst(self):
+        """Test an idle bucket never holds more than `burst` tokens."""
+        bucket = TokenBucket(10, 2)
+        now = bucket._updated_at + 60
+        self.assertEqual([True, True, False], [bucket.take(now) for _ in range(3)])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_limits_per_client_and_type(self):
+        """Test each client gets its own bucket for each limited message type."""
+        limiter = RateLimiter({'change_name': (0.001, 1)})
+
+        self.assertTrue(limiter.allow('a', 'change_name'))
+        self.assertFalse(limiter.allow('a', 'change_name'))
+        self.assertTrue(limiter.allow('b', 'change_name'))
+        self.assertTrue(limiter.allow('a', 'patch_hardware_state'))
+        self.assertEqual({'change_name': 1}, limiter.get_throttled_counts())
+
+    def test_unlisted_types_share_the_default_bucket(self):
+        """Test message types without their own limit are counted against the default."""
+        limiter = RateLimiter({'default': (0.001, 2)})
+
+        self.assertTrue(limiter.allow('a', 'talkback_message'))
+        self.assertTrue(limiter.allow('a', 'nonsense'))
+        self.assertFalse(limiter.allow('a', 'other_nonsense'))
+        self.assertEqual({'default': 1}, limiter.get_throttled_counts())
+
+    def test_forget_resets_client_buckets(self):
+        """Test forgetting a client discards its buckets."""
+        limiter = RateLimiter({'change_name': (0.001, 1)})
+        limiter.allow('a', 'change_name')
+        limiter.forget('a')
+
+        self.assertTrue(limiter.allow('a', 'change_name'))
+
+    def test_parse_limit(self):
+        """Test "<rate>/<burst>" parsing, with 0 disabling the limit."""
+        self.assertEqual((1.0, 3), RateLimiter.parse_limit('1/3'))
+        self.assertEqual((5.0, 5), RateLimiter.parse_limit('5'))
+        self.assertIsNone(RateLimiter.parse_limit('0'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from ledsockets.dto.AbstractDto import DTOInvalidAttributesException
+from ledsockets.dto.ReconnectHint import ReconnectHint
+
+
+class TestReconnectHint(unittest.TestCase):
+    def test_round_trip(self):
+        """Test a hint survives serialization."""
+        hint = ReconnectHint.from_dict(ReconnectHint(2.5).toDict())
+
+        self.assertEqual(2.5, hint.reconnect_after)
+
+    def test_from_attributes_rejects_invalid_delays(self):
+        """Test reconnect_after must be a non-negative number."""
+        for value in [-1, '3', None, True]:
+            with self.assertRaises(DTOInvalidAttributesException):
+                ReconnectHint.from_attributes({"reconnect_after": value})
+        with self.assertRaises(DTOInvalidAttributesException):
+            ReconnectHint.from_attributes({})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.RosterChange import RosterChange
+from ledsockets.dto.UiClient import UiClient
+
+
+class TestRosterChange(unittest.TestCase):
+    def test_to_dict_carries_only_the_changed_client(self):
+        """Test toDict() includes the version, action and changed client."""
+        change = RosterChange(3, RosterChange.ACTION_JOINED)
+        change.ui_client = UiClient('client_1', None, 'Client A')
+        result = change.toDict()
+
+        self.assertEqual({"version": 3, "action": "joined"}, result['attributes'])
+        self.assertEqual(['ui_client'], list(result['relationships'].keys()))
+        self.assertEqual('Client A', result['relationships']['ui_client']['data']['attributes']['name'])
+
+    def test_from_dict_round_trip(self):
+        """Test from_dict() restores relationships written by toDict()."""
+        change = RosterChange(7, RosterChange.ACTION_RENAMED)
+        change.ui_client = UiClient('client_1', None, 'New Name')
+        change.change_detail = ChangeDetail('New Name', 'Old Name', source_id='client_1')
+
+        restored = RosterChange.from_dict(change.toDict())
+        self.assertEqual(7, restored.version)
+        self.assertEqual(RosterChange.ACTION_RENAMED, restored.action)
+        self.assertEqual('New Name', restored.ui_client.name)
+        self.assertEqual('Old Name', restored.change_detail.old_value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from ledsockets.dto.AbstractDto import DTOInvalidAttributesException, DTOInvalidPayloadException
+from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.HardwareClient import HardwareClient
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.dto.PartialHardwareState import PartialHardwareState
+from ledsockets.dto.ServerStatus import ServerStatus
+from ledsockets.dto.TalkbackMessage import TalkbackMessage
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.support.SchemaCompiler import SchemaCompiler
+from ledsockets.support.TypeDescriptions import TypeDescriptions, yaml
+
+
+class TestSchemaCompiler(unittest.TestCase):
+    @unittest.skipUnless(yaml, 'PyYAML is not installed')
+    def test_compiled_module_is_up_to_date(self):
+        """Test the checked in validators were generated from the current types.yaml."""
+        with open(SchemaCompiler.OUTPUT_PATH) as compiled_file:
+            self.assertEqual(SchemaCompiler(TypeDescriptions.load()).compile(), compiled_file.read(),
+                             'Regenerate with `python -m ledsockets.support.SchemaCompiler`')
+
+    def test_round_trip(self):
+        """Test DTOs read back what toDict() writes, relationships included."""
+        state = HardwareState(True, 'On', 'porch')
+        state.source = UiClient('client_1', None, 'Client A')
+        state.change_detail = ChangeDetail(True, False, 'Client A turned it on', source_id='client_1')
+        status = ServerStatus(True, 4, 'status')
+        status.set_relationship('hardware_state', state)
+        status.set_relationship('hardware_client', HardwareClient('porch', None))
+        status.append_relationship('hardware_states', state)
+        status.append_relationship('ui_clients', UiClient('client_2', None, 'Client B'))
+        status.append_relationship('talkback_messages', TalkbackMessage('Hello', 't1'))
+        status.ui_client = UiClient('client_1', None, 'Client A')
+
+        restored = ServerStatus.from_dict(status.toDict())
+        self.assertEqual(status.toDict(), restored.toDict())
+        self.assertEqual('Client A', restored.ui_client.name)
+
+    def test_optional_attributes(self):
+        """Test optional attributes may be left out, and are left out when unset."""
+        self.assertEqual({}, PartialHardwareState.from_attributes({}).get_attributes())
+        self.assertEqual({"on": False}, PartialHardwareState.from_attributes({"on": False}).get_attributes())
+        self.assertIsNone(UiClient.from_attributes({}, 'client_1').name)
+
+    def test_errors_name_the_invalid_field(self):
+        """Test malformed documents are rejected with the path to the offending field."""
+        client = {"type": "ui_client", "id": "client_1", "attributes": {"name": "Client A"}}
+        state = {"type": "hardware_state", "id": "porch", "attributes": {"on": True, "status_description": ""},
+                 "relationships": {"source": {"data": client}}}
+        status = {"type": "server_status", "attributes": {"hardware_is_connected": True, "roster_version": 1},
+                  "relationships": {"hardware_state": {"data": state}, "ui_clients": {"data": [client, client]}}}
+        cases = [
+            (DTOInvalidAttributesException, 'data.attributes.roster_version must be an integer',
+             {**status, "attributes": {"hardware_is_connected": True, "roster_version": '1'}}),
+            (DTOInvalidAttributesException, 'data.attributes.hardware_is_connected is required',
+             {**status, "attributes": {"roster_version": 1}}),
+            (DTOInvalidPayloadException, 'data.relationships.hardware_state is required',
+             {**status, "relationships": {}}),
+            (DTOInvalidAttributesException,
+             'data.relationships.hardware_state.data.relationships.source.data.attributes.name must be a string or null',
+             {**status, "relationships": {"hardware_state": {"data": {
+                 **state, "relationships": {"source": {"data": {**client, "attributes": {"name": 1}}}}}}}}),
+            (DTOInvalidPayloadException, 'data.relationships.ui_clients.data[1].type must be "ui_client"',
+             {**status, "relationships": {**status['relationships'], "ui_clients": {"data": [client, state]}}}),
+            (DTOInvalidPayloadException, 'data.id must be a string', {**status, "id": 1}),
+            (DTOInvalidPayloadException, 'data must be an object', [status]),
+        ]
+        ServerStatus.from_dict(status)
+        for exception, error, document in cases:
+            with self.subTest(error=error):
+                with self.assertRaises(exception) as context:
+                    ServerStatus.from_dict(document)
+                self.assertEqual(error, str(context.exception))
+
+    def test_attribute_types_are_exact(self):
+        """Test booleans aren't accepted as numbers, nor numbers as booleans."""
+        with self.assertRaises(DTOInvalidAttributesException):
+            HardwareState.from_attributes({"on": 1, "status_description": ""})
+        with self.assertRaises(DTOInvalidAttributesException):
+            ServerStatus.from_attributes({"hardware_is_connected": True, "roster_version": True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import signal
+import socket
+import unittest
+from unittest.mock import patch
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidStatus
+
+from ledsockets.dto.ReconnectHint import ReconnectHint
+from ledsockets.server.AdmissionController import AdmissionController
+from ledsockets.server.HotRestart import HotRestart
+from ledsockets.server.Server import Server, _create_server
+from ledsockets.server.ServerConnectionManager import AbstractServerConnectionManager
+from ledsockets.support.Message import Message
+
+
+class IdleConnectionManager(AbstractServerConnectionManager):
+    """Holds every connection open until the client closes it"""
+
+    async def handle(self, connection):
+        await connection.wait_closed()
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def _start(self, **kwargs) -> str:
+        port = get_free_port()
+        self.server = Server('127.0.0.1', port, IdleConnectionManager(), **kwargs)
+        self.server_task = asyncio.create_task(self.server._run_server())
+        self.addAsyncCleanup(self._stop)
+        async with asyncio.timeout(5):
+            while True:
+                try:
+                    _, writer = await asyncio.open_connection('127.0.0.1', port)
+                    writer.close()
+                    return f'ws://127.0.0.1:{port}'
+                except OSError:
+                    await asyncio.sleep(0.01)
+
+    async def _stop(self):
+        self.server.stop()
+        await self.server_task
+
+    async def test_admission_rejects_before_the_handshake(self):
+        """Test connections there's no room for get a 503 with Retry-After, and closed connections make room."""
+        admission = AdmissionController(max_connections=1, retry_after=7)
+        url = await self._start(admission=admission)
+        # The port probe took the only place until it closed
+        async with asyncio.timeout(5):
+            while admission.connection_count:
+                await asyncio.sleep(0.01)
+
+        first = await connect(url)
+        with self.assertRaises(InvalidStatus) as raised:
+            await connect(url)
+        self.assertEqual(503, raised.exception.response.status_code)
+        self.assertEqual('7', raised.exception.response.headers['Retry-After'])
+
+        await first.close()
+        async with asyncio.timeout(5):
+            while admission.connection_count:
+                await asyncio.sleep(0.01)
+        second = await connect(url)
+        await second.close()
+
+    async def test_hand_off_spreads_reconnects(self):
+        """Test a hot restart tells clients when to come back, well within the grace period, before closing them."""
+        restart = HotRestart(grace=4.0)
+        url = await self._start(hot_restart=restart, drain_window=10.0)
+        websocket = await connect(url)
+
+        self.server._handle_sigusr2(signal.SIGUSR2)
+        hint = Message.parse(await websocket.recv())
+        with self.assertRaises(ConnectionClosed):
+            await websocket.recv()
+        await self.server_task
+
+        self.assertEqual('server_draining', hint.type)
+        self.assertLessEqual(ReconnectHint.from_message(hint).reconnect_after, 2.0)
+        self.assertEqual(Server.RESTART_CLOSE_CODE, websocket.close_code)
+        self.assertIs(restart, self.server.pending_restart)
+        os.close(restart._listen_fd)
+        restart._handoff_file.close()
+
+    async def test_drain_hints_point_past_the_window(self):
+        """Test a drain tells clients to come back after the drain window, when there's a server to come back to."""
+        url = await self._start(drain_window=0.2)
+        websocket = await connect(url)
+
+        self.server._handle_sigusr1(signal.SIGUSR1)
+        hint = ReconnectHint.from_message(Message.parse(await websocket.recv()))
+        with self.assertRaises(ConnectionClosed):
+            await websocket.recv()
+        await self.server_task
+
+        self.assertGreaterEqual(hint.reconnect_after, 0.2)
+        self.assertLessEqual(hint.reconnect_after, 0.4)
+        self.assertEqual(Server.CLOSE_CODE, websocket.close_code)
+
+    async def _get_status_line(self, url: str, path: str) -> bytes:
+        host, port = url.removeprefix('ws://').split(':')
+        reader, writer = await asyncio.open_connection(host, int(port))
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+        status_line = await reader.readline()
+        writer.close()
+        return status_line
+
+    async def test_metrics_are_off_by_default(self):
+        """Test metrics are only served when METRICS_PATH is set, and not at all by default."""
+        with patch.dict(os.environ):
+            os.environ.pop('METRICS_PATH', None)
+            self.assertIsNone(_create_server()._metrics_path)
+            os.environ['METRICS_PATH'] = '/metrics'
+            self.assertEqual('/metrics', _create_server()._metrics_path)
+
+        url = await self._start()
+        self.assertNotIn(b' 200 ', await self._get_status_line(url, '/metrics'))
+
+    def test_heartbeats_are_off_by_default(self):
+        """Test idle clients are only sent heartbeats and evicted when HEARTBEAT_INTERVAL_MS is set."""
+        with patch.dict(os.environ):
+            os.environ.pop('HEARTBEAT_INTERVAL_MS', None)
+            self.assertIsNone(_create_server()._connection_manager._heartbeat_interval)
+            os.environ['HEARTBEAT_INTERVAL_MS'] = '15000'
+            self.assertEqual(15, _create_server()._connection_manager._heartbeat_interval)
+
+    async def test_metrics_path(self):
+        """Test the metrics path answers plain GETs with the metrics."""
+        url = await self._start(metrics_path='/metrics')
+        self.assertIn(b' 200 ', await self._get_status_line(url, '/metrics?x=1'))
+        self.assertNotIn(b' 200 ', await self._get_status_line(url, '/other'))
+
+
+if __name__ == '__main__':
+    unittest.main()
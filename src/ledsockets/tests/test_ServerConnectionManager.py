@@ -0,0 +1,88 @@
+import unittest
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.dto.RosterChange import RosterChange
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.server.Backplane import AbstractBackplane
+from ledsockets.server.ServerConnectionManager import ServerConnectionManager
+from ledsockets.support.Message import Message
+
+
+class RecordingBackplane(AbstractBackplane):
+    """Keeps what's published instead of sending it anywhere"""
+
+    def __init__(self):
+        self.published = []
+
+    @property
+    def worker_id(self):
+        return 'a'
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, topic, payload):
+        self.published.append((topic, payload))
+
+    def subscribe(self, handler):
+        pass
+
+    async def claim(self, key):
+        return True
+
+    def release(self, key):
+        pass
+
+
+class TestServerConnectionManager(unittest.IsolatedAsyncioTestCase):
+    async def test_session_taken_by_another_worker(self):
+        """Test a session resumed on another worker leaves this worker's roster straight away."""
+        backplane = RecordingBackplane()
+        manager = ServerConnectionManager(backplane=backplane, resume_window=60)
+        client = UiClient('1', None, 'Alice')
+        manager._name_broker.reserve_name(client.name)
+        manager._issue_resume_token(client)
+        manager._hold_returning_client(client, 60)
+
+        manager._on_backplane_message(ServerConnectionManager.TOPIC_SESSION_TAKEN,
+                                      {"resume_token": client.resume_token}, 'b')
+
+        self.assertNotIn(client.id, manager._returning_clients)
+        self.assertNotIn(client.resume_token, manager._sessions)
+        [(topic, payload)] = backplane.published
+        self.assertEqual(ServerConnectionManager.TOPIC_ROSTER, topic)
+        change = RosterChange.from_dict(payload)
+        self.assertEqual((RosterChange.ACTION_LEFT, '1'), (change.action, change.ui_client.id))
+
+    async def test_session_taken_unknown_token(self):
+        """Test tokens this worker didn't issue are ignored."""
+        backplane = RecordingBackplane()
+        manager = ServerConnectionManager(backplane=backplane, resume_window=60)
+
+        manager._on_backplane_message(ServerConnectionManager.TOPIC_SESSION_TAKEN, {"resume_token": 'other'}, 'b')
+
+        self.assertEqual([], backplane.published)
+
+    async def test_handed_over_sessions_resume(self):
+        """Test a replacement process can still replay what a handed over client missed before the restart."""
+        manager = ServerConnectionManager(resume_window=60)
+        client = UiClient('1', None, 'Alice')
+        manager._issue_resume_token(client)
+        manager._hold_returning_client(client, 60)
+        manager._broadcast_to_clients(Message('talkback_message', {"data": 1}))
+        manager._broadcast_to_clients(Message('talkback_message', {"data": 2}))
+
+        replacement = ServerConnectionManager(resume_window=60)
+        replacement.import_state(Codecs.JSON.loads(Codecs.JSON.dumps(manager.export_state())), 60)
+
+        self.assertEqual(client.id, replacement._sessions[client.resume_token])
+        returning = replacement._returning_clients[client.id]
+        self.assertEqual([2], [entry.seq for entry in replacement._get_missed_events(returning, 1)])
+        self.assertEqual(3, replacement._events.append(Message('talkback_message', {})).payload['seq'])
+
+
+if __name__ == '__main__':
+    unittest.main()
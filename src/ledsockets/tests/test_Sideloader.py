@@ -0,0 +1,90 @@
+import unittest
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.dto.ChangeDetail import ChangeDetail
+from ledsockets.dto.HardwareClient import HardwareClient
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.dto.RosterChange import RosterChange
+from ledsockets.dto.ServerStatus import ServerStatus
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.support.Message import Message
+from ledsockets.support.Sideloader import Sideloader
+
+
+def resolve(data, included):
+    """Put included resources back in place of their references, as a client would"""
+    resources = {(resource['type'], resource['id']): resource for resource in included}
+
+    def expand(resource):
+        resource = resources.get((resource['type'], resource.get('id')), resource) if 'attributes' not in resource \
+            else resource
+        relationships = {
+            name: {"data": [expand(item) for item in relationship['data']] if isinstance(relationship['data'], list)
+                   else expand(relationship['data'])}
+            for name, relationship in (resource.get('relationships') or {}).items()
+        }
+        return {**resource, "relationships": relationships} if relationships else resource
+
+    return [expand(item) for item in data] if isinstance(data, list) else expand(data)
+
+
+class TestSideloader(unittest.TestCase):
+    def setUp(self):
+        self.clients = [UiClient(f'client_{i}', None, f'Client {i}') for i in range(3)]
+        self.state = HardwareState(True, 'On', 'porch')
+        self.state.source = self.clients[0]
+        self.state.change_detail = ChangeDetail(True, False, 'Client 0 turned it on', source_id='client_0')
+        self.status = ServerStatus(True, 3)
+        self.status.set_relationship('hardware_state', self.state)
+        self.status.set_relationship('hardware_client', HardwareClient('porch', None))
+        self.status.append_relationship('hardware_clients', HardwareClient('porch', None))
+        self.status.append_relationship('hardware_states', self.state)
+        for client in self.clients:
+            self.status.append_relationship('ui_clients', client)
+        self.status.ui_client = self.clients[1]
+
+    def test_repeated_resources_are_included_once(self):
+        """Test resources that appear more than once are serialized once and referenced everywhere."""
+        document = self.status.toDocument(included=True)
+        relationships = document['data']['relationships']
+
+        self.assertEqual([('hardware_state', 'porch'), ('ui_client', 'client_0'), ('hardware_client', 'porch'),
+                          ('ui_client', 'client_1')],
+                         [(resource['type'], resource['id']) for resource in document['included']])
+        self.assertEqual({"type": "hardware_state", "id": "porch"}, relationships['hardware_state']['data'])
+        self.assertEqual({"type": "ui_client", "id": "client_1"}, relationships['ui_client']['data'])
+        self.assertEqual({"type": "ui_client", "id": "client_0"},
+                         document['included'][0]['relationships']['source']['data'])
+        # Appears once, so it stays put
+        self.assertEqual('Client 2', relationships['ui_clients']['data'][2]['attributes']['name'])
+        # No id to reference it by
+        self.assertIn('attributes', document['included'][0]['relationships']['change_detail']['data'])
+
+    def test_resolves_to_the_embedded_document(self):
+        """Test putting included resources back in place gives the document embedded."""
+        document = self.status.toDocument(included=True)
+        self.assertEqual(self.status.toDict(), resolve(document['data'], document['included']))
+        self.assertLess(len(Message('a', document).encode(Codecs.JSON)), len(Message('a', self.status.toDocument()).encode(Codecs.JSON)))
+
+    def test_lists_of_documents(self):
+        """Test resources repeated across a list of documents are included once."""
+        changes = []
+        for action in (RosterChange.ACTION_JOINED, RosterChange.ACTION_RENAMED):
+            change = RosterChange(len(changes) + 1, action, f'change_{action}')
+            change.ui_client = self.clients[2]
+            changes.append(change.toDict())
+
+        data, included = Sideloader(changes).sideload()
+        self.assertEqual([self.clients[2].toDict()], included)
+        self.assertEqual(changes, resolve(data, included))
+
+    def test_nothing_to_sideload(self):
+        """Test documents without repeated resources are left as they are."""
+        self.assertEqual({"data": self.state.toDict()}, self.state.toDocument(included=True))
+        message = Message('hardware_updated', {"data": self.state.toDict()})
+        self.assertIs(message, message.sideloaded())
+        self.assertIs(message.sideloaded(), message.sideloaded())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import unittest
+
+from ledsockets.codec.Codecs import Codecs
+from ledsockets.dto.HardwareState import HardwareState
+from ledsockets.dto.ServerStatus import ServerStatus
+from ledsockets.dto.TalkbackMessage import TalkbackMessage
+from ledsockets.dto.UiClient import UiClient
+from ledsockets.server.StatusSnapshot import StatusSnapshot
+
+
+class TestStatusSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.builds = 0
+        self.clients = [UiClient('1', None, 'Client A'), UiClient('2', None, 'Client B')]
+        self.snapshot = StatusSnapshot(self._build)
+
+    def _build(self, include_roster=True):
+        self.builds += 1
+        status = ServerStatus(True, 4)
+        status.set_relationship('hardware_state', HardwareState(True, 'on'))
+        if include_roster:
+            for client in self.clients:
+                status.append_relationship('ui_clients', client)
+        return status
+
+    def test_status_is_built_once_until_invalidated(self):
+        """Test repeated frames reuse the cached status until invalidate() is called."""
+        self.snapshot.frame('client_init')
+        self.snapshot.frame('server_status')
+        self.assertEqual(1, self.builds)
+
+        self.snapshot.invalidate()
+        self.assertTrue(self.snapshot.is_dirty)
+        self.snapshot.frame('client_init')
+        self.assertEqual(2, self.builds)
+
+    def test_frame_matches_full_serialization(self):
+        """Test a frame without extras matches serializing the status directly."""
+        expected = Codecs.JSON.dumps(['hardware_connected', {"data": self._build(False).toDict()}])
+        self.assertEqual(expected, self.snapshot.frame('hardware_connected', include_roster=False))
+
+    def test_frame_splices_per_recipient_relationships(self):
+        """Test extra relationships are spliced in without touching the cached status."""
+        client = self.clients[0]
+        frame = self.snapshot.frame('client_init', extra_relationships={
+            'ui_client': client,
+            'talkback_messages': [TalkbackMessage('Hello')],
+        })
+
+        expected = self._build()
+        expected.set_relationship('ui_client', client)
+        expected.append_relationship('talkback_messages', TalkbackMessage('Hello'))
+        self.assertEqual(['client_init', {"data": expected.toDict()}], json.loads(frame))
+        self.assertNotIn('ui_client', self.snapshot.get_status().get_relationships())
+
+    def test_message_carries_the_document_and_its_json_frame(self):
+        """Test messages hold the spliced JSON frame and a payload other codecs encode to the same document."""
+        client = self.clients[0]
+        message = self.snapshot.message('client_init', extra_relationships={'ui_client': client}, meta={"seq": 1})
+
+        expected = self._build()
+        expected.set_relationship('ui_client', client)
+        expected_frame = ['client_init', {"data": expected.toDict(), "meta": {"seq": 1}}]
+        self.assertEqual(Codecs.JSON.dumps(expected_frame), message.encode(Codecs.JSON))
+        self.assertEqual(expected_frame, Codecs.PACKED.loads(message.encode(Codecs.PACKED)))
+        self.assertNotIn('ui_client', self.snapshot.get_document()['relationships'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from ledsockets.support.TimerWheel import TimerWheel
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_timers_expire_after_their_delay(self):
+        """Test keys come out of `advance` once their delay, rounded up to whole ticks, has passed."""
+        wheel = TimerWheel(1, 8)
+        wheel.add('a', 1)
+        wheel.add('b', 2.5)
+
+        self.assertEqual(['a'], wheel.advance())
+        self.assertEqual([], wheel.advance())
+        self.assertEqual(['b'], wheel.advance())
+        self.assertEqual(0, len(wheel))
+
+    def test_remove_and_reschedule(self):
+        """Test removed keys never expire and re-adding a key replaces its timer."""
+        wheel = TimerWheel(1, 8)
+        wheel.add('a', 1)
+        wheel.add('b', 1)
+        wheel.remove('a')
+        wheel.add('b', 3)
+
+        self.assertNotIn('a', wheel)
+        self.assertEqual([[], [], ['b']], [wheel.advance() for _ in range(3)])
+
+    def test_long_delays_are_clamped_to_the_span(self):
+        """Test a delay longer than the wheel expires at the end of its span rather than wrapping early."""
+        wheel = TimerWheel(1, 4)
+        wheel.add('a', 100)
+
+        self.assertEqual(3, wheel.span)
+        self.assertEqual([[], [], ['a']], [wheel.advance() for _ in range(3)])
+
+    def test_invalid_arguments(self):
+        """Test the wheel needs a positive tick and more than one slot."""
+        with self.assertRaises(ValueError):
+            TimerWheel(0, 8)
+        with self.assertRaises(ValueError):
+            TimerWheel(1, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
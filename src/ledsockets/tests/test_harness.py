@@ -0,0 +1,24 @@
+import unittest
+
+from ledsockets.bench import harness
+
+
+class TestHarness(unittest.TestCase):
+    def test_scenarios_use_known_actions(self):
+        """Test the harness imports without gpiozero and every scenario only runs actions it knows."""
+        for name, rates in harness.SCENARIOS.items():
+            self.assertLessEqual(set(rates), set(harness.ACTIONS), name)
+
+    def test_summarize(self):
+        """Test samples are summarized in ms, and no samples summarize to a count of 0."""
+        self.assertEqual({"count": 0, "p50": None, "p99": None, "p999": None, "max": None}, harness._summarize([]))
+
+        summary = harness._summarize([i / 1000 for i in range(1000, 0, -1)])
+        self.assertEqual(1000, summary['count'])
+        self.assertEqual(501.0, summary['p50'])
+        self.assertEqual(991.0, summary['p99'])
+        self.assertEqual(1000.0, summary['max'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,14 +8,17 @@ from ledsockets.server.Server import run_server
 
 async def run_unified():
     asyncio.create_task(run_client())
-    await asyncio.gather(
+    restart, = await asyncio.gather(
         asyncio.create_task(run_server()),
     )
+    return restart
 
 
 def main():
     load_dotenv()
-    asyncio.run(run_unified())
+    restart = asyncio.run(run_unified())
+    if restart:
+        restart.exec()
 
 
 if __name__ == "__main__":
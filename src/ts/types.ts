@@ -9,9 +9,96 @@ export function isSocketMessage(message: unknown): message is SocketMessage {
   return !!message && typeof message === 'object' && 'type' in message && !!message.type;
 }
 
+// Left in a relationship in place of a resource the server sideloaded into the payload's `included` list
+export type ResourceIdentifier = {
+  type: string;
+  id: string;
+}
+
+function isResourceIdentifier(obj: unknown): obj is ResourceIdentifier {
+  return isSocketMessage(obj) && !('attributes' in obj) && typeof obj.id === 'string' && !!obj.id;
+}
+
+/**
+ * Id-indexed cache of the resources the server has sent, for clients that ask for related resources to be sideloaded
+ * (init_client meta `{included: true}`).  `resolve` puts the resources back in place of the type/id references in a
+ * payload, so the payload can be handled as if they'd been embedded
+ */
+export class ResourceCache {
+  private resources = new Map<string, SocketMessage>();
+
+  private static key(resource: ResourceIdentifier): string {
+    return `${resource.type}:${resource.id}`;
+  }
+
+  clear() {
+    this.resources.clear();
+  }
+
+  private add(resource: unknown) {
+    if (!isSocketMessage(resource) || isResourceIdentifier(resource)) {
+      return;
+    }
+    if (resource.id) {
+      this.resources.set(ResourceCache.key(resource), resource);
+    }
+    Object.values(resource.relationships || {}).forEach((relationship) => {
+      const related = relationship && relationship.data;
+      (Array.isArray(related) ? related : [related]).forEach((item) => this.add(item));
+    });
+  }
+
+  private expand(resource: unknown, seen: Set<string>): unknown {
+    if (!isSocketMessage(resource)) {
+      return resource;
+    }
+    const key = ResourceCache.key(resource);
+    if (isResourceIdentifier(resource)) {
+      const cached = this.resources.get(key);
+      if (!cached) {
+        throw TypeError(`Unknown resource "${key}"`);
+      }
+      resource = cached;
+    }
+    const { relationships } = resource as SocketMessage;
+    if (!relationships || seen.has(key)) {
+      return resource;
+    }
+    const expanded: Record<string, any> = {};
+    Object.entries(relationships).forEach(([name, relationship]) => {
+      const related = relationship && relationship.data;
+      const inner = new Set(seen).add(key);
+      expanded[name] = {
+        ...relationship,
+        data: Array.isArray(related) ? related.map((item) => this.expand(item, inner)) : this.expand(related, inner),
+      };
+    });
+    return { ...(resource as SocketMessage), relationships: expanded };
+  }
+
+  /**
+   * Cache the resources in a payload, then return it with every reference in its data replaced by the resource
+   */
+  resolve<T extends { data?: unknown, included?: unknown }>(payload: T): T {
+    if (Array.isArray(payload.included)) {
+      payload.included.forEach((resource: unknown) => this.add(resource));
+    }
+    const data = Array.isArray(payload.data) ? payload.data : [payload.data];
+    data.forEach((resource: unknown) => this.add(resource));
+    return {
+      ...payload,
+      data: Array.isArray(payload.data)
+        ? payload.data.map((resource: unknown) => this.expand(resource, new Set()))
+        : this.expand(payload.data, new Set()),
+    };
+  }
+}
+
 export type HardwareStateAttributes = {
   on: boolean;
   status_description: string;
+  // Id of the patch that led to the state
+  correlation_id?: string;
 }
 
 export interface PatchHardwareState extends SocketMessage {
@@ -101,15 +188,35 @@ export function isUiClient(obj: Record<string, any>): obj is UiClient {
   throw TypeError('"ui_client" invalid "attributes"');
 }
 
+export type DeviceSubscription = SocketMessage & {
+  type: 'device_subscription',
+  attributes: {
+    // Ids of the hardware devices to receive updates for; null for every device
+    device_ids: string[] | null
+  }
+}
+
+export type ReconnectHint = SocketMessage & {
+  type: 'reconnect_hint',
+  attributes: {
+    // Seconds to wait before reconnecting once the server closes the connection
+    reconnect_after: number
+  }
+}
+
 export type ServerStatus = SocketMessage & {
   type: 'server_status',
   attributes: {
     hardware_is_connected: boolean
+    roster_version: number
   },
   relationships: {
     hardware_state: {
       data: HardwareState
     },
+    hardware_states?: {
+      data: HardwareState[]
+    },
     ui_client?: {
       data: UiClient
     }
@@ -137,6 +244,9 @@ export function isServerStatus(obj: Record<string, any>): obj is ServerStatus {
   if (!('hardware_is_connected' in attributes) || typeof attributes.hardware_is_connected !== 'boolean') {
     throw TypeError('"server_status" invalid attributes');
   }
+  if (!('roster_version' in attributes) || typeof attributes.roster_version !== 'number') {
+    throw TypeError('"server_status" invalid attributes');
+  }
   if (!relationships || typeof relationships !== 'object') {
     throw TypeError('"server_status" missing "relationships"');
   }
@@ -173,6 +283,60 @@ export function isServerStatus(obj: Record<string, any>): obj is ServerStatus {
   return true;
 }
 
+export type RosterChange = SocketMessage & {
+  type: 'roster_change',
+  attributes: {
+    version: number
+    action: 'joined' | 'left' | 'renamed'
+  },
+  relationships: {
+    ui_client: {
+      data: UiClient
+    }
+    change_detail?: {
+      data: ChangeDetail
+    }
+  }
+}
+
+export function isReconnectHint(obj: Record<string, any>): obj is ReconnectHint {
+  const {
+    type,
+    attributes,
+  } = obj;
+  if (type !== 'reconnect_hint') {
+    return false;
+  }
+  if (!attributes || typeof attributes.reconnect_after !== 'number') {
+    throw TypeError('"reconnect_hint" invalid attributes');
+  }
+  return true;
+}
+
+export function isRosterChange(obj: Record<string, any>): obj is RosterChange {
+  const {
+    type,
+    attributes,
+    relationships,
+  } = obj;
+  if (type !== 'roster_change') {
+    return false;
+  }
+  if (!attributes || typeof attributes !== 'object') {
+    throw TypeError('"roster_change" missing "attributes"');
+  }
+  if (typeof attributes.version !== 'number' || typeof attributes.action !== 'string') {
+    throw TypeError('"roster_change" invalid attributes');
+  }
+  if (!relationships || !relationships.ui_client || !isUiClient(relationships.ui_client.data)) {
+    throw TypeError('"roster_change" invalid "ui_client" relationship');
+  }
+  if (relationships.change_detail && !isChangeDetail(relationships.change_detail.data)) {
+    throw TypeError('"roster_change" invalid "change_detail" relationship');
+  }
+  return true;
+}
+
 export type UiMessageAttributes = {
   message: string;
 }
@@ -247,6 +411,22 @@ export function isEventMessage(event: unknown): event is EventMessage<any, any>
   return 'data' in payload && payload.data && isSocketMessage(payload.data);
 }
 
+export function isPresenceBatchMessage(event: unknown): event is PresenceBatchMessage {
+  if (!Array.isArray(event) || event[0] !== 'presence_batch') {
+    return false;
+  }
+  const payload = event[1];
+  if (!(payload && typeof payload === 'object' && Array.isArray(payload.data))) {
+    throw TypeError('"presence_batch" invalid payload');
+  }
+  payload.data.forEach((item: unknown) => {
+    if (!isSocketMessage(item) || !isRosterChange(item)) {
+      throw TypeError('"presence_batch" invalid item');
+    }
+  });
+  return true;
+}
+
 type InitClient = SocketMessage & {
   type: 'ui_client',
 }
@@ -288,10 +468,58 @@ export function isErrorMessage(event: unknown): event is ErrorMessage {
   return true;
 }
 
-export type InitClientMessage = EventMessage<'init_client', InitClient>
-export type ClientInitMessage = EventMessage<'client_init', ServerStatus>
+// Sent by the server with client_init and client_resumed
+export type SessionMeta = {
+  resume_token: string,
+  seq: number,
+  // Wire codec the server agreed to; this client only offers JSON
+  codec?: string,
+  // Whether related resources will be sideloaded into an `included` list
+  included?: boolean,
+}
+
+export function isSessionMeta(meta: unknown): meta is SessionMeta {
+  return !!meta && typeof meta === 'object'
+    && 'resume_token' in meta && typeof meta.resume_token === 'string'
+    && 'seq' in meta && typeof meta.seq === 'number';
+}
+
+// Sent with init_client to resume a dropped session, and to ask for related resources to be sideloaded
+export type ResumeMeta = {
+  resume_token?: string,
+  last_seq?: number,
+  included?: boolean,
+}
+
+/**
+ * Sequence number of a broadcast frame; null for frames that aren't numbered
+ */
+export function getFrameSeq(event: unknown): number | null {
+  if (!Array.isArray(event) || !event[1] || typeof event[1] !== 'object') {
+    return null;
+  }
+  const { seq } = event[1];
+  return typeof seq === 'number' ? seq : null;
+}
+
+export type InitClientMessage = ['init_client', { data: InitClient, meta?: ResumeMeta }]
+export type ClientInitMessage = ['client_init', { data: ServerStatus, meta?: SessionMeta }]
+export type ClientResumedMessage = ['client_resumed', { data: UiClient, meta: SessionMeta }]
 export type HardwareDisconnectedMessage = EventMessage<'hardware_disconnected', ServerStatus>
 export type HardwareConnectedMessage = EventMessage<'hardware_connected', ServerStatus>
+export type ServerStatusMessage = EventMessage<'server_status', ServerStatus>
+export type ClientJoinedMessage = EventMessage<'client_joined', RosterChange>
+export type ClientDisconnectMessage = EventMessage<'client_disconnect', RosterChange>
+export type ClientNameChangedMessage = EventMessage<'client_name_changed', RosterChange>
+export type PresenceBatchMessage = ['presence_batch', { data: RosterChange[] }]
+export type RequestStatusMessage = ['request_status', {}]
+export type HeartbeatMessage = ['heartbeat', {}]
+
+export function isHeartbeatMessage(event: unknown): event is HeartbeatMessage {
+  return Array.isArray(event) && event[0] === 'heartbeat';
+}
+export type ServerDrainingMessage = EventMessage<'server_draining', ReconnectHint>
+export type SubscribeMessage = EventMessage<'subscribe', DeviceSubscription>
 export type HardwareUpdatedMessage = EventMessage<'hardware_updated', HardwareState>
 export type TalkbackMessageMessage = EventMessage<'talkback_message', TalkbackMessage>
 export type PatchHardwareStateMessage = EventMessage<'patch_hardware_state', PatchHardwareState>